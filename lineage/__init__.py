@@ -0,0 +1,67 @@
+"""
+Shared lineage tooling for the dbt example projects.
+
+The visualization scripts in the repository root build on this package.
+Public names are imported lazily on first access, so `import lineage` (or
+any one submodule) stays cheap for quick CLI calls and pre-commit hooks.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'EXTRACTOR_VERSION': 'lineage.cache',
+    'LineageCache': 'lineage.cache',
+    'load_cached_lineage': 'lineage.cache',
+    'manifest_digest': 'lineage.cache',
+    'ColumnLineage': 'lineage.columns',
+    'extract_column_lineage': 'lineage.columns',
+    'load_into_duckdb': 'lineage.database',
+    'ManifestDiff': 'lineage.diff',
+    'diff_manifests': 'lineage.diff',
+    'export_lineage': 'lineage.export',
+    'NODE_TYPES': 'lineage.graph',
+    'GraphBuilder': 'lineage.graph',
+    'LineageGraph': 'lineage.graph',
+    'extract_lineage': 'lineage.graph',
+    'load_lineage': 'lineage.graph',
+    'impacted_nodes': 'lineage.impact',
+    'LineageDelta': 'lineage.incremental',
+    'update_lineage': 'lineage.incremental',
+    'Layout': 'lineage.layout',
+    'layered_layout': 'lineage.layout',
+    'ManifestError': 'lineage.manifest',
+    'iter_manifest': 'lineage.manifest',
+    'load_manifest': 'lineage.manifest',
+    'load_project_lineage': 'lineage.merge',
+    'merge_manifests': 'lineage.merge',
+    'LineageQuery': 'lineage.query',
+    'QueryError': 'lineage.query',
+    'render_lineage': 'lineage.render',
+    'CriticalPath': 'lineage.schedule',
+    'critical_path': 'lineage.schedule',
+    'simulate_build': 'lineage.schedule',
+    'simulate_threads': 'lineage.schedule',
+    'LineageServer': 'lineage.server',
+    'generate_project': 'lineage.synthetic',
+    'plan_project': 'lineage.synthetic',
+    'RunTimings': 'lineage.timings',
+    'load_run_results': 'lineage.timings',
+    'generate_lazy_html': 'lineage.viewer',
+    'generate_offline_html': 'lineage.viewer',
+    'LineageWatch': 'lineage.watch',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'lineage' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
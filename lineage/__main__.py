@@ -0,0 +1,6 @@
+import sys
+
+from lineage.cli import main
+
+
+sys.exit(main())
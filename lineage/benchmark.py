@@ -0,0 +1,319 @@
+"""
+Scaling benchmarks for the lineage pipeline.
+
+Every stage of the scripts (manifest parsing, graph extraction, layout,
+PNG/SVG rendering and both HTML writers) runs against synthetic manifests
+of increasing size from lineage.synthetic. Wall time is the fastest of a
+few runs after an untimed warm-up run. Peak memory comes from one extra run
+under tracemalloc, since tracing slows the code down too much to time it at
+the same time. Results go to a JSON file.
+
+Two checks flag regressions. With --baseline, any stage that is more than
+--tolerance slower, or that allocates that much more memory, than the stored
+run fails. Independently of any baseline, a stage whose time grows faster
+than n**MAX_SCALING_EXPONENT between two sizes is reported as superlinear,
+which is how a change that makes the nightly job quadratic shows up:
+
+    python -m lineage.benchmark --save-baseline benchmarks/baseline.json
+    python -m lineage.benchmark --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from lineage.graph import extract_lineage, load_lineage
+from lineage.layout import layered_layout
+from lineage.manifest import load_manifest
+from lineage.synthetic import plan_project, write_manifest
+
+
+# Model counts of the synthetic manifests, smallest first
+DEFAULT_SIZES = (250, 1000, 4000)
+
+STAGES = ('load_manifest', 'extract_lineage', 'load_lineage', 'layout',
+          'render_svg', 'render_png', 'html_full', 'html_lazy')
+
+# Fractional slowdown (or memory growth) against the baseline that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Time growth between two sizes above n**this is reported as superlinear
+MAX_SCALING_EXPONENT = 1.5
+
+# Timings below this are too noisy to compare
+MIN_COMPARABLE_SECONDS = 0.02
+
+RESULTS_VERSION = 1
+
+
+def _stage_load_manifest(context):
+    load_manifest(context['manifest_path'])
+
+
+def _stage_extract_lineage(context):
+    extract_lineage(context['manifest'])
+
+
+def _stage_load_lineage(context):
+    load_lineage(context['manifest_path'])
+
+
+def _stage_layout(context):
+    # Same spacing as visualize_lineage.py
+    layered_layout(context['graph'], layer_spacing=3, node_spacing=1.5)
+
+
+def _stage_render_svg(context):
+    from lineage.render import write_svg
+
+    write_svg(context['graph'], context['layout'], context['workdir'] / 'lineage.svg')
+
+
+def _stage_render_png(context):
+    from lineage.render import render_matplotlib, use_headless_backend
+
+    use_headless_backend()
+    render_matplotlib(context['graph'], context['layout'], [context['workdir'] / 'lineage.png'])
+
+
+def _stage_html_full(context):
+    from lineage.viewer import generate_html_visualization
+
+    generate_html_visualization(context['graph'], str(context['workdir'] / 'full.html'))
+
+
+def _stage_html_lazy(context):
+    from lineage.viewer import generate_lazy_html
+
+    generate_lazy_html(context['graph'], context['workdir'] / 'lazy.html', layout=context['layout'])
+
+
+_STAGE_FUNCTIONS = {name: globals()[f'_stage_{name}'] for name in STAGES}
+
+# Optional third-party packages per stage. A stage is only skipped when one of
+# these is missing; any other ImportError is a bug and fails the run.
+STAGE_DEPENDENCIES = {
+    'render_png': ('matplotlib', 'numpy'),
+}
+
+
+def measure(function, context, repeat=3, memory=True):
+    """
+    Return (seconds, peak_bytes) for `function(context)`.
+
+    Seconds is the fastest of `repeat` runs; peak_bytes is the tracemalloc
+    peak of one more run (None when `memory` is false). Output printed by
+    the stage is discarded.
+
+    The stage runs once untimed first. Otherwise the first size a stage
+    meets pays for lazy imports and font caches (matplotlib takes seconds),
+    which skews the scaling exponent low and can hide superlinear growth.
+    """
+    best = math.inf
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(context)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(context)
+            best = min(best, time.perf_counter() - start)
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                function(context)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=STAGES, repeat=3, memory=True, random_seed=0):
+    """
+    Benchmark `stages` on a synthetic manifest per model count in `sizes`.
+
+    Returns a list of result dicts (stage, models, nodes, edges,
+    manifest_bytes, seconds, peak_bytes); stages whose optional dependency
+    is missing are reported once and skipped.
+    """
+    results = []
+    skipped = set()
+    with tempfile.TemporaryDirectory(prefix='lineage-benchmark-') as tmp:
+        workdir = Path(tmp)
+        for models in sizes:
+            nodes = plan_project(models=models, seeds=max(1, models // 50), random_seed=random_seed)
+            manifest_path = write_manifest(nodes, workdir / f'manifest_{models}.json')
+            graph = load_lineage(manifest_path)
+            context = {
+                'manifest_path': manifest_path,
+                'manifest': load_manifest(manifest_path),
+                'graph': graph,
+                'layout': layered_layout(graph, layer_spacing=3, node_spacing=1.5),
+                'workdir': workdir,
+            }
+            print(f"📏 {models:,} models: {len(graph):,} nodes, {graph.number_of_edges():,} edges")
+            for stage in stages:
+                if stage in skipped:
+                    continue
+                try:
+                    seconds, peak = measure(_STAGE_FUNCTIONS[stage], context, repeat, memory)
+                except ImportError as error:
+                    missing = (error.name or '').partition('.')[0]
+                    if missing not in STAGE_DEPENDENCIES.get(stage, ()):
+                        raise
+                    print(f"⚠️  Skipping {stage}: {error}")
+                    skipped.add(stage)
+                    continue
+                peak_text = f"{peak / 1e6:8.1f} MB" if peak is not None else ''
+                print(f"  {stage:<16} {seconds:9.3f}s {peak_text}")
+                results.append({
+                    'stage': stage,
+                    'models': models,
+                    'nodes': len(graph),
+                    'edges': graph.number_of_edges(),
+                    'manifest_bytes': manifest_path.stat().st_size,
+                    'seconds': seconds,
+                    'peak_bytes': peak,
+                })
+            manifest_path.unlink()
+    return results
+
+
+def scaling_exponents(results):
+    """{stage: [(nodes_from, nodes_to, exponent), ...]} for consecutive sizes of each stage."""
+    by_stage = {}
+    for result in results:
+        by_stage.setdefault(result['stage'], []).append(result)
+    exponents = {}
+    for stage, runs in by_stage.items():
+        runs.sort(key=lambda result: result['nodes'])
+        pairs = []
+        for smaller, larger in zip(runs, runs[1:]):
+            if (larger['nodes'] <= smaller['nodes']
+                    or min(smaller['seconds'], larger['seconds']) < MIN_COMPARABLE_SECONDS):
+                continue
+            exponent = (math.log(larger['seconds'] / smaller['seconds'])
+                        / math.log(larger['nodes'] / smaller['nodes']))
+            pairs.append((smaller['nodes'], larger['nodes'], exponent))
+        exponents[stage] = pairs
+    return exponents
+
+
+def find_regressions(results, baseline=None, tolerance=DEFAULT_TOLERANCE,
+                     max_exponent=MAX_SCALING_EXPONENT):
+    """Human-readable regression messages; empty when everything is within bounds."""
+    messages = []
+    for stage, pairs in scaling_exponents(results).items():
+        for smaller, larger, exponent in pairs:
+            if exponent > max_exponent:
+                messages.append(f"{stage}: time grows as n^{exponent:.2f} from {smaller:,} to "
+                                f"{larger:,} nodes (limit n^{max_exponent})")
+
+    if baseline:
+        previous = {(result['stage'], result['models']): result for result in baseline['results']}
+        for result in results:
+            before = previous.get((result['stage'], result['models']))
+            if before is None:
+                continue
+            if (max(result['seconds'], before['seconds']) >= MIN_COMPARABLE_SECONDS
+                    and result['seconds'] > before['seconds'] * (1 + tolerance)):
+                messages.append(f"{result['stage']} @ {result['models']:,} models: "
+                                f"{before['seconds']:.3f}s -> {result['seconds']:.3f}s")
+            if (result['peak_bytes'] and before.get('peak_bytes')
+                    and result['peak_bytes'] > before['peak_bytes'] * (1 + tolerance)):
+                messages.append(f"{result['stage']} @ {result['models']:,} models: peak memory "
+                                f"{before['peak_bytes'] / 1e6:.1f} MB -> {result['peak_bytes'] / 1e6:.1f} MB")
+    return messages
+
+
+def write_results(results, path):
+    """Write results with enough context to judge whether two files are comparable."""
+    path = Path(path)
+    if path.parent != Path('.'):
+        path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    path.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    return path
+
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    if report.get('version') != RESULTS_VERSION:
+        raise ValueError(f"{path} was written by a different benchmark version")
+    return report
+
+
+def _stage_list(value):
+    stages = [stage.strip() for stage in value.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown stage(s): {', '.join(unknown)} "
+                                         f"(choose from {', '.join(STAGES)})")
+    return stages
+
+
+def _size_list(value):
+    try:
+        return sorted(int(size) for size in value.split(',') if size.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"sizes must be comma-separated integers, not {value!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m lineage.benchmark',
+        description='Benchmark the lineage pipeline on synthetic manifests of increasing size.')
+    parser.add_argument('--sizes', type=_size_list, default=list(DEFAULT_SIZES),
+                        help='comma-separated model counts (default: %(default)s)')
+    parser.add_argument('--stages', type=_stage_list, default=list(STAGES),
+                        help='comma-separated stages to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage; the fastest counts')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--output', default='lineage_benchmark.json', help='results file to write')
+    parser.add_argument('--baseline', default=None, help='results file to compare against')
+    parser.add_argument('--save-baseline', default=None, metavar='PATH',
+                        help='also write the results to PATH as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown or memory growth against the baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)
+        except (OSError, ValueError) as error:
+            parser.error(f"cannot read baseline: {error}")
+
+    print(f"⏱️  Benchmarking {', '.join(args.stages)}")
+    results = run_benchmarks(args.sizes, args.stages, args.repeat, not args.no_memory)
+    print(f"\n💾 Results saved to: {write_results(results, args.output)}")
+    if args.save_baseline:
+        print(f"💾 Baseline saved to: {write_results(results, args.save_baseline)}")
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s):")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    print("\n✅ No regressions" + (f" against {args.baseline}" if baseline else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""
+On-disk cache of extracted lineage graphs.
+
+Entries are keyed by a hash of the manifest bytes plus EXTRACTOR_VERSION, so
+rerunning a script against the manifest `dbt docs generate` produced last
+time skips parsing entirely, and changing the extractor invalidates every
+entry. When the manifest did change, the graph cached for the previous
+version of the same manifest file is patched with update_lineage() instead
+of re-extracting everything. The cache directory is bounded in size; the
+least recently used entries are evicted first.
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from lineage.graph import load_lineage
+from lineage.incremental import update_lineage
+
+
+# Messages the scripts print for each load_cached_lineage() outcome
+LOAD_MESSAGES = {
+    'cache': "⚡ Reusing cached lineage graph (manifest unchanged)",
+    'incremental': "♻️  Patched cached lineage graph with the manifest changes",
+    'manifest': "🔍 Extracted lineage relationships",
+    'merged': "🔗 Merged the project manifests into one lineage graph",
+}
+
+# Bump whenever extraction or the LineageGraph layout changes
+EXTRACTOR_VERSION = 2
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get('LINEAGE_CACHE_DIR', Path.home() / '.cache' / 'dbt_lineage')
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SUFFIX = '.lineage'
+_LATEST_SUFFIX = '.latest'
+_HASH_CHUNK = 1 << 20
+# Seconds after which a leftover put() temporary file counts as orphaned
+_TMP_MAX_AGE = 3600
+
+
+def manifest_digest(manifest_path):
+    """Hash the manifest contents together with the extractor version."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f'lineage-extractor-{EXTRACTOR_VERSION}\0'.encode())
+    with open(manifest_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LineageCache:
+    """Size-bounded directory of pickled LineageGraph objects."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return self.directory / f'{key}{_SUFFIX}'
+
+    def get(self, key):
+        """Return the cached graph for `key`, or None on a miss."""
+        import pickle
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                graph = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated entry, or one pickled by a different code layout (which
+            # raises ModuleNotFoundError, AttributeError, ValueError, ...); drop
+            # it and rebuild
+            path.unlink(missing_ok=True)
+            return None
+        # Refresh the mtime so eviction sees this entry as recently used
+        os.utime(path)
+        return graph
+
+    def put(self, key, graph):
+        """Store `graph` under `key`, then evict entries over the size budget."""
+        import pickle
+        import tempfile
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict(keep=key)
+
+    def _latest_path(self, manifest_path):
+        name = hashlib.blake2b(str(Path(manifest_path).resolve()).encode(), digest_size=16)
+        return self.directory / f'{name.hexdigest()}{_LATEST_SUFFIX}'
+
+    def get_latest(self, manifest_path):
+        """
+        Return the graph last cached for this manifest file, if still present.
+
+        Pointers written by another EXTRACTOR_VERSION are ignored: a graph
+        built by a different extractor must be re-extracted, not patched.
+        """
+        try:
+            version, _, key = self._latest_path(manifest_path).read_text().strip().partition(' ')
+        except OSError:
+            return None
+        if version != str(EXTRACTOR_VERSION) or not key:
+            return None
+        return self.get(key)
+
+    def set_latest(self, manifest_path, key):
+        """Remember `key` as the newest entry for this manifest file."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._latest_path(manifest_path).write_text(f'{EXTRACTOR_VERSION} {key}')
+
+    def entries(self):
+        """Return [(mtime, size, path)] for every cache entry, oldest first."""
+        entries = []
+        for path in self.directory.glob(f'*{_SUFFIX}'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used entries until the cache fits max_bytes.
+
+        Temporary files left behind by an interrupted put() are removed too,
+        once they are old enough not to belong to one still in progress.
+        """
+        stale = time.time() - _TMP_MAX_AGE
+        for path in self.directory.glob('*.tmp'):
+            try:
+                if path.stat().st_mtime < stale:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        keep_path = self._path(keep) if keep else None
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            path.unlink(missing_ok=True)
+        for path in self.directory.glob(f'*{_LATEST_SUFFIX}'):
+            path.unlink(missing_ok=True)
+
+
+def load_cached_lineage(manifest_path, cache=None, incremental=True):
+    """
+    Return (graph, source) for a manifest.
+
+    `source` is 'cache' when the manifest hash matched a cached graph,
+    'incremental' when the previous graph for the same file was patched, and
+    'manifest' when the graph was extracted from scratch. With no cache this
+    is just load_lineage().
+    """
+    if cache is None:
+        return load_lineage(manifest_path), 'manifest'
+    key = manifest_digest(manifest_path)
+    graph = cache.get(key)
+    if graph is not None:
+        cache.set_latest(manifest_path, key)
+        return graph, 'cache'
+    previous = cache.get_latest(manifest_path) if incremental else None
+    if previous is not None:
+        graph, _ = update_lineage(previous, manifest_path)
+        source = 'incremental'
+    else:
+        graph = load_lineage(manifest_path)
+        source = 'manifest'
+    cache.put(key, graph)
+    cache.set_latest(manifest_path, key)
+    return graph, source
+
+
+def add_cache_arguments(parser):
+    """Add the lineage cache options to an argparse parser."""
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always re-parse the manifest')
+    parser.add_argument('--cache-dir', default=None,
+                        help=f'lineage cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-incremental', action='store_true',
+                        help='never patch the previous cached graph; re-extract on change')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='maximum cache size in MB')
+
+
+def cache_from_args(args):
+    """Build the LineageCache selected by add_cache_arguments() options."""
+    if args.no_cache:
+        return None
+    return LineageCache(args.cache_dir, args.cache_size * 1024 * 1024)
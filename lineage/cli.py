@@ -0,0 +1,509 @@
+"""
+Command line interface for lineage queries.
+
+    python -m lineage ancestors dim_customers --depth 2
+    python -m lineage descendants stg_customers --type model
+    python -m lineage upstream stg_customers fct_customer_metrics
+    python -m lineage columns int_claim_analysis patient_name
+    python -m lineage impact --base-manifest old_manifest.json
+    python -m lineage impact --git origin/main --format graph
+    python -m lineage diff --base-manifest old_manifest.json --output changes.png
+    python -m lineage critical-path --run-results target/run_results.json
+    python -m lineage simulate --threads 16
+    python -m lineage export --format parquet,graphml --output-dir lineage_export
+    python -m lineage serve --port 8765
+    python -m lineage duckdb --sql "SELECT * FROM lineage.ancestors('dim_customers')"
+    python -m lineage descendants stg_orders --manifest shop/target/manifest.json finance/target/manifest.json
+
+Nodes can be given by unique_id or by name. Results are printed one
+unique_id per line (or as JSON with --json) so they can be piped into other
+tools; progress messages go to stderr.
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+from pathlib import Path
+
+from lineage.cache import LOAD_MESSAGES, add_cache_arguments, cache_from_args, load_cached_lineage
+from lineage.columns import DEFAULT_DIALECT, extract_column_lineage
+from lineage.database import DEFAULT_DATABASE_NAME, SCHEMA, import_duckdb, load_into_duckdb
+from lineage.diff import delta_subgraph, diff_manifests
+from lineage.export import EXPORT_FORMATS, export_lineage
+from lineage.graph import NODE_TYPES
+from lineage.impact import (DEFAULT_GIT_PATHS, SELECTOR_FORMATS, changed_between, format_selector,
+                            git_changed_files, impacted_nodes, nodes_for_files, selection_roots)
+from lineage.layout import layered_layout
+from lineage.merge import load_project_lineage
+from lineage.profiling import add_profile_arguments, graph_counts, profiler_from_args
+from lineage.query import LineageQuery, QueryError
+from lineage.render import render_lineage, use_headless_backend
+from lineage.schedule import (SATURATION_TOLERANCE, critical_path, node_weights, saturating_threads,
+                              simulate_threads)
+from lineage.server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_RESULT_CACHE, LineageServer
+from lineage.timings import RUN_RESULTS_NAME, format_seconds, load_run_results
+from lineage.viewer import generate_offline_html
+from lineage.watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL
+
+
+DEFAULT_MANIFEST = 'lineage_demo/target/manifest.json'
+
+
+def _add_common_arguments(parser):
+    parser.add_argument('--manifest', nargs='+', default=[DEFAULT_MANIFEST],
+                        help='path to the dbt manifest.json; give several to merge projects into one graph')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+
+
+def _add_run_results_argument(parser):
+    parser.add_argument('--run-results', default=None,
+                        help=f'path to run_results.json (default: {RUN_RESULTS_NAME} next to the manifest)')
+
+
+def _add_related_arguments(parser):
+    parser.add_argument('node', help='unique_id or name of the starting node')
+    parser.add_argument('--depth', type=_non_negative_int, default=None,
+                        help='only follow this many hops (default: unlimited)')
+    parser.add_argument('--type', dest='node_types', action='append', choices=NODE_TYPES,
+                        help='only report nodes of this type (repeatable)')
+    parser.add_argument('--json', action='store_true',
+                        help='print a JSON object with the node and its distance in hops')
+
+
+def _non_negative_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected an integer, not {value!r}')
+    if number < 0:
+        raise argparse.ArgumentTypeError(f'must not be negative, not {number}')
+    return number
+
+
+def _export_formats(value):
+    formats = [fmt.strip().lower() for fmt in value.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(EXPORT_FORMATS)}, not {value!r}")
+    return list(dict.fromkeys(formats))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m lineage', description='Query dbt lineage extracted from manifest.json.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('ancestors', 'list everything upstream of a node'),
+                            ('descendants', 'list everything downstream of a node')):
+        command = commands.add_parser(name, help=help_text)
+        _add_related_arguments(command)
+        _add_common_arguments(command)
+
+    upstream = commands.add_parser('upstream', help='check whether one node is upstream of another')
+    upstream.add_argument('upstream', help='candidate upstream node')
+    upstream.add_argument('downstream', help='candidate downstream node')
+    _add_common_arguments(upstream)
+
+    columns = commands.add_parser(
+        'columns', help='column-level lineage from compiled SQL (needs sqlglot)')
+    columns.add_argument('node', help='unique_id or name of the model')
+    columns.add_argument('column', nargs='?',
+                         help='trace this column (default: list every column and its sources)')
+    columns.add_argument('--downstream', action='store_true',
+                         help='list the columns a change would affect instead of the sources')
+    columns.add_argument('--depth', type=_non_negative_int, default=None,
+                         help='only follow this many hops (default: unlimited)')
+    columns.add_argument('--dialect', default=DEFAULT_DIALECT,
+                         help='SQL dialect of the compiled code')
+    columns.add_argument('--workers', type=int, default=None,
+                         help='parser processes (default: CPU count)')
+    columns.add_argument('--json', action='store_true', help='print JSON')
+    _add_common_arguments(columns)
+
+    impact = commands.add_parser(
+        'impact', help='print a dbt selector for the nodes a change requires rebuilding')
+    against = impact.add_mutually_exclusive_group(required=True)
+    against.add_argument('--base-manifest',
+                         help='manifest.json of the previous build to compare against')
+    against.add_argument('--git', nargs='?', const='HEAD', metavar='REF',
+                         help='compare project files against a git ref (default: HEAD)')
+    impact.add_argument('--project-dir', default=None,
+                        help='dbt project directory for --git (default: two levels above the manifest)')
+    impact.add_argument('--paths', nargs='+', default=list(DEFAULT_GIT_PATHS),
+                        help='project folders checked with --git')
+    impact.add_argument('--format', dest='selector_format', choices=SELECTOR_FORMATS, default='names',
+                        help="names: every node to build; graph: 'model+' per changed node; "
+                             'yaml: a selectors.yml entry')
+    _add_common_arguments(impact)
+
+    diff = commands.add_parser(
+        'diff', help='added/removed nodes and edges and checksum changes between two manifests')
+    diff.add_argument('--base-manifest', required=True,
+                      help='manifest.json of the previous build to compare against')
+    diff.add_argument('--output', default=None,
+                      help='also draw the changed subgraph (.png, .svg, .pdf or .html)')
+    diff.add_argument('--context', type=int, default=1,
+                      help='hops of unchanged neighbours drawn around the changes')
+    diff.add_argument('--json', action='store_true', help='print JSON')
+    _add_common_arguments(diff)
+
+    critical = commands.add_parser(
+        'critical-path', help='longest path by execution time and the slack of every other node')
+    _add_run_results_argument(critical)
+    critical.add_argument('--top', type=int, default=10,
+                          help='also list this many off-path models with the least slack')
+    critical.add_argument('--json', action='store_true', help='print JSON')
+    _add_common_arguments(critical)
+
+    simulate = commands.add_parser(
+        'simulate', help='predict build wall time and thread utilisation for 1..N threads')
+    _add_run_results_argument(simulate)
+    simulate.add_argument('--threads', type=int, default=16,
+                          help='simulate every thread count from 1 up to this')
+    simulate.add_argument('--tolerance', type=float, default=SATURATION_TOLERANCE,
+                          help='recommend the fewest threads within this fraction of the best time')
+    simulate.add_argument('--json', action='store_true', help='print JSON')
+    _add_common_arguments(simulate)
+
+    export = commands.add_parser(
+        'export', help='write nodes and edges as Parquet/Arrow tables and/or GraphML')
+    export.add_argument('--output-dir', default='lineage_export',
+                        help='directory for nodes.parquet, edges.parquet, lineage.graphml, ...')
+    export.add_argument('--format', dest='formats', type=_export_formats, default=['parquet'],
+                        help=f"comma-separated formats: {', '.join(EXPORT_FORMATS)} (default: parquet)")
+    _add_common_arguments(export)
+
+    database = commands.add_parser(
+        'duckdb', help=f'load nodes, edges and run timings into the {SCHEMA} schema of a DuckDB file')
+    database.add_argument('--database', default=None,
+                          help=f'DuckDB file (default: {DEFAULT_DATABASE_NAME} in the project directory)')
+    _add_run_results_argument(database)
+    database.add_argument('--sql', default=None,
+                          help='run this query after loading and print the rows tab-separated')
+    _add_common_arguments(database)
+
+    serve = commands.add_parser(
+        'serve', help='answer lineage queries over HTTP/JSON from a graph kept in memory')
+    serve.add_argument('--host', default=DEFAULT_HOST, help='address to listen on (default: %(default)s)')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on (default: %(default)s)')
+    serve.add_argument('--result-cache', type=int, default=DEFAULT_RESULT_CACHE,
+                       help='query responses kept in memory per graph version (default: %(default)s)')
+    serve.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                       help='seconds the manifest must be quiet before a reload (default: %(default)s)')
+    serve.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                       help='seconds between manifest checks (default: %(default)s)')
+    _add_common_arguments(serve)
+    return parser
+
+
+def load_query(args):
+    """Load (or merge) the graph selected by --manifest and the cache options."""
+    for manifest_path in map(Path, args.manifest):
+        if not manifest_path.exists():
+            raise QueryError(f'manifest file not found at {manifest_path}')
+    graph, source = load_project_lineage(
+        args.manifest, cache_from_args(args), incremental=not args.no_incremental)
+    print(LOAD_MESSAGES[source], file=sys.stderr)
+    return LineageQuery(graph)
+
+
+def run_related(query, args):
+    upstream = args.command == 'ancestors'
+    related = query.ancestors if upstream else query.descendants
+    indices = related(args.node, depth=args.depth, node_types=args.node_types)
+    graph = query.graph
+    if args.json:
+        hops = query.distances(args.node, upstream=upstream, depth=args.depth)
+        print(json.dumps({
+            'node': graph.ids[query.resolve(args.node)],
+            args.command: [{'unique_id': graph.ids[i], 'type': graph.node_type(i),
+                            'depth': hops[i]} for i in indices],
+        }, indent=2))
+    else:
+        for i in indices:
+            print(graph.ids[i])
+    print(f"✓ {len(indices)} {args.command}", file=sys.stderr)
+    return 0
+
+
+def run_upstream(query, args):
+    found = query.is_upstream(args.upstream, args.downstream)
+    graph = query.graph
+    upstream_id = graph.ids[query.resolve(args.upstream)]
+    downstream_id = graph.ids[query.resolve(args.downstream)]
+    print(f"{upstream_id} {'is' if found else 'is not'} upstream of {downstream_id}")
+    return 0 if found else 1
+
+
+def _single_manifest(args):
+    if len(args.manifest) > 1:
+        raise QueryError(f"'{args.command}' works on one manifest at a time")
+    return args.manifest[0]
+
+
+def run_columns(query, args):
+    manifest_path = _single_manifest(args)
+    unique_id = query.graph.ids[query.resolve(args.node)]
+    lineage = extract_column_lineage(
+        manifest_path, args.dialect, args.workers, cache_from_args(args))
+    if unique_id in lineage.errors:
+        print(f"⚠️  Could not parse {unique_id}: {lineage.errors[unique_id]}", file=sys.stderr)
+    if args.column is None:
+        result = {column: [f'{source}.{name}' for source, name in lineage.sources.get((unique_id, column), [])]
+                  for column in lineage.columns.get(unique_id, [])}
+        if args.json:
+            print(json.dumps({'node': unique_id, 'columns': result}, indent=2))
+        else:
+            for column, column_sources in result.items():
+                print(f"{column} <- {', '.join(column_sources) or '(no upstream columns)'}")
+        return 0
+    walk = lineage.downstream if args.downstream else lineage.upstream
+    related = sorted(walk(unique_id, args.column, args.depth).items(), key=lambda item: (item[1], item[0]))
+    if args.json:
+        print(json.dumps({
+            'node': unique_id, 'column': args.column,
+            'downstream' if args.downstream else 'upstream': [
+                {'unique_id': node, 'column': column, 'depth': depth}
+                for (node, column), depth in related],
+        }, indent=2))
+    else:
+        for (node, column), _ in related:
+            print(f'{node}.{column}')
+    print(f"✓ {len(related)} {'affected' if args.downstream else 'source'} columns", file=sys.stderr)
+    return 0
+
+
+def run_impact(query, args):
+    graph = query.graph
+    manifest_path = _single_manifest(args)
+    if args.base_manifest:
+        base_path = Path(args.base_manifest)
+        if not base_path.exists():
+            raise QueryError(f'base manifest not found at {base_path}')
+        previous, _ = load_cached_lineage(
+            base_path, cache_from_args(args), incremental=not args.no_incremental)
+        changed = changed_between(previous, graph)
+    else:
+        project_dir = Path(args.project_dir or Path(manifest_path).resolve().parent.parent)
+        files = git_changed_files(project_dir, args.git, args.paths)
+        changed = nodes_for_files(manifest_path, graph, files)
+        print(f"📝 {len(files)} changed files since {args.git}", file=sys.stderr)
+
+    impacted = impacted_nodes(graph, changed, query)
+    roots = selection_roots(graph, changed, query)
+    selector = format_selector(graph, impacted, roots, args.selector_format)
+    if selector:
+        print(selector)
+    print(f"✓ {len(changed)} changed nodes, {len(impacted)} of {len(graph)} to rebuild",
+          file=sys.stderr)
+    return 0
+
+
+def run_diff(args):
+    """Stream both manifests and report their structural differences (no query index needed)."""
+    current_path = Path(_single_manifest(args))
+    base_path = Path(args.base_manifest)
+    for manifest_path in (base_path, current_path):
+        if not manifest_path.exists():
+            raise QueryError(f'manifest file not found at {manifest_path}')
+    diff = diff_manifests(base_path, current_path)
+
+    if args.json:
+        print(json.dumps(diff.to_dict(), indent=2))
+    else:
+        for unique_id in diff.added:
+            print(f'+ {unique_id}')
+        for unique_id in diff.removed:
+            print(f'- {unique_id}')
+        for unique_id, reasons in diff.changed.items():
+            print(f"~ {unique_id} ({', '.join(reasons)})")
+        for parent, child in diff.added_edges:
+            print(f'+ {parent} -> {child}')
+        for parent, child in diff.removed_edges:
+            print(f'- {parent} -> {child}')
+    print(f"✓ {len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed "
+          f"({len(diff.checksum_changes())} checksum changes), {len(diff.added_edges)} edges added, "
+          f"{len(diff.removed_edges)} edges removed", file=sys.stderr)
+
+    if args.output:
+        cache = cache_from_args(args)
+        previous, _ = load_cached_lineage(base_path, cache, incremental=not args.no_incremental)
+        current, _ = load_cached_lineage(current_path, cache, incremental=not args.no_incremental)
+        subgraph, node_colors, edge_colors, legend = delta_subgraph(diff, previous, current, args.context)
+        layout = layered_layout(subgraph)
+        title = f'Lineage changes: {base_path} → {current_path}'
+        if Path(args.output).suffix.lower() in ('.html', '.htm'):
+            with contextlib.redirect_stdout(sys.stderr):
+                generate_offline_html(subgraph, args.output, layout, title=title, node_colors=node_colors,
+                                      edge_colors=edge_colors, legend=legend)
+        else:
+            use_headless_backend()
+            render_lineage(subgraph, layout, args.output, title=title, node_colors=node_colors,
+                           edge_colors=edge_colors, legend=legend)
+            print(f"✓ Lineage changes saved to: {args.output}", file=sys.stderr)
+    return 0
+
+
+def run_serve(args):
+    """Load the graph and serve it over HTTP until interrupted."""
+    for manifest_path in map(Path, args.manifest):
+        if not manifest_path.exists():
+            raise QueryError(f'manifest file not found at {manifest_path}')
+    # Nothing is printed to stdout as a result, but keep the CLI convention
+    with contextlib.redirect_stdout(sys.stderr):
+        server = LineageServer(args.manifest, cache_from_args(args), not args.no_incremental,
+                               args.result_cache, args.poll_interval, args.debounce)
+        try:
+            server.run(args.host, args.port)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped serving")
+    return 0
+
+
+def _load_timings(graph, args):
+    run_results = Path(args.run_results or Path(args.manifest[0]).with_name(RUN_RESULTS_NAME))
+    if not run_results.exists():
+        raise QueryError(f"run results not found at {run_results}; run 'dbt run' or 'dbt build' first")
+    return load_run_results(run_results, graph)
+
+
+def run_critical_path(query, args):
+    graph = query.graph
+    timings = _load_timings(graph, args)
+    result = critical_path(graph, timings, order=query.order)
+    on_path = set(result.path)
+    off_path = sorted((i for i in range(len(graph))
+                       if i not in on_path and timings.durations[i] >= 0
+                       and graph.node_type(i) in ('model', 'snapshot', 'seed')),
+                      key=lambda i: (result.slack[i], -timings.durations[i]))[:args.top]
+    length = result.length or 1.0
+
+    if args.json:
+        print(json.dumps({
+            'length': round(result.length, 3),
+            'total': round(timings.total(), 3),
+            'path': [{'unique_id': graph.ids[i], 'time': round(timings.durations[i], 3),
+                      'start': round(result.earliest_start[i], 3)} for i in result.path],
+            'least_slack': [{'unique_id': graph.ids[i], 'time': round(timings.durations[i], 3),
+                             'slack': round(result.slack[i], 3)} for i in off_path],
+        }, indent=2))
+        return 0
+
+    print(f"Critical path: {format_seconds(result.length)} across {len(result.path)} nodes "
+          f"(sum of all node times: {format_seconds(timings.total())})")
+    width = max((len(graph.names[i]) for i in result.path + off_path), default=4)
+    print(f"\n  {'node':<{width}}  {'start':>8}  {'time':>8}  {'share':>6}")
+    for i in result.path:
+        duration = max(timings.durations[i], 0.0)
+        print(f"  {graph.names[i]:<{width}}  {format_seconds(result.earliest_start[i]):>8}  "
+              f"{format_seconds(duration):>8}  {duration / length:>6.1%}")
+    if off_path:
+        print("\nLeast slack off the critical path:")
+        print(f"\n  {'node':<{width}}  {'slack':>8}  {'time':>8}")
+        for i in off_path:
+            print(f"  {graph.names[i]:<{width}}  {format_seconds(result.slack[i]):>8}  "
+                  f"{format_seconds(timings.durations[i]):>8}")
+    return 0
+
+
+def run_simulate(query, args):
+    graph = query.graph
+    if args.threads < 1:
+        raise QueryError('--threads must be at least 1')
+    weights = node_weights(graph, _load_timings(graph, args))
+    simulations = simulate_threads(graph, weights, args.threads)
+    best = saturating_threads(simulations, args.tolerance)
+    lower_bound = critical_path(graph, weights=weights, order=query.order).length
+    serial = simulations[0].wall_time or 1.0
+
+    if args.json:
+        print(json.dumps({
+            'critical_path': round(lower_bound, 3),
+            'recommended_threads': best.threads,
+            'simulations': [{'threads': sim.threads, 'wall_time': round(sim.wall_time, 3),
+                             'utilisation': round(sim.utilisation, 4)} for sim in simulations],
+        }, indent=2))
+        return 0
+
+    print(f"  {'threads':>7}  {'wall time':>9}  {'speedup':>7}  {'utilisation':>11}")
+    for sim in simulations:
+        marker = '  ◀ recommended' if sim is best else ''
+        print(f"  {sim.threads:>7}  {format_seconds(sim.wall_time):>9}  {serial / (sim.wall_time or 1.0):>6.1f}x  "
+              f"{sim.utilisation:>11.1%}{marker}")
+    print(f"\nCritical path (no thread count can beat it): {format_seconds(lower_bound)}")
+    print(f"✓ {best.threads} threads come within {args.tolerance:.0%} of the best simulated time")
+    return 0
+
+
+def run_export(query, args):
+    graph = query.graph
+    for path in export_lineage(graph, args.output_dir, args.formats):
+        print(path)
+    print(f"✓ Exported {len(graph):,} nodes and {graph.number_of_edges():,} edges", file=sys.stderr)
+    return 0
+
+
+def run_duckdb(query, args):
+    duckdb = import_duckdb()
+    graph = query.graph
+    manifest_path = Path(args.manifest[0])
+    database = Path(args.database or manifest_path.resolve().parent.parent / DEFAULT_DATABASE_NAME)
+    run_results = Path(args.run_results or manifest_path.with_name(RUN_RESULTS_NAME))
+    timings = load_run_results(run_results, graph) if run_results.exists() else None
+    try:
+        with duckdb.connect(str(database)) as connection:
+            skipped = load_into_duckdb(graph, connection, timings)
+            print(f"✓ Loaded {len(graph):,} nodes, {graph.number_of_edges():,} edges and "
+                  f"{len(timings) if timings else 0:,} run timings into {database}", file=sys.stderr)
+            if skipped:
+                print(f"⚠️  DuckDB {duckdb.__version__} is too old for {', '.join(skipped)} "
+                      f"(needs 1.3 or newer)", file=sys.stderr)
+            if args.sql:
+                for row in connection.execute(args.sql).fetchall():
+                    print('\t'.join('' if value is None else str(value) for value in row))
+    except duckdb.Error as error:
+        raise QueryError(f'DuckDB: {error}') from error
+    return 0
+
+
+def run_command(query, args):
+    if args.command == 'upstream':
+        return run_upstream(query, args)
+    if args.command == 'columns':
+        return run_columns(query, args)
+    if args.command == 'impact':
+        return run_impact(query, args)
+    if args.command == 'critical-path':
+        return run_critical_path(query, args)
+    if args.command == 'simulate':
+        return run_simulate(query, args)
+    if args.command == 'export':
+        return run_export(query, args)
+    if args.command == 'duckdb':
+        return run_duckdb(query, args)
+    return run_related(query, args)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    profiler = profiler_from_args(args)
+    try:
+        if args.command == 'diff':
+            with profiler.stage('diff'):
+                return run_diff(args)
+        if args.command == 'serve':
+            with profiler.stage('serve'):
+                return run_serve(args)
+        with profiler.stage('load') as record:
+            query = load_query(args)
+            record.update(graph_counts(query.graph))
+        with profiler.stage(args.command, **graph_counts(query.graph)):
+            return run_command(query, args)
+    except (QueryError, ImportError) as error:
+        print(f"❌ Error: {error}", file=sys.stderr)
+        return 2
+    finally:
+        # Results go to stdout, so the profile goes to stderr
+        profiler.finish(file=sys.stderr)
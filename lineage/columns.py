@@ -0,0 +1,334 @@
+"""
+Column-level lineage from compiled SQL.
+
+Every model and snapshot in the manifest carries its compiled SQL once
+`dbt compile` (or `dbt docs generate`) has run. Each statement is parsed
+with sqlglot, which is optional and only imported by the worker processes.
+Every output column is traced through CTEs, joins, CASE expressions and
+function calls down to the physical tables it reads. Those tables are then
+mapped back to manifest nodes through their `relation_name`.
+
+Nodes are parsed in dependency waves across a process pool. Each wave
+already knows the output columns of everything upstream, so `select *`
+expands to real columns. Results are cached per node, keyed by the node
+checksum, its compiled SQL and the upstream columns it was resolved
+against, so a re-run only parses the models that changed. The results are
+spread over COLUMN_CACHE_SHARDS cache entries by key prefix, so a run only
+loads the shards it needs and only rewrites those that gained results.
+"""
+
+import hashlib
+import os
+from collections import deque
+
+from lineage.manifest import LINEAGE_FIELDS, iter_manifest
+
+
+# Bump whenever the parsing or the cached result format changes
+COLUMN_EXTRACTOR_VERSION = 1
+
+COLUMN_FIELDS = LINEAGE_FIELDS + ('relation_name', 'compiled_code', 'compiled_sql', 'columns')
+
+# Resource types whose compiled SQL defines a relation
+SQL_RESOURCE_TYPES = ('model', 'snapshot')
+
+DEFAULT_DIALECT = 'duckdb'
+
+# Below this many nodes to parse, a process pool costs more than it saves
+POOL_THRESHOLD = 32
+
+# Cached per-node results kept across runs (oldest dropped first)
+MAX_CACHED_NODES = 100_000
+
+# Cache entries the per-node results are spread over (256 = two hex digits)
+COLUMN_CACHE_SHARDS = 256
+
+_CACHE_KEY = f'columns-v{COLUMN_EXTRACTOR_VERSION}'
+
+
+def _split_relation(relation_name):
+    """'"db"."main"."orders"' -> ('db', 'main', 'orders'), lowercased."""
+    return tuple(part.strip('"`[]').lower() for part in relation_name.split('.'))
+
+
+def _schema_for(relations):
+    """Nested {catalog: {db: {table: {column: type}}}} for sqlglot, deepest parts only."""
+    if not relations:
+        return {}
+    depth = max(len(parts) for parts, _ in relations)
+    schema = {}
+    for parts, columns in relations:
+        if len(parts) != depth or not columns:
+            continue
+        level = schema
+        for part in parts[:-1]:
+            level = level.setdefault(part, {})
+        level[parts[-1]] = {column: 'UNKNOWN' for column in columns}
+    return schema
+
+
+def trace_columns(sql, schema=None, dialect=DEFAULT_DIALECT):
+    """
+    Map every output column of `sql` to the physical columns it reads.
+
+    Returns {column: [(relation_parts, source_column), ...]}. Columns read
+    through a `select *` of a table with unknown columns are assumed to keep
+    their name.
+    """
+    import inspect
+
+    import sqlglot
+    from sqlglot import exp
+    from sqlglot.lineage import lineage
+    from sqlglot.optimizer.qualify import qualify
+    from sqlglot.optimizer.scope import build_scope
+
+    schema = schema or {}
+    expression = qualify(sqlglot.parse_one(sql, dialect=dialect), schema=schema,
+                         dialect=dialect, validate_qualify_columns=False)
+    scope = build_scope(expression)
+    # Skip the defensive deep copy per column where sqlglot allows it
+    options = {'copy': False} if 'copy' in inspect.signature(lineage).parameters else {}
+    result = {}
+    for column in expression.named_selects:
+        root = lineage(column, expression, schema=schema, dialect=dialect,
+                       scope=scope, trim_selects=False, **options)
+        sources = []
+        # Track the column name each branch was reached through: a leaf read
+        # via `select *` passes that column through under the same name
+        stack = [(root, column.lower())]
+        while stack:
+            node, through = stack.pop()
+            name = node.name.split('.')[-1].strip('"').lower()
+            if name == '*':
+                name = through
+            if node.downstream:
+                stack.extend((child, name) for child in reversed(node.downstream))
+            elif isinstance(node.source, exp.Table):
+                source = (tuple(part.name.lower() for part in node.source.parts), name)
+                if source not in sources:
+                    sources.append(source)
+        result[column] = sources
+    return result
+
+
+def _parse_task(task):
+    """Process pool entry point: (unique_id, key, result, error)."""
+    unique_id, key, sql, schema, dialect = task
+    try:
+        return unique_id, key, trace_columns(sql, schema, dialect), None
+    except Exception as error:  # sqlglot raises many error types; keep the batch going
+        return unique_id, key, {}, f'{type(error).__name__}: {error}'
+
+
+def _task_key(checksum, sql, schema):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f'{_CACHE_KEY}\0{checksum}\0{sql}\0{schema!r}'.encode())
+    return digest.hexdigest()
+
+
+def _shard_key(key):
+    """Cache entry holding the result for task `key`."""
+    return f'{_CACHE_KEY}-{key[:2]}'
+
+
+def _waves(records, sql_ids):
+    """Group SQL nodes by their depth among SQL nodes (parents first)."""
+    depth = {}
+
+    def depth_of(unique_id):
+        stack = [unique_id]
+        while stack:
+            node = stack[-1]
+            pending = [parent for parent in records[node].get('depends_on', {}).get('nodes', [])
+                       if parent in sql_ids and parent not in depth and parent not in stack]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            parents = [depth[parent] for parent in records[node].get('depends_on', {}).get('nodes', [])
+                       if parent in depth]
+            depth[node] = max(parents) + 1 if parents else 0
+        return depth[unique_id]
+
+    waves = {}
+    for unique_id in sql_ids:
+        waves.setdefault(depth_of(unique_id), []).append(unique_id)
+    return [waves[k] for k in sorted(waves)]
+
+
+class ColumnLineage:
+    """Column-to-column edges across a dbt project."""
+
+    def __init__(self, columns, sources, errors):
+        # {unique_id: [column, ...]} output columns per node
+        self.columns = columns
+        # {(unique_id, column): [(upstream unique_id or relation, column), ...]}
+        self.sources = sources
+        # {unique_id: message} for nodes whose SQL could not be traced
+        self.errors = errors
+        self._consumers = None
+
+    def __len__(self):
+        return len(self.sources)
+
+    @property
+    def consumers(self):
+        """Reverse edges: {(unique_id, column): [(downstream unique_id, column), ...]}."""
+        if self._consumers is None:
+            consumers = {}
+            for target, sources in self.sources.items():
+                for source in sources:
+                    consumers.setdefault(source, []).append(target)
+            self._consumers = consumers
+        return self._consumers
+
+    def _walk(self, start, edges_of, depth):
+        distance = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if depth is not None and distance[current] >= depth:
+                continue
+            for other in edges_of(current):
+                if other not in distance:
+                    distance[other] = distance[current] + 1
+                    queue.append(other)
+        del distance[start]
+        return distance
+
+    def upstream(self, unique_id, column, depth=None):
+        """{(unique_id, column): hops} for every column `column` derives from."""
+        return self._walk((unique_id, column.lower()), lambda c: self.sources.get(c, ()), depth)
+
+    def downstream(self, unique_id, column, depth=None):
+        """{(unique_id, column): hops} for every column affected by a change to `column`."""
+        consumers = self.consumers
+
+        def edges_of(current):
+            # A column also feeds everything that read its table through a star
+            return consumers.get(current, []) + consumers.get((current[0], '*'), [])
+
+        return self._walk((unique_id, column.lower()), edges_of, depth)
+
+
+def extract_column_lineage(manifest_path, dialect=DEFAULT_DIALECT, workers=None, cache=None):
+    """
+    Build ColumnLineage for every model and snapshot in a manifest.
+
+    `workers` is the process pool size (default: CPU count; 1 parses in
+    this process). `cache` is an optional lineage.cache.LineageCache used
+    to keep per-node results between runs.
+    """
+    records = {}
+    for _, unique_id, record in iter_manifest(manifest_path, fields=COLUMN_FIELDS):
+        records[unique_id] = record
+
+    relation_ids = {}
+    known_columns = {}
+    for unique_id, record in records.items():
+        if record.get('relation_name'):
+            relation_ids.setdefault(_split_relation(record['relation_name']), unique_id)
+        documented = [name.lower() for name in record.get('columns') or {}]
+        if documented:
+            known_columns[unique_id] = documented
+
+    # {suffix: [unique_id, ...]} for every suffix of every relation name
+    suffix_ids = {}
+    for relation, unique_id in relation_ids.items():
+        for size in range(1, len(relation) + 1):
+            suffix_ids.setdefault(relation[-size:], []).append(unique_id)
+
+    def resolve(parts):
+        # Match on the longest suffix (catalog.db.table, db.table, table)
+        for size in range(len(parts), 0, -1):
+            matches = suffix_ids.get(parts[-size:], ())
+            if len(matches) == 1:
+                return matches[0]
+        return '.'.join(parts)
+
+    sql_ids = {unique_id for unique_id, record in records.items()
+               if record.get('resource_type') in SQL_RESOURCE_TYPES
+               and (record.get('compiled_code') or record.get('compiled_sql'))}
+    if sql_ids:
+        try:
+            import sqlglot  # noqa: F401  (fail here rather than once per worker task)
+        except ImportError as error:
+            raise ImportError('column lineage needs sqlglot: pip install sqlglot') from error
+
+    shards = {}
+    used = {}
+    parsed = set()
+    keys = {}
+    columns, sources, errors = {}, {}, {}
+    resolved_relations = {}
+
+    workers = workers or os.cpu_count() or 1
+    executor = None
+    try:
+        for wave in _waves(records, sql_ids):
+            tasks = []
+            for unique_id in wave:
+                record = records[unique_id]
+                sql = record.get('compiled_code') or record.get('compiled_sql')
+                upstream = []
+                for parent in record.get('depends_on', {}).get('nodes', []):
+                    relation = records.get(parent, {}).get('relation_name')
+                    if relation and parent in known_columns:
+                        upstream.append((_split_relation(relation), known_columns[parent]))
+                schema = _schema_for(sorted(upstream))
+                key = keys[unique_id] = _task_key(record.get('checksum', ''), sql, schema)
+                shard = _shard_key(key)
+                if shard not in shards:
+                    shards[shard] = (cache.get(shard) if cache is not None else None) or {}
+                if key in shards[shard]:
+                    used[key] = shards[shard][key]
+                else:
+                    tasks.append((unique_id, key, sql, schema, dialect))
+            if tasks:
+                if workers > 1 and len(tasks) >= POOL_THRESHOLD:
+                    if executor is None:
+                        from concurrent.futures import ProcessPoolExecutor
+                        executor = ProcessPoolExecutor(max_workers=workers)
+                    chunksize = max(1, len(tasks) // (workers * 4))
+                    results = executor.map(_parse_task, tasks, chunksize=chunksize)
+                else:
+                    results = map(_parse_task, tasks)
+                for _, key, traced, error in results:
+                    used[key] = (traced, error)
+                    parsed.add(key)
+
+            for unique_id in wave:
+                traced, error = used[keys[unique_id]]
+                if error:
+                    errors[unique_id] = error
+                if traced:
+                    known_columns[unique_id] = list(traced)
+                columns[unique_id] = known_columns.get(unique_id, [])
+                for column, column_sources in traced.items():
+                    edges = []
+                    for parts, source_column in column_sources:
+                        if parts not in resolved_relations:
+                            resolved_relations[parts] = resolve(parts)
+                        edges.append((resolved_relations[parts], source_column))
+                    sources[(unique_id, column)] = edges
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if cache is not None and parsed:
+        limit = max(1, MAX_CACHED_NODES // COLUMN_CACHE_SHARDS)
+        for shard in {_shard_key(key) for key in parsed}:
+            entries = shards[shard]
+            # Re-insert this run's entries last so the oldest ones are dropped first
+            for key in used:
+                if _shard_key(key) == shard:
+                    entries.pop(key, None)
+                    entries[key] = used[key]
+            while len(entries) > limit:
+                del entries[next(iter(entries))]
+            cache.put(shard, entries)
+
+    for unique_id, names in known_columns.items():
+        columns.setdefault(unique_id, names)
+    return ColumnLineage(columns, sources, errors)
@@ -0,0 +1,204 @@
+"""
+Lineage tables in the project's DuckDB database.
+
+load_into_duckdb() replaces the tables of the `lineage` schema in one
+transaction:
+
+    lineage.nodes        idx, unique_id, name, resource_type, checksum
+    lineage.edges        parent, child (idx of the nodes)
+    lineage.run_timings  idx, seconds, status (from run_results.json)
+
+The rows are streamed to temporary CSV files and each table is filled by
+DuckDB's own CSV reader in a single INSERT. Converting Python values one
+by one through the client API is about 100 times slower.
+
+The schema also gets table macros and views, so lineage questions run as
+vectorized SQL inside the database next to the data they describe:
+
+    SELECT * FROM lineage.ancestors('dim_customers');
+    SELECT * FROM lineage.descendants('model.lineage_demo.stg_orders');
+    SELECT * FROM lineage.fan_out ORDER BY children DESC LIMIT 10;
+    SELECT * FROM lineage.slowest_path;
+    SELECT * FROM lineage.slowest_path_to('fct_customer_metrics');
+
+Nodes can be named by unique_id or by name. The slowest-path views use
+recursive CTEs with USING KEY and need DuckDB 1.3 or newer. On older
+versions they are skipped and the other views are still created.
+"""
+
+import csv
+import tempfile
+from pathlib import Path
+
+from lineage.graph import NODE_TYPES
+
+
+SCHEMA = 'lineage'
+
+# <project>/dev.duckdb, as in the profiles.yml of the example projects
+DEFAULT_DATABASE_NAME = 'dev.duckdb'
+
+# Column types per table, in table order; also the read_csv() schema
+COLUMNS = {
+    'nodes': (('idx', 'INTEGER'), ('unique_id', 'VARCHAR'), ('name', 'VARCHAR'),
+              ('resource_type', 'VARCHAR'), ('checksum', 'VARCHAR')),
+    'edges': (('parent', 'INTEGER'), ('child', 'INTEGER')),
+    'run_timings': (('idx', 'INTEGER'), ('seconds', 'DOUBLE'), ('status', 'VARCHAR')),
+}
+
+TABLES = f"""
+CREATE SCHEMA IF NOT EXISTS {SCHEMA};
+CREATE OR REPLACE TABLE {SCHEMA}.nodes (
+    idx INTEGER PRIMARY KEY,
+    unique_id VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    resource_type VARCHAR NOT NULL,
+    checksum VARCHAR
+);
+CREATE OR REPLACE TABLE {SCHEMA}.edges (parent INTEGER NOT NULL, child INTEGER NOT NULL);
+CREATE OR REPLACE TABLE {SCHEMA}.run_timings (idx INTEGER PRIMARY KEY, seconds DOUBLE, status VARCHAR);
+"""
+
+# The depth bound stops the walks on graphs with cycles
+MACROS = f"""
+CREATE OR REPLACE MACRO {SCHEMA}.ancestors(node) AS TABLE
+    WITH RECURSIVE walk(idx, depth) AS (
+        SELECT idx, 0 FROM {SCHEMA}.nodes WHERE unique_id = node OR name = node
+        UNION
+        SELECT e.parent, w.depth + 1 FROM walk w JOIN {SCHEMA}.edges e ON e.child = w.idx
+        WHERE w.depth < (SELECT count(*) FROM {SCHEMA}.nodes)
+    )
+    SELECT n.unique_id, n.name, n.resource_type, min(w.depth) AS depth
+    FROM walk w JOIN {SCHEMA}.nodes n USING (idx)
+    WHERE w.depth > 0
+    GROUP BY ALL
+    ORDER BY depth, n.unique_id;
+
+CREATE OR REPLACE MACRO {SCHEMA}.descendants(node) AS TABLE
+    WITH RECURSIVE walk(idx, depth) AS (
+        SELECT idx, 0 FROM {SCHEMA}.nodes WHERE unique_id = node OR name = node
+        UNION
+        SELECT e.child, w.depth + 1 FROM walk w JOIN {SCHEMA}.edges e ON e.parent = w.idx
+        WHERE w.depth < (SELECT count(*) FROM {SCHEMA}.nodes)
+    )
+    SELECT n.unique_id, n.name, n.resource_type, min(w.depth) AS depth
+    FROM walk w JOIN {SCHEMA}.nodes n USING (idx)
+    WHERE w.depth > 0
+    GROUP BY ALL
+    ORDER BY depth, n.unique_id;
+
+CREATE OR REPLACE VIEW {SCHEMA}.fan_out AS
+    SELECT n.idx, n.unique_id, n.name, n.resource_type,
+           (SELECT count(*) FROM {SCHEMA}.edges e WHERE e.child = n.idx) AS parents,
+           (SELECT count(*) FROM {SCHEMA}.edges e WHERE e.parent = n.idx) AS children
+    FROM {SCHEMA}.nodes n;
+"""
+
+# Longest path by execution time: each node's finish is its own time plus
+# the latest finish among its parents. USING KEY keeps one row per node and
+# a node is only revisited when a parent's finish improves it.
+SLOWEST_PATH_MACROS = f"""
+CREATE OR REPLACE VIEW {SCHEMA}.finish_times AS
+    WITH RECURSIVE weights AS (
+        SELECT n.idx, greatest(coalesce(t.seconds, 0), 0) AS seconds
+        FROM {SCHEMA}.nodes n LEFT JOIN {SCHEMA}.run_timings t USING (idx)
+    ), finish(idx, finish, via) USING KEY (idx) AS (
+        SELECT idx, seconds, NULL::INTEGER FROM weights
+        WHERE idx NOT IN (SELECT child FROM {SCHEMA}.edges)
+        UNION
+        SELECT e.child, max(f.finish + w.seconds), arg_max(f.idx, f.finish + w.seconds)
+        FROM finish f
+        JOIN {SCHEMA}.edges e ON e.parent = f.idx
+        JOIN weights w ON w.idx = e.child
+        LEFT JOIN recurring.finish r ON r.idx = e.child
+        WHERE r.idx IS NULL OR f.finish + w.seconds > r.finish
+        GROUP BY e.child
+    )
+    SELECT n.idx, n.unique_id, n.name, w.seconds, f.finish, f.via
+    FROM finish f JOIN {SCHEMA}.nodes n USING (idx) JOIN weights w USING (idx);
+
+CREATE OR REPLACE MACRO {SCHEMA}.slowest_path_to(node) AS TABLE
+    WITH RECURSIVE path(idx, step) AS ((
+        SELECT idx, 0 FROM {SCHEMA}.finish_times
+        WHERE unique_id = node OR name = node
+        ORDER BY finish DESC LIMIT 1
+    ) UNION ALL (
+        SELECT f.via, p.step + 1 FROM path p JOIN {SCHEMA}.finish_times f USING (idx)
+        WHERE f.via IS NOT NULL
+    ))
+    SELECT f.unique_id, f.name, f.seconds, f.finish - f.seconds AS start, f.finish
+    FROM path p JOIN {SCHEMA}.finish_times f USING (idx)
+    ORDER BY p.step DESC;
+
+CREATE OR REPLACE VIEW {SCHEMA}.slowest_path AS
+    SELECT * FROM {SCHEMA}.slowest_path_to(
+        (SELECT unique_id FROM {SCHEMA}.finish_times ORDER BY finish DESC, idx LIMIT 1));
+"""
+
+
+def import_duckdb():
+    """The duckdb module, or an ImportError with install instructions."""
+    try:
+        import duckdb
+    except ImportError as error:
+        raise ImportError('the DuckDB lineage tables need duckdb: pip install duckdb') from error
+    return duckdb
+
+
+def connect(database):
+    """Open (or create) a DuckDB database file."""
+    return import_duckdb().connect(str(database))
+
+
+def load_into_duckdb(graph, database, timings=None):
+    """
+    Replace the lineage tables in `database` (a path or an open connection).
+
+    `timings` is an optional lineage.timings.RunTimings. Returns the list of
+    views and macros that could not be created on this DuckDB version.
+    """
+    duckdb = import_duckdb()
+    if isinstance(database, duckdb.DuckDBPyConnection):
+        return _load(duckdb, database, graph, timings)
+    with connect(database) as connection:
+        return _load(duckdb, connection, graph, timings)
+
+
+def _bulk_insert(connection, workdir, table, rows):
+    """Fill `table` from `rows` through a temporary CSV file."""
+    path = Path(workdir) / f'{table}.csv'
+    with open(path, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+        csv.writer(f).writerows(rows)
+        written = f.tell()
+    # read_csv() cannot sniff an empty file (no edges, or no timed nodes)
+    if not written:
+        return
+    columns = ', '.join(f"'{name}': '{column_type}'" for name, column_type in COLUMNS[table])
+    connection.execute(f"INSERT INTO {SCHEMA}.{table} SELECT * FROM read_csv(?, header = false, "
+                       f"quote = '\"', escape = '\"', columns = {{{columns}}})", [str(path)])
+
+
+def _load(duckdb, connection, graph, timings):
+    skipped = []
+    connection.execute('BEGIN TRANSACTION')
+    try:
+        connection.execute(TABLES)
+        with tempfile.TemporaryDirectory(prefix='lineage-duckdb-') as workdir:
+            _bulk_insert(connection, workdir, 'nodes', zip(
+                range(len(graph)), graph.ids, graph.names,
+                (NODE_TYPES[code] for code in graph.types), graph.checksums))
+            _bulk_insert(connection, workdir, 'edges', graph.edges())
+            if timings is not None:
+                _bulk_insert(connection, workdir, 'run_timings', (
+                    (i, duration, timings.statuses[i])
+                    for i, duration in enumerate(timings.durations) if duration >= 0))
+        connection.execute(MACROS)
+        try:
+            connection.execute(SLOWEST_PATH_MACROS)
+        except duckdb.ParserException:
+            skipped.extend(('finish_times', 'slowest_path_to', 'slowest_path'))
+        connection.execute('COMMIT')
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    return skipped
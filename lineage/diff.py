@@ -0,0 +1,198 @@
+"""
+Structural diff between two manifests.
+
+Both manifests are streamed once. Every node is reduced to a 16-byte
+signature of its name, type, checksum and dependencies, plus separate
+hashes of its checksum and of its name and type, so unchanged nodes
+(nearly all of them between two daily builds) are matched with one bytes
+comparison. Only the nodes whose signature differs, or that depend on an
+added or removed node, have their edges compared. The diff is linear in
+the size of the manifests.
+
+delta_subgraph() turns a ManifestDiff into a small LineageGraph of the
+changed nodes and their neighbours, with colours per node and per edge,
+which the PNG, SVG and HTML renderers draw as a highlighted delta.
+"""
+
+import hashlib
+
+from lineage.graph import GraphBuilder, record_type
+from lineage.manifest import iter_manifest
+
+
+DELTA_COLORS = {
+    'added': '#2CA02C',
+    'removed': '#D62728',
+    'changed': '#FF7F0E',
+    'context': '#D3D3D3',
+}
+UNCHANGED_EDGE_COLOR = '#B0B0B0'
+
+DELTA_LABELS = {
+    'added': 'Added',
+    'removed': 'Removed',
+    'changed': 'Changed',
+    'context': 'Unchanged neighbour',
+}
+
+
+def _digest(*parts):
+    return hashlib.blake2b('\0'.join(parts).encode(), digest_size=8).digest()
+
+
+def manifest_signatures(manifest_path):
+    """
+    {unique_id: (signature, checksum_hash, metadata_hash, parent_ids)} for a manifest.
+
+    The signature covers name, type, checksum and the raw dependency list;
+    metadata_hash covers name and type only.
+    """
+    signatures = {}
+    for section, unique_id, record in iter_manifest(manifest_path):
+        name = record.get('name', unique_id)
+        node_type = record_type(section, record)
+        checksum = record.get('checksum', '') or ''
+        parents = tuple(record.get('depends_on', {}).get('nodes', []))
+        signature = _digest(name, node_type, checksum) + _digest(*parents)
+        signatures[unique_id] = (signature, _digest(checksum), _digest(name, node_type), parents)
+    return signatures
+
+
+class ManifestDiff:
+    """
+    Nodes and edges that differ between two manifests.
+
+    `changed` maps unique_id to the reasons it changed: 'checksum' (its
+    code changed), 'metadata' (name or type) and/or 'dependencies'. Edges
+    are (parent unique_id, child unique_id) pairs between nodes that exist
+    in the respective manifest.
+    """
+
+    __slots__ = ('added', 'removed', 'changed', 'added_edges', 'removed_edges')
+
+    def __init__(self, added=(), removed=(), changed=None, added_edges=(), removed_edges=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.changed = dict(changed or {})
+        self.added_edges = list(added_edges)
+        self.removed_edges = list(removed_edges)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed
+                    or self.added_edges or self.removed_edges)
+
+    def __repr__(self):
+        return (f'ManifestDiff(added={len(self.added)}, removed={len(self.removed)}, '
+                f'changed={len(self.changed)}, added_edges={len(self.added_edges)}, '
+                f'removed_edges={len(self.removed_edges)})')
+
+    def checksum_changes(self):
+        return [unique_id for unique_id, reasons in self.changed.items() if 'checksum' in reasons]
+
+    def to_dict(self):
+        return {
+            'added': self.added,
+            'removed': self.removed,
+            'changed': self.changed,
+            'added_edges': [list(edge) for edge in self.added_edges],
+            'removed_edges': [list(edge) for edge in self.removed_edges],
+        }
+
+
+def diff_signatures(previous, current):
+    """Compare two manifest_signatures() results."""
+    added = [unique_id for unique_id in current if unique_id not in previous]
+    removed = [unique_id for unique_id in previous if unique_id not in current]
+    appeared = set(added) | set(removed)
+    diff = ManifestDiff(added, removed)
+
+    def edges_of(signatures, unique_id):
+        if unique_id not in signatures:
+            return ()
+        # Dependencies on nodes outside the manifest are not edges, as in GraphBuilder
+        return dict.fromkeys(parent for parent in signatures[unique_id][3] if parent in signatures)
+
+    for unique_id, (signature, checksum, metadata, parents) in current.items():
+        before = previous.get(unique_id)
+        if before is not None and before[0] == signature and not appeared.intersection(parents):
+            continue
+        old_edges = edges_of(previous, unique_id)
+        new_edges = edges_of(current, unique_id)
+        diff.added_edges.extend((parent, unique_id) for parent in new_edges if parent not in old_edges)
+        diff.removed_edges.extend((parent, unique_id) for parent in old_edges if parent not in new_edges)
+        if before is None:
+            continue
+        reasons = []
+        if before[1] != checksum:
+            reasons.append('checksum')
+        if before[2] != metadata:
+            reasons.append('metadata')
+        if set(old_edges) != set(new_edges):
+            reasons.append('dependencies')
+        if reasons:
+            diff.changed[unique_id] = reasons
+    for unique_id in removed:
+        diff.removed_edges.extend((parent, unique_id) for parent in edges_of(previous, unique_id))
+    return diff
+
+
+def diff_manifests(previous_path, current_path):
+    """Stream both manifests and return their ManifestDiff."""
+    return diff_signatures(manifest_signatures(previous_path), manifest_signatures(current_path))
+
+
+def delta_subgraph(diff, previous, current, context=1):
+    """
+    The changed part of the lineage as its own graph.
+
+    `previous` and `current` are the LineageGraphs of the two manifests.
+    The result holds every added, removed and changed node, their
+    neighbours up to `context` hops away in either graph, and the edges of
+    both versions between them. Returns (graph, node_colors, edge_colors,
+    legend) ready for lineage.render and lineage.viewer.
+    """
+    status = {unique_id: 'added' for unique_id in diff.added}
+    status.update((unique_id, 'removed') for unique_id in diff.removed)
+    status.update((unique_id, 'changed') for unique_id in diff.changed)
+    for edge in diff.added_edges + diff.removed_edges:
+        for unique_id in edge:
+            status.setdefault(unique_id, 'changed')
+
+    frontier = list(status)
+    for _ in range(context):
+        reached = []
+        for unique_id in frontier:
+            for graph in (previous, current):
+                i = graph.index.get(unique_id)
+                if i is None:
+                    continue
+                for j in list(graph.parents(i)) + list(graph.children(i)):
+                    neighbour = graph.ids[j]
+                    if neighbour not in status:
+                        status[neighbour] = 'context'
+                        reached.append(neighbour)
+        frontier = reached
+
+    builder = GraphBuilder()
+    for unique_id in status:
+        graph = current if unique_id in current.index else previous
+        i = graph.index[unique_id]
+        builder.add_node(unique_id, graph.names[i], graph.node_type(i))
+    removed_edges = set(diff.removed_edges)
+    added_edges = set(diff.added_edges)
+    for graph in (current, previous):
+        for parent, child in graph.edges():
+            parent_id, child_id = graph.ids[parent], graph.ids[child]
+            if parent_id in builder.index and child_id in builder.index:
+                builder.add_dependencies(builder.index[child_id], [parent_id])
+    subgraph = builder.build()
+
+    node_colors = [DELTA_COLORS[status[unique_id]] for unique_id in subgraph.ids]
+    edge_colors = []
+    for parent, child in subgraph.edges():
+        edge = (subgraph.ids[parent], subgraph.ids[child])
+        edge_colors.append(DELTA_COLORS['added'] if edge in added_edges else
+                           DELTA_COLORS['removed'] if edge in removed_edges else UNCHANGED_EDGE_COLOR)
+    present = set(status.values())
+    legend = [(label, DELTA_COLORS[key]) for key, label in DELTA_LABELS.items() if key in present]
+    return subgraph, node_colors, edge_colors, legend
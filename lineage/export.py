@@ -0,0 +1,158 @@
+"""
+Lineage export for catalogs and other downstream tools.
+
+The graph is written as two tables in one pass:
+
+    nodes: index (int32), unique_id, name, resource_type (dictionary), checksum
+    edges: parent (int32), child (int32), grouped by parent
+
+Edge endpoints are row numbers in the node table, so a consumer joins them
+without any string matching. The Parquet and Arrow IPC (Feather v2) tables
+are built straight from the LineageGraph arrays. The index and CSR columns
+and the one-byte resource types are handed to pyarrow as buffers rather
+than converted value by value. Arrow files are uncompressed, so readers can
+memory-map them and read zero-copy. GraphML is streamed one element per
+line, like write_svg(), and needs neither pyarrow nor networkx.
+"""
+
+from array import array
+from html import escape
+from pathlib import Path
+
+from lineage.graph import INDEX_TYPECODE, NODE_TYPES
+
+
+EXPORT_FORMATS = ('parquet', 'arrow', 'graphml')
+
+FILE_NAMES = {
+    'parquet': ('nodes.parquet', 'edges.parquet'),
+    'arrow': ('nodes.arrow', 'edges.arrow'),
+    'graphml': ('lineage.graphml',),
+}
+
+# Stored in the schema metadata so readers can tell incompatible exports apart
+EXPORT_VERSION = '1'
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError('Parquet/Arrow export needs pyarrow: pip install pyarrow') from error
+    return pyarrow
+
+
+def edge_parents(graph):
+    """Parent index of every edge in edges() order, as an int32 array."""
+    offsets = graph.child_offsets
+    parents = array(INDEX_TYPECODE)
+    for parent in range(len(graph)):
+        count = offsets[parent + 1] - offsets[parent]
+        if count:
+            parents.extend(array(INDEX_TYPECODE, (parent,)) * count)
+    return parents
+
+
+def _int32_column(pa, values):
+    # array('i') already has Arrow's int32 layout: hand over the buffer as is
+    if values.itemsize != 4:
+        return pa.array(values, type=pa.int32())
+    return pa.Array.from_buffers(pa.int32(), len(values), [None, pa.py_buffer(values)])
+
+
+def lineage_tables(graph):
+    """Return (nodes, edges) pyarrow Tables for a LineageGraph."""
+    pa = _pyarrow()
+    n = len(graph)
+    types = pa.DictionaryArray.from_arrays(
+        pa.Array.from_buffers(pa.uint8(), n, [None, pa.py_buffer(bytes(graph.types))]),
+        pa.array(NODE_TYPES, type=pa.string()))
+    metadata = {'lineage.export_version': EXPORT_VERSION}
+    nodes = pa.table({
+        'index': _int32_column(pa, array(INDEX_TYPECODE, range(n))),
+        'unique_id': pa.array(graph.ids, type=pa.string()),
+        'name': pa.array(graph.names, type=pa.string()),
+        'resource_type': types,
+        'checksum': pa.array(graph.checksums, type=pa.string()),
+    }, metadata=metadata)
+    edges = pa.table({
+        'parent': _int32_column(pa, edge_parents(graph)),
+        'child': _int32_column(pa, graph.child_indices),
+    }, metadata=metadata)
+    return nodes, edges
+
+
+def write_parquet(graph, nodes_path, edges_path, tables=None):
+    _pyarrow()
+    import pyarrow.parquet as pq
+
+    nodes, edges = tables or lineage_tables(graph)
+    pq.write_table(nodes, nodes_path)
+    pq.write_table(edges, edges_path)
+    return nodes_path, edges_path
+
+
+def write_arrow(graph, nodes_path, edges_path, tables=None):
+    _pyarrow()
+    import pyarrow.feather as feather
+
+    nodes, edges = tables or lineage_tables(graph)
+    # Uncompressed so the files can be memory-mapped
+    feather.write_feather(nodes, nodes_path, compression='uncompressed')
+    feather.write_feather(edges, edges_path, compression='uncompressed')
+    return nodes_path, edges_path
+
+
+def write_graphml(graph, output_path):
+    """Stream the graph to a GraphML file (node ids are unique_ids)."""
+    ids = graph.ids
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as out:
+        write = out.write
+        write('<?xml version="1.0" encoding="UTF-8"?>\n'
+              '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+              '<key id="name" for="node" attr.name="name" attr.type="string"/>\n'
+              '<key id="type" for="node" attr.name="resource_type" attr.type="string"/>\n'
+              '<key id="checksum" for="node" attr.name="checksum" attr.type="string"/>\n'
+              '<graph id="lineage" edgedefault="directed">\n')
+        for i in range(len(graph)):
+            write(f'<node id="{escape(ids[i])}"><data key="name">{escape(graph.names[i])}</data>'
+                  f'<data key="type">{NODE_TYPES[graph.types[i]]}</data>'
+                  f'<data key="checksum">{escape(graph.checksums[i])}</data></node>\n')
+        for parent, child in graph.edges():
+            write(f'<edge source="{escape(ids[parent])}" target="{escape(ids[child])}"/>\n')
+        write('</graph>\n</graphml>\n')
+    return output_path
+
+
+def export_lineage(graph, output_dir, formats=('parquet',)):
+    """
+    Write the graph to `output_dir` in each of `formats` (see EXPORT_FORMATS).
+
+    Returns the paths written. pyarrow is only imported for parquet/arrow.
+    """
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"unknown export format(s): {', '.join(unknown)}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    # Built once and shared by the Parquet and Arrow writers
+    tables = lineage_tables(graph) if {'parquet', 'arrow'} & set(formats) else None
+    for fmt in formats:
+        targets = [output_dir / name for name in FILE_NAMES[fmt]]
+        if fmt == 'parquet':
+            write_parquet(graph, *targets, tables=tables)
+        elif fmt == 'arrow':
+            write_arrow(graph, *targets, tables=tables)
+        else:
+            write_graphml(graph, *targets)
+        paths.extend(targets)
+    return paths
+
+
+def read_arrow(nodes_path, edges_path):
+    """Memory-map an Arrow export; returns (nodes, edges) Tables without copying."""
+    _pyarrow()
+    import pyarrow.feather as feather
+
+    return feather.read_table(nodes_path, memory_map=True), feather.read_table(edges_path, memory_map=True)
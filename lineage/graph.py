@@ -0,0 +1,227 @@
+"""
+Compact lineage graph.
+
+Nodes are numbered 0..n-1 in manifest order. Unique ids and names are interned
+strings held in plain lists, resource types are one byte per node, and the
+per-node manifest checksums are kept for incremental updates. The
+parent/child adjacency is stored CSR-style: for node i its parents are
+parent_indices[parent_offsets[i]:parent_offsets[i + 1]] in depends_on order,
+and its children are child_indices[child_offsets[i]:child_offsets[i + 1]] in
+index order. This is a fraction of the memory of a networkx DiGraph with an
+attribute dict per node; call to_networkx() only where networkx is needed.
+"""
+
+import sys
+from array import array
+
+from lineage.manifest import iter_manifest
+
+
+# Resource types stored as one byte per node; unknown types map to 0
+NODE_TYPES = (
+    'unknown', 'seed', 'model', 'source', 'snapshot', 'test',
+    'analysis', 'operation', 'sql_operation', 'exposure', 'metric',
+    'semantic_model', 'saved_query', 'unit_test',
+)
+_TYPE_CODES = {node_type: code for code, node_type in enumerate(NODE_TYPES)}
+
+# Signed 32-bit indices are plenty for any dbt project
+INDEX_TYPECODE = 'i'
+
+
+class LineageGraph:
+    """Immutable lineage DAG with interned node ids and CSR adjacency."""
+
+    __slots__ = (
+        'ids', 'names', 'types', 'checksums', 'index',
+        'parent_offsets', 'parent_indices', 'child_offsets', 'child_indices',
+    )
+
+    def __init__(self, ids, names, types, checksums, parent_offsets, parent_indices,
+                 child_offsets, child_indices):
+        self.ids = ids
+        self.names = names
+        self.types = types
+        self.checksums = checksums
+        self.index = {unique_id: i for i, unique_id in enumerate(ids)}
+        self.parent_offsets = parent_offsets
+        self.parent_indices = parent_indices
+        self.child_offsets = child_offsets
+        self.child_indices = child_indices
+
+    def __reduce__(self):
+        # The id -> index map is rebuilt on load rather than pickled
+        return (LineageGraph, (
+            self.ids, self.names, self.types, self.checksums,
+            self.parent_offsets, self.parent_indices,
+            self.child_offsets, self.child_indices,
+        ))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, unique_id):
+        return unique_id in self.index
+
+    def __iter__(self):
+        return iter(range(len(self.ids)))
+
+    def number_of_nodes(self):
+        return len(self.ids)
+
+    def number_of_edges(self):
+        return len(self.parent_indices)
+
+    def node_type(self, i):
+        return NODE_TYPES[self.types[i]]
+
+    def parents(self, i):
+        return self.parent_indices[self.parent_offsets[i]:self.parent_offsets[i + 1]]
+
+    def children(self, i):
+        return self.child_indices[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def in_degree(self, i):
+        return self.parent_offsets[i + 1] - self.parent_offsets[i]
+
+    def out_degree(self, i):
+        return self.child_offsets[i + 1] - self.child_offsets[i]
+
+    def roots(self):
+        """Indices of nodes with no parents."""
+        offsets = self.parent_offsets
+        return [i for i in range(len(self.ids)) if offsets[i] == offsets[i + 1]]
+
+    def leaves(self):
+        """Indices of nodes with no children."""
+        offsets = self.child_offsets
+        return [i for i in range(len(self.ids)) if offsets[i] == offsets[i + 1]]
+
+    def edges(self):
+        """Yield (parent, child) index pairs, grouped by parent."""
+        offsets = self.child_offsets
+        children = self.child_indices
+        for parent in range(len(self.ids)):
+            for k in range(offsets[parent], offsets[parent + 1]):
+                yield parent, children[k]
+
+    def type_counts(self):
+        """Return {resource_type: count} for the nodes in the graph."""
+        counts = {}
+        for code in self.types:
+            node_type = NODE_TYPES[code]
+            counts[node_type] = counts.get(node_type, 0) + 1
+        return counts
+
+    def to_networkx(self):
+        """Build a networkx.DiGraph view with the classic node attributes."""
+        import networkx as nx
+
+        G = nx.DiGraph()
+        for i, unique_id in enumerate(self.ids):
+            name = self.names[i]
+            G.add_node(unique_id, name=name, type=self.node_type(i), label=name)
+        ids = self.ids
+        G.add_edges_from((ids[parent], ids[child]) for parent, child in self.edges())
+        return G
+
+
+def record_type(section, record):
+    """Resource type of a manifest record; everything under 'sources' is a source."""
+    if section == 'sources':
+        return 'source'
+    return record.get('resource_type', 'unknown')
+
+
+def type_code(node_type):
+    """One-byte code stored in LineageGraph.types for a resource type."""
+    return _TYPE_CODES.get(node_type, 0)
+
+
+def _csr(n, pairs):
+    """Build (offsets, indices) grouping `pairs` of (row, col) by row."""
+    offsets = array(INDEX_TYPECODE, bytes(4 * (n + 1)))
+    for row, _ in pairs:
+        offsets[row + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    indices = array(INDEX_TYPECODE, bytes(4 * len(pairs)))
+    cursor = offsets[:-1]
+    for row, col in pairs:
+        indices[cursor[row]] = col
+        cursor[row] += 1
+    return offsets, indices
+
+
+class GraphBuilder:
+    """Accumulates nodes and dependencies, then freezes them into a LineageGraph."""
+
+    def __init__(self):
+        self.ids = []
+        self.names = []
+        self.types = bytearray()
+        self.checksums = []
+        self.index = {}
+        # (parent unique_id, child index); parents may be added later
+        self._pending = []
+
+    def add_node(self, unique_id, name=None, node_type='unknown', checksum=''):
+        """Add a node if it is new and return its index."""
+        i = self.index.get(unique_id)
+        if i is not None:
+            return i
+        unique_id = sys.intern(unique_id)
+        i = len(self.ids)
+        self.index[unique_id] = i
+        self.ids.append(unique_id)
+        self.names.append(sys.intern(name) if name else unique_id)
+        self.types.append(type_code(node_type))
+        self.checksums.append(checksum or '')
+        return i
+
+    def add_dependencies(self, child_index, parent_ids):
+        for parent_id in parent_ids:
+            self._pending.append((parent_id, child_index))
+
+    def add_record(self, section, unique_id, record):
+        """Add a node (and its dependencies) from a manifest record."""
+        i = self.add_node(unique_id, record.get('name', unique_id),
+                          record_type(section, record), record.get('checksum', ''))
+        self.add_dependencies(i, record.get('depends_on', {}).get('nodes', []))
+        return i
+
+    def build(self):
+        """Resolve dependencies and return the finished LineageGraph."""
+        index = self.index
+        seen = set()
+        pairs = []
+        for parent_id, child in self._pending:
+            # Dependencies on nodes outside the manifest are dropped
+            parent = index.get(parent_id)
+            if parent is not None and (parent, child) not in seen:
+                seen.add((parent, child))
+                pairs.append((parent, child))
+        n = len(self.ids)
+        parent_offsets, parent_indices = _csr(n, [(child, parent) for parent, child in pairs])
+        child_offsets, child_indices = _csr(n, pairs)
+        return LineageGraph(
+            self.ids, self.names, bytes(self.types), self.checksums,
+            parent_offsets, parent_indices, child_offsets, child_indices,
+        )
+
+
+def extract_lineage(manifest):
+    """Extract lineage relationships from a (possibly slim) manifest dict."""
+    builder = GraphBuilder()
+    for section in ('nodes', 'sources'):
+        for unique_id, record in manifest.get(section, {}).items():
+            builder.add_record(section, unique_id, record)
+    return builder.build()
+
+
+def load_lineage(manifest_path):
+    """Stream a manifest straight into a LineageGraph."""
+    builder = GraphBuilder()
+    for section, unique_id, record in iter_manifest(manifest_path):
+        builder.add_record(section, unique_id, record)
+    return builder.build()
@@ -0,0 +1,131 @@
+"""
+Changed-model impact selection.
+
+Finds the nodes that changed between two manifests, or the nodes whose
+files changed in git, and expands them to everything downstream with the
+reachability index in lineage.query. The result is the smallest set of
+seeds, models, snapshots and tests a `dbt build` needs to run, printed as a
+ready-to-use dbt selector.
+"""
+
+import subprocess
+from pathlib import Path
+
+from lineage.manifest import iter_manifest
+from lineage.query import LineageQuery, QueryError
+
+
+# Resource types dbt can build; anything else downstream (exposures,
+# metrics, ...) is ignored
+SELECTABLE_TYPES = ('seed', 'model', 'snapshot', 'test', 'unit_test')
+
+SELECTOR_FORMATS = ('names', 'graph', 'yaml')
+
+DEFAULT_GIT_PATHS = ('models', 'seeds', 'snapshots', 'tests')
+
+
+def changed_between(previous, current):
+    """
+    Indices in `current` of nodes that are new or differ from `previous`.
+
+    A node differs when its checksum, name, type or parent ids changed.
+    """
+    changed = []
+    for i, unique_id in enumerate(current.ids):
+        j = previous.index.get(unique_id)
+        if (j is None
+                or current.checksums[i] != previous.checksums[j]
+                or current.names[i] != previous.names[j]
+                or current.types[i] != previous.types[j]
+                or [current.ids[p] for p in current.parents(i)]
+                != [previous.ids[p] for p in previous.parents(j)]):
+            changed.append(i)
+    return changed
+
+
+def git_changed_files(project_dir, base='HEAD', paths=DEFAULT_GIT_PATHS):
+    """
+    Files under `paths` that differ from `base`, relative to `project_dir`.
+
+    Covers committed and uncommitted edits since `base` plus untracked
+    files.
+    """
+    commands = (
+        ['git', 'diff', '--name-only', '--relative', base, '--', *paths],
+        ['git', 'ls-files', '--others', '--exclude-standard', '--', *paths],
+    )
+    files = set()
+    for command in commands:
+        try:
+            result = subprocess.run(command, cwd=project_dir, capture_output=True,
+                                    text=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as error:
+            message = getattr(error, 'stderr', '') or str(error)
+            raise QueryError(f"{' '.join(command[:2])} failed: {message.strip()}") from error
+        files.update(line.strip() for line in result.stdout.splitlines() if line.strip())
+    return files
+
+
+def nodes_for_files(manifest_path, graph, files):
+    """
+    Indices of nodes defined by or documented in any of `files`.
+
+    Matches each node's original_file_path and, for YAML patches, its
+    patch_path ('project://models/schema.yml').
+    """
+    files = {Path(name).as_posix() for name in files}
+    matched = []
+    fields = ('original_file_path', 'patch_path')
+    for _, unique_id, record in iter_manifest(manifest_path, fields=fields):
+        paths = [record.get('original_file_path') or '']
+        patch_path = record.get('patch_path') or ''
+        paths.append(patch_path.split('://', 1)[-1])
+        if any(path and Path(path).as_posix() in files for path in paths):
+            i = graph.index.get(unique_id)
+            if i is not None:
+                matched.append(i)
+    return matched
+
+
+def impacted_nodes(graph, changed, query=None):
+    """Changed nodes plus everything downstream of them, limited to SELECTABLE_TYPES."""
+    query = query or LineageQuery(graph)
+    bits = 0
+    descendant_bits = query.descendant_bits
+    for i in changed:
+        bits |= (1 << i) | descendant_bits[i]
+    selectable = set(SELECTABLE_TYPES)
+    return [i for i in query.order if (bits >> i) & 1 and graph.node_type(i) in selectable]
+
+
+def selection_roots(graph, changed, query=None):
+    """Changed nodes that are not downstream of another changed node."""
+    query = query or LineageQuery(graph)
+    covered = 0
+    descendant_bits = query.descendant_bits
+    for i in changed:
+        covered |= descendant_bits[i]
+    return [i for i in dict.fromkeys(changed) if not (covered >> i) & 1]
+
+
+def format_selector(graph, impacted, roots, selector_format='names', name='changed'):
+    """
+    Render the selection for dbt.
+
+    'names' lists every impacted node (`dbt build --select <output>`),
+    'graph' uses dbt's `name+` operator on the changed roots, and 'yaml'
+    writes a selectors.yml definition of the explicit list.
+    """
+    if selector_format == 'names':
+        return ' '.join(graph.names[i] for i in impacted)
+    if selector_format == 'graph':
+        return ' '.join(f'{graph.names[i]}+' for i in roots)
+    if selector_format == 'yaml':
+        lines = ['selectors:', f'  - name: {name}',
+                 '    description: Nodes affected by the change (generated by python -m lineage impact)',
+                 '    definition:', '      union:']
+        lines.extend(f"        - '{graph.names[i]}'" for i in impacted)
+        if not impacted:
+            lines[-1] = '      union: []'
+        return '\n'.join(lines)
+    raise ValueError(f'unknown selector format {selector_format!r}')
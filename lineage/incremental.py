@@ -0,0 +1,214 @@
+"""
+Incremental lineage updates.
+
+After a commit touches a handful of models, `dbt compile` rewrites the whole
+manifest, but almost every node in it keeps its checksum and dependencies.
+update_lineage() compares the new manifest against a previously extracted
+graph, classifies nodes as added, removed or changed, and patches only the
+adjacency of the affected nodes. Unchanged nodes keep their index and their
+parent/child lists are copied over as whole array slices.
+"""
+
+import bisect
+from array import array
+
+from lineage.graph import INDEX_TYPECODE, LineageGraph, record_type, type_code
+from lineage.manifest import iter_manifest
+
+
+class LineageDelta:
+    """Unique ids that differ between two versions of a lineage graph."""
+
+    __slots__ = ('added', 'removed', 'changed')
+
+    def __init__(self, added=(), removed=(), changed=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.changed = list(changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return (f'LineageDelta(added={len(self.added)}, removed={len(self.removed)}, '
+                f'changed={len(self.changed)})')
+
+
+def _read_records(manifest_path):
+    """Collect (unique_id, name, type, checksum, parent_ids) from a manifest."""
+    records = []
+    for section, unique_id, record in iter_manifest(manifest_path):
+        records.append((
+            unique_id,
+            record.get('name', unique_id),
+            record_type(section, record),
+            record.get('checksum', '') or '',
+            record.get('depends_on', {}).get('nodes', []),
+        ))
+    return records
+
+
+def _resolve_parents(parent_ids, index):
+    """Map parent ids to indices, dropping unknown and duplicate parents."""
+    parents = []
+    for parent_id in parent_ids:
+        parent = index.get(parent_id)
+        if parent is not None and parent not in parents:
+            parents.append(parent)
+    return parents
+
+
+def diff_lineage(previous, records):
+    """
+    Compare manifest records against a previous graph.
+
+    Returns (delta, new_ids) where new_ids is the set of unique ids in the new
+    manifest. A node counts as changed when its checksum, name, type or
+    resolved dependencies differ.
+    """
+    new_ids = {record[0] for record in records}
+    old_index = previous.index
+    old_ids = previous.ids
+    delta = LineageDelta()
+    for unique_id, name, node_type, checksum, parent_ids in records:
+        i = old_index.get(unique_id)
+        if i is None:
+            delta.added.append(unique_id)
+            continue
+        if (checksum != previous.checksums[i]
+                or name != previous.names[i]
+                or type_code(node_type) != previous.types[i]):
+            delta.changed.append(unique_id)
+            continue
+        old_parents = [old_ids[p] for p in previous.parents(i)]
+        new_parents = []
+        for parent_id in parent_ids:
+            if parent_id in new_ids and parent_id not in new_parents:
+                new_parents.append(parent_id)
+        if old_parents != new_parents:
+            delta.changed.append(unique_id)
+    delta.removed = [unique_id for unique_id in old_ids if unique_id not in new_ids]
+    return delta, new_ids
+
+
+def _patched_csr(n, old_offsets, old_indices, replaced, remap):
+    """
+    Copy CSR rows from an old layout into a new one.
+
+    Row i of the result is `replaced[i]` when present, otherwise the old row
+    that `remap` maps to it, copied as one slice (and re-indexed only when
+    nodes were removed).
+    """
+    offsets = array(INDEX_TYPECODE, [0])
+    indices = array(INDEX_TYPECODE)
+    old_rows, new_index = remap
+    for i in range(n):
+        row = replaced.get(i)
+        if row is None:
+            old = old_rows[i]
+            if old >= 0:
+                chunk = old_indices[old_offsets[old]:old_offsets[old + 1]]
+                if new_index is not None:
+                    chunk = [new_index[j] for j in chunk if new_index[j] >= 0]
+                indices.extend(chunk)
+        else:
+            indices.extend(row)
+        offsets.append(len(indices))
+    return offsets, indices
+
+
+def apply_delta(previous, records, delta):
+    """Build the updated graph by patching `previous` with `delta`."""
+    record_by_id = {record[0]: record for record in records}
+    removed = set(delta.removed)
+
+    # Surviving nodes keep their relative order; added nodes go at the end
+    if removed:
+        old_rows = [i for i, unique_id in enumerate(previous.ids) if unique_id not in removed]
+        new_index = array(INDEX_TYPECODE, [-1]) * len(previous.ids)
+        for new, old in enumerate(old_rows):
+            new_index[old] = new
+    else:
+        old_rows = list(range(len(previous.ids)))
+        new_index = None
+    ids = [previous.ids[old] for old in old_rows]
+    names = [previous.names[old] for old in old_rows]
+    types = bytearray(previous.types[old] for old in old_rows)
+    checksums = [previous.checksums[old] for old in old_rows]
+    index = {unique_id: i for i, unique_id in enumerate(ids)}
+
+    for unique_id in delta.added:
+        _, name, node_type, checksum, _ = record_by_id[unique_id]
+        index[unique_id] = len(ids)
+        ids.append(unique_id)
+        names.append(name)
+        types.append(type_code(node_type))
+        checksums.append(checksum)
+        old_rows.append(-1)
+    for unique_id in delta.changed:
+        i = index[unique_id]
+        _, names[i], node_type, checksums[i], _ = record_by_id[unique_id]
+        types[i] = type_code(node_type)
+
+    # New parent lists for changed and added nodes
+    new_parents = {}
+    for unique_id in delta.changed + delta.added:
+        new_parents[index[unique_id]] = _resolve_parents(record_by_id[unique_id][4], index)
+
+    # Edges that appear or disappear. A changed node that keeps a parent keeps
+    # its place in that parent's child list, so a checksum-only change leaves
+    # the adjacency exactly as a full extraction would build it.
+    added_edges = {}
+    removed_edges = {}
+    for unique_id in delta.changed:
+        child = index[unique_id]
+        old_parents = {index[previous.ids[p]] for p in previous.parents(previous.index[unique_id])
+                       if previous.ids[p] in index}
+        for parent in old_parents.difference(new_parents[child]):
+            removed_edges.setdefault(parent, set()).add(child)
+        for parent in new_parents[child]:
+            if parent not in old_parents:
+                added_edges.setdefault(parent, []).append(child)
+    for unique_id in delta.added:
+        child = index[unique_id]
+        for parent in new_parents[child]:
+            added_edges.setdefault(parent, []).append(child)
+    # Parents of removed nodes need no rewrite: _patched_csr() drops children
+    # that the index remap deletes
+    new_children = {}
+    for parent in set(added_edges) | set(removed_edges):
+        old = old_rows[parent]
+        dropped = removed_edges.get(parent, ())
+        children = []
+        if old >= 0:
+            for child in previous.children(old):
+                child = child if new_index is None else new_index[child]
+                if child >= 0 and child not in dropped:
+                    children.append(child)
+        # Child lists are in index order, like a full extraction builds them
+        for child in added_edges.get(parent, ()):
+            bisect.insort(children, child)
+        new_children[parent] = children
+
+    n = len(ids)
+    remap = (old_rows, new_index)
+    parent_offsets, parent_indices = _patched_csr(
+        n, previous.parent_offsets, previous.parent_indices, new_parents, remap)
+    child_offsets, child_indices = _patched_csr(
+        n, previous.child_offsets, previous.child_indices, new_children, remap)
+    return LineageGraph(ids, names, bytes(types), checksums,
+                        parent_offsets, parent_indices, child_offsets, child_indices)
+
+
+def update_lineage(previous, manifest_path):
+    """
+    Bring a previously extracted graph up to date with a new manifest.
+
+    Returns (graph, delta). When nothing changed the previous graph object is
+    returned as is.
+    """
+    records = _read_records(manifest_path)
+    delta, _ = diff_lineage(previous, records)
+    if not delta:
+        return previous, delta
+    return apply_delta(previous, records, delta), delta
@@ -0,0 +1,131 @@
+"""
+Layered (Sugiyama-style) layout for lineage graphs.
+
+Layers come from the DAG itself: a node sits one layer to the right of its
+deepest parent, computed with Kahn's algorithm in O(V + E). Within each
+layer nodes are ordered by a few barycenter sweeps (each node moves towards
+the mean position of its neighbours in the adjacent sweep direction), which
+removes most edge crossings at O(V log V + E) per sweep.
+
+The old naming-convention heuristic (raw_/stg_/int_/dim_/fct_) can still be
+used by passing a layer_of callback that returns a layer per node index.
+"""
+
+from array import array
+
+from lineage.graph import INDEX_TYPECODE
+
+
+DEFAULT_SWEEPS = 4
+
+
+class Layout:
+    """Node coordinates and layer assignment, indexed like the graph."""
+
+    __slots__ = ('x', 'y', 'layer', 'layer_count')
+
+    def __init__(self, x, y, layer):
+        self.x = x
+        self.y = y
+        self.layer = layer
+        self.layer_count = max(layer) + 1 if len(layer) else 0
+
+    def positions(self, graph):
+        """Return {unique_id: (x, y)}, the shape networkx drawing expects."""
+        return {unique_id: (self.x[i], self.y[i]) for i, unique_id in enumerate(graph.ids)}
+
+
+def topological_layers(graph):
+    """
+    Return the longest-path depth of every node (roots are layer 0).
+
+    Nodes that are part of a cycle never become ready; they are placed one
+    layer past the deepest acyclic node so they still get drawn.
+    """
+    n = len(graph)
+    parent_offsets = graph.parent_offsets
+    child_offsets = graph.child_offsets
+    child_indices = graph.child_indices
+    remaining = array(INDEX_TYPECODE, (parent_offsets[i + 1] - parent_offsets[i] for i in range(n)))
+    layer = array(INDEX_TYPECODE, bytes(4 * n))
+    ready = [i for i in range(n) if remaining[i] == 0]
+    placed = 0
+    while ready:
+        node = ready.pop()
+        placed += 1
+        depth = layer[node] + 1
+        for k in range(child_offsets[node], child_offsets[node + 1]):
+            child = child_indices[k]
+            if layer[child] < depth:
+                layer[child] = depth
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    if placed < n:
+        overflow = max(layer[i] for i in range(n) if remaining[i] == 0) + 1 if placed else 0
+        for i in range(n):
+            if remaining[i]:
+                layer[i] = overflow
+    return layer
+
+
+def _barycenter_sweep(layers, rank, neighbours_of, reverse):
+    """Reorder every layer by the mean normalized rank of each node's neighbours."""
+    order = reversed(range(len(layers))) if reverse else range(len(layers))
+    for k in order:
+        members = layers[k]
+        keys = {}
+        for node in members:
+            neighbours = neighbours_of(node)
+            if len(neighbours):
+                keys[node] = sum(rank[m] for m in neighbours) / len(neighbours)
+            else:
+                # Nodes without neighbours on this side hold their place
+                keys[node] = rank[node]
+        members.sort(key=keys.__getitem__)
+        size = len(members)
+        for position, node in enumerate(members):
+            rank[node] = (position + 0.5) / size
+
+
+def order_layers(graph, layer, sweeps=DEFAULT_SWEEPS):
+    """Group nodes by layer and reduce crossings with alternating barycenter sweeps."""
+    layer_count = max(layer) + 1 if len(layer) else 0
+    layers = [[] for _ in range(layer_count)]
+    for node in range(len(graph)):
+        layers[layer[node]].append(node)
+    # Ranks are normalized to (0, 1) so layers of different sizes compare
+    rank = [0.0] * len(graph)
+    for members in layers:
+        size = len(members)
+        for position, node in enumerate(members):
+            rank[node] = (position + 0.5) / size
+    for sweep in range(sweeps):
+        if sweep % 2 == 0:
+            _barycenter_sweep(layers, rank, graph.parents, reverse=False)
+        else:
+            _barycenter_sweep(layers, rank, graph.children, reverse=True)
+    return layers
+
+
+def layered_layout(graph, layer_of=None, sweeps=DEFAULT_SWEEPS,
+                   layer_spacing=3.0, node_spacing=1.5):
+    """
+    Compute a left-to-right layered layout.
+
+    `layer_of(index)` overrides the DAG depth of a node when given (e.g. a
+    naming-convention heuristic). Layers are `layer_spacing` apart on x and
+    nodes within a layer are `node_spacing` apart on y, centred on 0.
+    """
+    if layer_of is None:
+        layer = topological_layers(graph)
+    else:
+        layer = array(INDEX_TYPECODE, (layer_of(i) for i in range(len(graph))))
+    x = array('d', bytes(8 * len(graph)))
+    y = array('d', bytes(8 * len(graph)))
+    for k, members in enumerate(order_layers(graph, layer, sweeps)):
+        half = len(members) / 2
+        for position, node in enumerate(members):
+            x[node] = k * layer_spacing
+            y[node] = (position - half) * node_spacing
+    return Layout(x, y, layer)
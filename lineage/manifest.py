@@ -0,0 +1,197 @@
+"""
+Streaming dbt manifest reader.
+
+dbt's target/manifest.json carries compiled SQL, docs blocks and every macro
+in the project, so production manifests easily reach hundreds of MB. Lineage
+extraction only needs a handful of fields per node, so instead of json.load
+this module walks the file in fixed-size chunks, skips whole sections
+(macros, docs, parent_map, ...) with regex scans and decodes one node at a
+time, keeping only the requested fields. Peak memory is bounded by the chunk
+size plus the largest single node, not by the size of the manifest.
+"""
+
+import json
+import re
+
+
+# Top-level manifest sections that hold lineage nodes
+NODE_SECTIONS = ('nodes', 'sources')
+
+# Fields kept for each node by default (everything lineage extraction needs)
+LINEAGE_FIELDS = ('name', 'resource_type', 'depends_on', 'checksum')
+
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_SCALAR = re.compile(r'[^,}\]\s]+')
+
+
+class ManifestError(ValueError):
+    """Raised when the manifest is not a JSON object we can stream."""
+
+
+class _JSONStream:
+    """Pull parser over a text file that never holds more than a few chunks."""
+
+    def __init__(self, fh, chunk_size=CHUNK_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        # Start of a value being captured; kept in the buffer across reads
+        self.mark = None
+
+    def _fill(self):
+        """Read the next chunk, dropping text that has been consumed."""
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        cut = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[cut:] + chunk
+        self.pos -= cut
+        if self.mark is not None:
+            self.mark -= cut
+        return True
+
+    def _error(self, message):
+        raise ManifestError(f"{message} (near: {self.buf[self.pos:self.pos + 40]!r})")
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            self._error(f"Expected {char!r}")
+        self.pos += 1
+
+    def _match(self, pattern):
+        """Match a token at pos, reading more input if it may be truncated."""
+        while True:
+            match = pattern.match(self.buf, self.pos)
+            if match and (match.end() < len(self.buf) or self.eof):
+                return match
+            if not self._fill():
+                match = pattern.match(self.buf, self.pos)
+                if match:
+                    return match
+                self._error("Unexpected end of manifest")
+
+    def read_string(self):
+        if self.peek() != '"':
+            self._error("Expected a string")
+        match = self._match(_STRING)
+        self.pos = match.end()
+        return json.loads(match.group())
+
+    def skip_value(self):
+        """Advance past the next value without building any Python objects."""
+        char = self.peek()
+        if char == '"':
+            self.pos = self._match(_STRING).end()
+            return
+        if char not in '{[':
+            self.pos = self._match(_SCALAR).end()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    self._error("Unexpected end of manifest")
+                continue
+            self.pos = match.start()
+            token = match.group()
+            if token == '"':
+                self.pos = self._match(_STRING).end()
+                continue
+            self.pos += 1
+            depth += 1 if token in '{[' else -1
+            if depth == 0:
+                return
+
+    def read_value(self):
+        """Decode the next value, holding only that value in memory."""
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            return json.loads(self.buf[self.mark:self.pos])
+        finally:
+            self.mark = None
+
+    def iter_object(self):
+        """Yield the keys of an object; the caller must consume each value."""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(':')
+            yield key
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                self.pos -= 1
+                self._error("Expected ',' or '}'")
+
+
+def _slim(node, fields):
+    """Keep only the requested fields of a decoded manifest node."""
+    record = {field: node[field] for field in fields if field in node}
+    depends_on = record.get('depends_on')
+    if isinstance(depends_on, dict):
+        # Macro dependencies are never part of the lineage graph
+        record['depends_on'] = {'nodes': depends_on.get('nodes', [])}
+    checksum = record.get('checksum')
+    if isinstance(checksum, dict):
+        # {'name': 'sha256', 'checksum': '...'} -> just the digest
+        record['checksum'] = checksum.get('checksum', '')
+    return record
+
+
+def iter_manifest(manifest_path, fields=LINEAGE_FIELDS, sections=NODE_SECTIONS,
+                  chunk_size=CHUNK_SIZE):
+    """
+    Stream (section, unique_id, record) tuples out of a manifest.
+
+    Only members of `sections` are decoded, one at a time, and each record
+    holds only `fields`. Every other part of the manifest is skipped.
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f, chunk_size)
+        for section in stream.iter_object():
+            if section not in sections or stream.peek() != '{':
+                stream.skip_value()
+                continue
+            for unique_id in stream.iter_object():
+                node = stream.read_value()
+                yield section, unique_id, _slim(node, fields)
+
+
+def load_manifest(manifest_path, fields=LINEAGE_FIELDS, sections=NODE_SECTIONS):
+    """
+    Load the lineage-relevant parts of a dbt manifest.json file.
+
+    Returns a dict shaped like the manifest ({'nodes': {...}, 'sources': {...}})
+    whose node records only carry `fields`.
+    """
+    manifest = {section: {} for section in sections}
+    for section, unique_id, record in iter_manifest(manifest_path, fields, sections):
+        manifest[section][unique_id] = record
+    return manifest
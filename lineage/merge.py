@@ -0,0 +1,137 @@
+"""
+One lineage graph across many dbt projects.
+
+Each manifest is streamed in its own worker process. The records are merged
+into a single GraphBuilder, which interns every unique_id and name, so a
+node shared by several projects (a package, or a public model that another
+project's manifest also lists) is stored once. Memory therefore grows with
+the number of distinct nodes, not with the number of projects.
+Dependencies are resolved only after every project is loaded, so a `ref`
+into another project keeps its edge.
+
+Projects that read another project's output declare it as a source.
+merge_manifests() links each source to the model, snapshot or seed that
+builds the same relation (matched on relation_name) in another manifest,
+which joins the per-project graphs into one DAG. Producers in the source's
+own manifest are left alone, since dbt already resolved those dependencies.
+"""
+
+import hashlib
+import os
+
+from lineage.cache import manifest_digest, load_cached_lineage
+from lineage.graph import GraphBuilder, record_type
+from lineage.manifest import LINEAGE_FIELDS, iter_manifest
+
+
+MERGE_FIELDS = LINEAGE_FIELDS + ('relation_name',)
+
+# Resource types that build the relation named in their relation_name
+PRODUCER_TYPES = ('model', 'snapshot', 'seed')
+
+
+def relation_key(relation_name):
+    """'"Analytics"."main"."Orders"' -> 'analytics.main.orders'."""
+    return '.'.join(part.strip('"`[] ').lower() for part in relation_name.split('.'))
+
+
+def _read_project(manifest_path):
+    """
+    Process pool entry point: the lineage records of one manifest.
+
+    Returns a list of (unique_id, name, type, checksum, parent_ids,
+    relation) tuples; relation is only set for sources and producers.
+    """
+    records = []
+    for section, unique_id, record in iter_manifest(manifest_path, fields=MERGE_FIELDS):
+        node_type = record_type(section, record)
+        relation = record.get('relation_name')
+        if relation and (node_type == 'source' or node_type in PRODUCER_TYPES):
+            relation = relation_key(relation)
+        else:
+            relation = None
+        records.append((unique_id, record.get('name', unique_id), node_type,
+                        record.get('checksum', ''), record.get('depends_on', {}).get('nodes', []),
+                        relation))
+    return records
+
+
+def merge_manifests(manifest_paths, workers=None):
+    """
+    Load every manifest in `manifest_paths` and merge them into one graph.
+
+    `workers` is the process pool size (default: CPU count; 1 reads the
+    manifests in this process). Returns (graph, links) where links lists
+    the (producer, source) index pairs that were joined by relation name;
+    a source is only linked to producers from a different manifest.
+    """
+    manifest_paths = list(manifest_paths)
+    workers = min(workers or os.cpu_count() or 1, len(manifest_paths))
+    executor = None
+    try:
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=workers)
+            projects = executor.map(_read_project, manifest_paths)
+        else:
+            projects = map(_read_project, manifest_paths)
+
+        builder = GraphBuilder()
+        producers = {}
+        sources = []
+        # Projects are merged as they arrive, in input order
+        for project, records in enumerate(projects):
+            for unique_id, name, node_type, checksum, parent_ids, relation in records:
+                i = builder.add_node(unique_id, name, node_type, checksum)
+                builder.add_dependencies(i, parent_ids)
+                if relation is None:
+                    continue
+                if node_type == 'source':
+                    sources.append((i, relation, project))
+                else:
+                    producers.setdefault(relation, []).append((i, project))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    links = []
+    linked = set()
+    for source, relation, project in dict.fromkeys(sources):
+        for producer, producer_project in producers.get(relation, ()):
+            if producer_project == project or (producer, source) in linked:
+                continue
+            builder.add_dependencies(source, [builder.ids[producer]])
+            links.append((producer, source))
+            linked.add((producer, source))
+    return builder.build(), links
+
+
+def merged_digest(manifest_paths):
+    """Cache key for the merged graph of `manifest_paths` (order matters)."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(b'lineage-merge\0')
+    for manifest_path in manifest_paths:
+        digest.update(manifest_digest(manifest_path).encode() + b'\0')
+    return digest.hexdigest()
+
+
+def load_project_lineage(manifest_paths, cache=None, incremental=True, workers=None):
+    """
+    Return (graph, source) for one or more manifests.
+
+    A single manifest goes through load_cached_lineage(). Several are merged
+    with merge_manifests() and the result is cached under the combined
+    hash of their contents; `source` is then 'cache' or 'merged'.
+    """
+    manifest_paths = list(manifest_paths)
+    if len(manifest_paths) == 1:
+        return load_cached_lineage(manifest_paths[0], cache, incremental)
+    key = merged_digest(manifest_paths) if cache is not None else None
+    if key is not None:
+        graph = cache.get(key)
+        if graph is not None:
+            return graph, 'cache'
+    graph, _ = merge_manifests(manifest_paths, workers)
+    if key is not None:
+        cache.put(key, graph)
+    return graph, 'merged'
@@ -0,0 +1,138 @@
+"""
+Per-stage timing and memory for the lineage scripts.
+
+`--profile` wraps each step of a script (loading the manifest, layout,
+rendering, ...) in a Profiler stage. Each stage records wall time, the
+process's peak RSS when it finished and the node and edge counts it worked
+on. A table of the stages is printed at the end, so it is obvious whether
+parsing, layout or rendering dominates on a given project. `--profile-trace`
+also writes the stages as a Chrome trace-event JSON file, which
+chrome://tracing or https://ui.perfetto.dev open directly and which is easy to
+post-process.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def graph_counts(graph):
+    """Node and edge counts of a LineageGraph, for stage records."""
+    return {'nodes': len(graph), 'edges': graph.number_of_edges()}
+
+
+def _megabytes(value):
+    return f'{value / 1e6:.1f} MB' if value is not None else 'n/a'
+
+
+class Profiler:
+    """Collects stage records; does nothing but hand out dicts when disabled."""
+
+    def __init__(self, enabled=True, trace_path=None):
+        self.enabled = enabled or trace_path is not None
+        self.trace_path = trace_path
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name, **counts):
+        """
+        Time the body of a `with` block as stage `name`.
+
+        Yields the stage's record; add counts discovered inside the block
+        with record.update(...).
+        """
+        record = dict(counts)
+        if not self.enabled:
+            yield record
+            return
+        rss_before = peak_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            rss_after = peak_rss()
+            entry = {
+                'name': name,
+                'start': start - self.started,
+                'seconds': end - start,
+                'peak_rss': rss_after,
+                'rss_growth': rss_after - rss_before if rss_after is not None else None,
+            }
+            entry.update(record)
+            self.stages.append(entry)
+
+    def print_report(self, file=None):
+        file = file or sys.stdout
+        total = time.perf_counter() - self.started
+        print("=" * 60, file=file)
+        print(f"PROFILE ({total:.2f}s total, peak RSS {_megabytes(peak_rss())})", file=file)
+        print("=" * 60, file=file)
+        width = max([len(stage['name']) for stage in self.stages] + [5])
+        print(f"\n  {'stage':<{width}}  {'time':>8}  {'share':>6}  {'peak RSS':>10}  {'+RSS':>9}  "
+              f"{'nodes':>8}  {'edges':>8}", file=file)
+        for stage in self.stages:
+            growth = f"{stage['rss_growth'] / 1e6:.1f} MB" if stage['rss_growth'] is not None else 'n/a'
+            nodes = f"{stage['nodes']:,}" if 'nodes' in stage else ''
+            edges = f"{stage['edges']:,}" if 'edges' in stage else ''
+            print(f"  {stage['name']:<{width}}  {stage['seconds']:>7.3f}s  "
+                  f"{stage['seconds'] / (total or 1.0):>6.1%}  {_megabytes(stage['peak_rss']):>10}  "
+                  f"{growth:>9}  {nodes:>8}  {edges:>8}", file=file)
+        print("\n" + "=" * 60 + "\n", file=file)
+
+    def trace(self):
+        """The stages as a Chrome trace-event document (microsecond timestamps)."""
+        events = []
+        for stage in self.stages:
+            args = {key: value for key, value in stage.items() if key not in ('name', 'start', 'seconds')}
+            events.append({
+                'name': stage['name'], 'cat': 'lineage', 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                'ts': round(stage['start'] * 1e6), 'dur': round(stage['seconds'] * 1e6), 'args': args,
+            })
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'metadata': {'command': ' '.join(sys.argv), 'peak_rss': peak_rss(),
+                         'seconds': time.perf_counter() - self.started},
+        }
+
+    def write_trace(self, path):
+        path = Path(path)
+        path.write_text(json.dumps(self.trace(), indent=2) + '\n', encoding='utf-8')
+        return path
+
+    def finish(self, file=None):
+        """Print the report and write the trace, if profiling is on."""
+        if not self.enabled:
+            return
+        self.print_report(file)
+        if self.trace_path:
+            print(f"📊 Profile trace saved to: {self.write_trace(self.trace_path)}", file=file or sys.stdout)
+
+
+def add_profile_arguments(parser):
+    """Add the --profile options to an argparse parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='print wall time, peak RSS and node/edge counts for each stage')
+    parser.add_argument('--profile-trace', default=None, metavar='PATH',
+                        help='also write the stages as a Chrome trace-event JSON file (implies --profile)')
+
+
+def profiler_from_args(args):
+    """Profiler configured by add_profile_arguments() options."""
+    return Profiler(args.profile, args.profile_trace)
@@ -0,0 +1,230 @@
+"""
+Upstream/downstream lineage queries.
+
+LineageQuery precomputes the full ancestor and descendant sets of every node
+as Python integers used as bitsets (bit i set = node i reachable). Sets are
+built once in reverse topological order by OR-ing the sets of a node's
+children (or parents), so "is X upstream of Y" is a single bit test and "all
+descendants of X" is one bitset decode. Depth-limited questions run a BFS
+over the CSR adjacency that stops at the requested depth.
+
+Each direction is built on first use. Memory is bounded by the number of
+reachable pairs (at most V * V / 8 bytes).
+"""
+
+from collections import deque
+
+from lineage.graph import NODE_TYPES
+
+
+class QueryError(ValueError):
+    """Raised when a node cannot be resolved unambiguously."""
+
+
+def topological_order(graph):
+    """
+    Return node indices in topological order (parents before children).
+
+    Nodes that sit on a cycle are appended at the end in index order.
+    """
+    n = len(graph)
+    parent_offsets = graph.parent_offsets
+    remaining = [parent_offsets[i + 1] - parent_offsets[i] for i in range(n)]
+    order = [i for i in range(n) if remaining[i] == 0]
+    child_offsets = graph.child_offsets
+    child_indices = graph.child_indices
+    for node in order:
+        for k in range(child_offsets[node], child_offsets[node + 1]):
+            child = child_indices[k]
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                order.append(child)
+    if len(order) < n:
+        order.extend(i for i in range(n) if remaining[i] > 0)
+    return order
+
+
+def _bfs_bits(start, neighbours_of):
+    """Reachability bitset of `start` by plain BFS, used for nodes on cycles."""
+    bits = 0
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for other in neighbours_of(node):
+            if not (bits >> other) & 1:
+                bits |= 1 << other
+                queue.append(other)
+    return bits
+
+
+def _reachability(graph, order, neighbours_of):
+    """Bitset of every node reachable from each node, following `neighbours_of`."""
+    n = len(graph)
+    reach = [0] * n
+    done = bytearray(n)
+    # `order` visits neighbours first, so their sets are complete when read
+    for node in order:
+        bits = 0
+        for other in neighbours_of(node):
+            if not done[other]:
+                bits = None
+                break
+            bits |= (1 << other) | reach[other]
+        if bits is None:
+            bits = _bfs_bits(node, neighbours_of)
+        reach[node] = bits
+        done[node] = 1
+    return reach
+
+
+def bits_to_indices(bits):
+    """Decode a bitset into the sorted list of set bit positions."""
+    digits = bin(bits)[:1:-1]
+    indices = []
+    position = digits.find('1')
+    while position >= 0:
+        indices.append(position)
+        position = digits.find('1', position + 1)
+    return indices
+
+
+class LineageQuery:
+    """Reachability index and query helpers over a LineageGraph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._order = None
+        self._ancestors = None
+        self._descendants = None
+        self._by_name = None
+
+    @property
+    def order(self):
+        if self._order is None:
+            self._order = topological_order(self.graph)
+        return self._order
+
+    @property
+    def ancestor_bits(self):
+        """Per-node bitsets of all ancestors."""
+        if self._ancestors is None:
+            self._ancestors = _reachability(self.graph, self.order, self.graph.parents)
+        return self._ancestors
+
+    @property
+    def descendant_bits(self):
+        """Per-node bitsets of all descendants."""
+        if self._descendants is None:
+            self._descendants = _reachability(
+                self.graph, self.order[::-1], self.graph.children)
+        return self._descendants
+
+    def resolve(self, node):
+        """
+        Return the index for a unique_id, a node name or an index.
+
+        A bare name that matches several nodes (e.g. a model and a seed with
+        the same name) prefers the model; anything else ambiguous raises
+        QueryError.
+        """
+        if isinstance(node, int):
+            if not 0 <= node < len(self.graph):
+                raise QueryError(f'node index {node} out of range')
+            return node
+        index = self.graph.index.get(node)
+        if index is not None:
+            return index
+        if self._by_name is None:
+            by_name = {}
+            for i, name in enumerate(self.graph.names):
+                by_name.setdefault(name, []).append(i)
+            self._by_name = by_name
+        matches = self._by_name.get(node, [])
+        if len(matches) > 1:
+            models = [i for i in matches if self.graph.node_type(i) == 'model']
+            matches = models if len(models) == 1 else matches
+        if not matches:
+            raise QueryError(f'no node named {node!r}')
+        if len(matches) > 1:
+            candidates = ', '.join(self.graph.ids[i] for i in matches)
+            raise QueryError(f'{node!r} is ambiguous: {candidates}')
+        return matches[0]
+
+    def is_upstream(self, upstream, downstream):
+        """True when `upstream` is a (transitive) ancestor of `downstream`."""
+        upstream = self.resolve(upstream)
+        downstream = self.resolve(downstream)
+        return bool((self.descendant_bits[upstream] >> downstream) & 1)
+
+    def path(self, upstream, downstream):
+        """
+        Indices of a shortest dependency path from `upstream` down to
+        `downstream` (both included), or None when there is none.
+        """
+        start = self.resolve(upstream)
+        goal = self.resolve(downstream)
+        if start != goal and not (self.descendant_bits[start] >> goal) & 1:
+            return None
+        previous = {start: None}
+        queue = deque([start])
+        while goal not in previous:
+            node = queue.popleft()
+            for child in self.graph.children(node):
+                if child not in previous:
+                    previous[child] = node
+                    queue.append(child)
+        path = [goal]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+    def _depth_limited(self, start, neighbours_of, depth):
+        """{index: distance} for nodes within `depth` hops of `start`."""
+        distance = {start: 0}
+        frontier = [start]
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for other in neighbours_of(node):
+                    if other not in distance:
+                        distance[other] = level
+                        next_frontier.append(other)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        del distance[start]
+        return distance
+
+    def _related(self, node, bits, neighbours_of, depth, node_types):
+        i = self.resolve(node)
+        if depth is None:
+            indices = bits_to_indices(bits[i])
+        else:
+            indices = sorted(self._depth_limited(i, neighbours_of, depth))
+        if node_types:
+            codes = {NODE_TYPES.index(t) for t in node_types if t in NODE_TYPES}
+            types = self.graph.types
+            indices = [j for j in indices if types[j] in codes]
+        return indices
+
+    def ancestors(self, node, depth=None, node_types=None):
+        """Indices of all ancestors of `node`, optionally within `depth` hops."""
+        bits = self.ancestor_bits if depth is None else None
+        return self._related(node, bits, self.graph.parents, depth, node_types)
+
+    def descendants(self, node, depth=None, node_types=None):
+        """Indices of all descendants of `node`, optionally within `depth` hops."""
+        bits = self.descendant_bits if depth is None else None
+        return self._related(node, bits, self.graph.children, depth, node_types)
+
+    def distances(self, node, upstream=False, depth=None):
+        """{index: hops} from `node` to every ancestor (upstream) or descendant."""
+        neighbours_of = self.graph.parents if upstream else self.graph.children
+        limit = len(self.graph) if depth is None else depth
+        return self._depth_limited(self.resolve(node), neighbours_of, limit)
+
+    def count_ancestors(self, node):
+        return bin(self.ancestor_bits[self.resolve(node)]).count('1')
+
+    def count_descendants(self, node):
+        return bin(self.descendant_bits[self.resolve(node)]).count('1')
@@ -0,0 +1,334 @@
+"""
+Static lineage rendering for large graphs.
+
+networkx's draw helpers create one matplotlib artist per node, label and
+(curved) edge, which takes minutes once a project has a few thousand nodes.
+This module draws the whole graph with a handful of artists instead: one
+scatter for all nodes, one LineCollection for all edges and one
+PolyCollection for all arrowheads, built from NumPy arrays over the CSR
+adjacency. Alternatively write_svg() streams the drawing straight to an SVG
+file without importing matplotlib at all.
+
+Time budget: a 10k-node / 50k-edge graph renders to PNG in under 10 seconds
+and to SVG in under 2 seconds (see RENDER_BUDGET_SECONDS).
+"""
+
+import os
+import sys
+from collections import namedtuple
+from html import escape
+from pathlib import Path
+
+from lineage.graph import NODE_TYPES
+
+
+# Target wall time for rendering RENDER_BUDGET_SIZE = (nodes, edges)
+RENDER_BUDGET_SIZE = (10_000, 50_000)
+RENDER_BUDGET_SECONDS = {'png': 10.0, 'svg': 2.0}
+
+# Legend entries, in display order
+LEGEND_LABELS = {
+    'source': 'Sources',
+    'seed': 'Seeds',
+    'model': 'Models',
+    'snapshot': 'Snapshots',
+    'test': 'Tests',
+}
+
+# Above this many nodes labels are dropped; they would only overlap
+DEFAULT_LABEL_LIMIT = 400
+
+# Figures grow with the graph up to this many inches per side, and the dpi
+# is lowered so the bitmap stays under MAX_PIXELS per side
+MAX_FIGURE_INCHES = 60
+MAX_PIXELS = 6_000
+
+
+# A drawn figure plus what savefig needs to write it in any format
+Drawing = namedtuple('Drawing', ['figure', 'dpi', 'large'])
+
+
+def should_run_headless():
+    """True when no interactive display is available (CI, cron, ssh)."""
+    if os.environ.get('CI'):
+        return True
+    if sys.platform.startswith('linux'):
+        return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return False
+
+
+def use_headless_backend():
+    """Force matplotlib's non-GUI Agg backend; call before drawing anything."""
+    import matplotlib
+
+    matplotlib.use('Agg', force=True)
+
+
+def default_node_color(node_type):
+    """Return color based on node type."""
+    color_map = {
+        'seed': '#90EE90',
+        'model': '#87CEEB',
+        'source': '#FFD700',
+        'snapshot': '#FFA07A',
+        'test': '#DDA0DD',
+    }
+    return color_map.get(node_type, '#D3D3D3')
+
+
+def _present_types(graph):
+    present = set(graph.types)
+    return [NODE_TYPES[code] for code in sorted(present)]
+
+
+def _legend_entries(graph, node_color):
+    present = set(_present_types(graph))
+    return [(LEGEND_LABELS[node_type], node_color(node_type))
+            for node_type in LEGEND_LABELS if node_type in present]
+
+
+def _figure_size(layout, base_figsize, node_spacing):
+    """Grow the base figure so that the largest layer still fits."""
+    layer_sizes = {}
+    for layer in layout.layer:
+        layer_sizes[layer] = layer_sizes.get(layer, 0) + 1
+    widest = max(layer_sizes.values(), default=1)
+    width = min(max(base_figsize[0], layout.layer_count * 1.2), MAX_FIGURE_INCHES)
+    height = min(max(base_figsize[1], widest * node_spacing), MAX_FIGURE_INCHES)
+    return width, height, widest
+
+
+def draw_matplotlib(graph, layout, node_color=default_node_color,
+                    title='Data Lineage Visualization', layer_labels=(),
+                    figsize=(20, 12), dpi=300, node_size=3000, font_size=8,
+                    edge_width=2, arrow_size=20, label_limit=DEFAULT_LABEL_LIMIT,
+                    legend_font_size=10, title_font_size=20, layer_font_size=14,
+                    node_colors=None, legend=None, edge_colors=None):
+    """
+    Draw the graph with vectorized matplotlib collections.
+
+    `layer_labels` is a sequence of (x, text) pairs drawn above the layers.
+    `node_colors` (one colour per node) and `legend` ((label, colour) pairs)
+    override the per-type colouring, e.g. for lineage.timings.duration_colors().
+    `edge_colors` gives one colour per edge in graph.edges() order.
+    Returns a Drawing that save_drawing() can write in any number of formats.
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection, PolyCollection
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.lines import Line2D
+
+    n = len(graph)
+    # Large graphs trade labels, arrowheads, antialiasing and the second
+    # (bbox-fitting) draw pass of bbox_inches='tight' for speed
+    large = n > label_limit
+    x = np.frombuffer(layout.x, dtype=np.float64)
+    y = np.frombuffer(layout.y, dtype=np.float64)
+    codes = np.frombuffer(graph.types, dtype=np.uint8)
+    child_offsets = np.frombuffer(graph.child_offsets, dtype=np.int32)
+    children = np.frombuffer(graph.child_indices, dtype=np.int32)
+    parents = np.repeat(np.arange(n, dtype=np.int32), np.diff(child_offsets))
+
+    width, height, widest = _figure_size(layout, figsize, 0.25)
+    dpi = min(dpi, MAX_PIXELS / max(width, height))
+    # Shrink nodes when the widest layer would make them overlap
+    spacing_pt = height * 72 / max(widest, 1)
+    node_size = min(node_size, (0.8 * spacing_pt) ** 2)
+    radius_pt = node_size ** 0.5 / 2
+
+    fig, ax = plt.subplots(figsize=(width, height))
+    ax.axis('off')
+    ax.set_title(title, fontsize=title_font_size, fontweight='bold', pad=20)
+    if n:
+        pad_x = max(1.0, (x.max() - x.min()) * 0.05)
+        pad_y = max(2.5, (y.max() - y.min()) * 0.05)
+        ax.set_xlim(x.min() - pad_x, x.max() + pad_x)
+        ax.set_ylim(y.min() - pad_y, y.max() + pad_y)
+    fig.tight_layout()
+
+    if len(children):
+        # Work in display space so edges stop at the node circles
+        points = ax.transData.transform(np.column_stack([x, y]))
+        src = points[parents]
+        dst = points[children]
+        vec = dst - src
+        length = np.hypot(vec[:, 0], vec[:, 1])
+        length[length == 0] = 1
+        unit = vec / length[:, None]
+        radius_px = radius_pt * fig.dpi / 72
+        tip = dst - unit * radius_px
+        start = src + unit * radius_px
+        segments = np.stack([start, tip], axis=1)
+        inverse = ax.transData.inverted()
+        segments = inverse.transform(segments.reshape(-1, 2)).reshape(-1, 2, 2)
+        edge_rgba = to_rgba_array(edge_colors) if edge_colors is not None else 'gray'
+        ax.add_collection(LineCollection(
+            segments, colors=edge_rgba, linewidths=0.3 if large else edge_width, alpha=0.6,
+            antialiaseds=not large, zorder=1))
+        # Arrowheads are sub-pixel on large graphs; layers already read left to right
+        if arrow_size and not large:
+            head = arrow_size * 0.5 * fig.dpi / 72
+            normal = np.column_stack([-unit[:, 1], unit[:, 0]])
+            base = tip - unit * head
+            triangles = np.stack([tip, base + normal * head * 0.4, base - normal * head * 0.4], axis=1)
+            triangles = inverse.transform(triangles.reshape(-1, 2)).reshape(-1, 3, 2)
+            ax.add_collection(PolyCollection(
+                triangles, facecolors=edge_rgba, edgecolors='none', alpha=0.6, zorder=1))
+
+    if node_colors is None:
+        palette = to_rgba_array([node_color(node_type) for node_type in NODE_TYPES])
+        colors = palette[codes]
+    else:
+        colors = to_rgba_array(node_colors)
+    ax.scatter(x, y, s=node_size, c=colors, alpha=0.9,
+               edgecolors='black', linewidths=0.5 if large else 2, zorder=2)
+
+    if not large:
+        for i in range(n):
+            ax.text(x[i], y[i], graph.names[i].replace('_', '\n'), fontsize=font_size,
+                    fontweight='bold', ha='center', va='center', zorder=3)
+
+    legend_elements = [
+        Line2D([0], [0], marker='o', color='w', label=label,
+               markerfacecolor=color, markersize=10, markeredgecolor='black')
+        for label, color in (legend or _legend_entries(graph, node_color))
+    ]
+    ax.legend(handles=legend_elements, loc='upper left', fontsize=legend_font_size)
+
+    top = y.max() + 1.5 if n else 0
+    for label_x, text in layer_labels:
+        ax.text(label_x, top, text, fontsize=layer_font_size, fontweight='bold', ha='center',
+                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+    return Drawing(fig, dpi, large)
+
+
+def save_drawing(drawing, output_path):
+    """Write a Drawing; the format follows the file extension."""
+    save_options = {}
+    if drawing.large and Path(output_path).suffix.lower() == '.png':
+        # zlib's default level spends seconds on a multi-megapixel bitmap
+        save_options['pil_kwargs'] = {'compress_level': 1}
+    drawing.figure.savefig(output_path, dpi=drawing.dpi,
+                           bbox_inches=None if drawing.large else 'tight',
+                           facecolor='white', **save_options)
+    return output_path
+
+
+def render_matplotlib(graph, layout, output_paths, close=True, **options):
+    """Draw once with draw_matplotlib() and save every path in `output_paths`."""
+    import matplotlib.pyplot as plt
+
+    drawing = draw_matplotlib(graph, layout, **options)
+    for output_path in output_paths:
+        save_drawing(drawing, output_path)
+    if close:
+        plt.close(drawing.figure)
+    return drawing
+
+
+def write_svg(graph, layout, output_path, node_color=default_node_color,
+              title='Data Lineage Visualization', layer_labels=(), scale=60,
+              node_radius=18, font_size=8, label_limit=DEFAULT_LABEL_LIMIT,
+              node_colors=None, legend=None, edge_colors=None):
+    """
+    Stream the graph to an SVG file, one element per line.
+
+    Nothing but the output buffer is held in memory, so this works for graphs
+    far larger than matplotlib can handle. Layout units are scaled by `scale`
+    pixels. `node_colors`, `legend` and `edge_colors` work as in
+    draw_matplotlib(); coloured edges have no arrowheads.
+    """
+    n = len(graph)
+    xs, ys = layout.x, layout.y
+    min_x = min(xs, default=0)
+    min_y = min(ys, default=0)
+    margin = 4 * node_radius
+    header = 90
+    width = (max(xs, default=0) - min_x) * scale + 2 * margin
+    height = (max(ys, default=0) - min_y) * scale + 2 * margin + header
+    px = [(v - min_x) * scale + margin for v in xs]
+    # Flip y so larger layout y is higher up, like matplotlib
+    max_y = max(ys, default=0)
+    py = [(max_y - v) * scale + margin + header for v in ys]
+
+    types = _present_types(graph)
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as out:
+        write = out.write
+        write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+              f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="Arial, Helvetica, sans-serif">\n')
+        write('<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" '
+              'markerWidth="6" markerHeight="6" orient="auto-start-reverse">'
+              '<path d="M0,0 L10,5 L0,10 z" fill="gray"/></marker></defs>\n')
+        write('<style>.e{stroke:gray;stroke-opacity:.6;stroke-width:1.5;fill:none}'
+              '.n{stroke:black;stroke-width:1.5}.l{font-weight:bold;text-anchor:middle}')
+        for node_type in types:
+            write(f'.t-{node_type}{{fill:{node_color(node_type)}}}')
+        write('</style>\n<rect width="100%" height="100%" fill="white"/>\n')
+        write(f'<text x="{width / 2:.0f}" y="36" font-size="24" font-weight="bold" '
+              f'text-anchor="middle">{escape(title)}</text>\n')
+
+        for label_x, text in layer_labels:
+            lx = (label_x - min_x) * scale + margin
+            write(f'<text x="{lx:.1f}" y="{header - 12}" font-size="16" font-weight="bold" '
+                  f'text-anchor="middle">{escape(text)}</text>\n')
+
+        write('<g class="e">\n')
+        offsets = graph.child_offsets
+        children = graph.child_indices
+        for parent in range(n):
+            x1, y1 = px[parent], py[parent]
+            for k in range(offsets[parent], offsets[parent + 1]):
+                child = children[k]
+                x2, y2 = px[child], py[child]
+                dx, dy = x2 - x1, y2 - y1
+                length = (dx * dx + dy * dy) ** 0.5 or 1
+                ux, uy = dx / length * node_radius, dy / length * node_radius
+                stroke = (f' style="stroke:{edge_colors[k]};stroke-width:3"' if edge_colors is not None
+                          else ' marker-end="url(#arrow)"')
+                write(f'<path d="M{x1 + ux:.1f},{y1 + uy:.1f}L{x2 - ux:.1f},{y2 - uy:.1f}"{stroke}/>\n')
+        write('</g>\n<g class="n">\n')
+        for i in range(n):
+            node_type = NODE_TYPES[graph.types[i]]
+            fill = '' if node_colors is None else f' style="fill:{node_colors[i]}"'
+            write(f'<circle class="t-{node_type}"{fill} cx="{px[i]:.1f}" cy="{py[i]:.1f}" '
+                  f'r="{node_radius}"><title>{escape(graph.names[i])}</title></circle>\n')
+        write('</g>\n')
+        if n <= label_limit:
+            write(f'<g class="l" font-size="{font_size}">\n')
+            for i in range(n):
+                write(f'<text x="{px[i]:.1f}" y="{py[i] + font_size / 3:.1f}">'
+                      f'{escape(graph.names[i])}</text>\n')
+            write('</g>\n')
+
+        write('<g font-size="13">\n')
+        for row, (label, color) in enumerate(legend or _legend_entries(graph, node_color)):
+            ly = header + 20 * row
+            write(f'<circle cx="20" cy="{ly}" r="6" fill="{color}" stroke="black"/>'
+                  f'<text x="32" y="{ly + 4}">{escape(label)}</text>\n')
+        write('</g>\n</svg>\n')
+    return output_path
+
+
+def render_lineage(graph, layout, output_paths, **options):
+    """
+    Render to one path or a list of paths in a single pass.
+
+    When every output is .svg the drawing is streamed with write_svg() and
+    matplotlib is never imported. Otherwise the figure is drawn once and
+    saved in each requested format (png, svg, pdf, ...). Returns the paths.
+    """
+    if isinstance(output_paths, (str, os.PathLike)):
+        output_paths = [output_paths]
+    output_paths = list(output_paths)
+    if all(Path(path).suffix.lower() == '.svg' for path in output_paths):
+        svg_options = {key: options[key] for key in
+                       ('node_color', 'title', 'layer_labels', 'font_size', 'label_limit',
+                        'node_colors', 'legend', 'edge_colors')
+                       if key in options}
+        for output_path in output_paths:
+            write_svg(graph, layout, output_path, **svg_options)
+    else:
+        render_matplotlib(graph, layout, output_paths, **options)
+    return output_paths
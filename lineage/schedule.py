@@ -0,0 +1,204 @@
+"""
+Build-time analysis over the lineage DAG.
+
+critical_path() weights every node with its execution time from
+run_results.json (lineage.timings) and finds the longest weighted path from
+any root to any leaf. That path is a lower bound on the build time however
+many threads dbt runs with. Every other node gets a slack: how much longer
+it could run before it would delay the build.
+
+simulate_build() replays the same weighted DAG through a dbt-like ready
+queue with a fixed number of threads to predict wall-clock time and thread
+utilisation, so `threads` can be chosen without running real builds. Ready
+nodes are started longest remaining path first, the usual critical-path
+list scheduling, so the nodes the build waits on longest are never queued
+behind quick ones.
+"""
+
+import heapq
+from array import array
+
+from lineage.query import topological_order
+
+
+# Thread counts within this fraction of the best wall time count as saturated
+SATURATION_TOLERANCE = 0.05
+
+
+class CriticalPath:
+    """Longest weighted path plus per-node earliest start/finish and slack (seconds)."""
+
+    __slots__ = ('length', 'path', 'earliest_start', 'earliest_finish', 'slack')
+
+    def __init__(self, length, path, earliest_start, earliest_finish, slack):
+        self.length = length
+        self.path = path
+        self.earliest_start = earliest_start
+        self.earliest_finish = earliest_finish
+        self.slack = slack
+
+    def critical_nodes(self, tolerance=1e-6):
+        """Indices of every node with (near) zero slack, not just those on `path`."""
+        return [i for i, slack in enumerate(self.slack) if slack <= tolerance]
+
+
+def node_weights(graph, timings):
+    """Execution time per node; nodes that did not run weigh nothing."""
+    if timings is None:
+        return array('d', bytes(8 * len(graph)))
+    return array('d', (max(duration, 0.0) for duration in timings.durations))
+
+
+def critical_path(graph, timings=None, weights=None, order=None):
+    """
+    Compute the critical path of `graph`.
+
+    Weights come from `timings` (lineage.timings.RunTimings) unless an
+    explicit per-node `weights` sequence is given. `order` may pass a
+    precomputed topological order (e.g. LineageQuery.order).
+    """
+    n = len(graph)
+    if weights is None:
+        weights = node_weights(graph, timings)
+    if order is None:
+        order = topological_order(graph)
+    start = array('d', bytes(8 * n))
+    finish = array('d', bytes(8 * n))
+    # Forward pass: a node starts when its slowest parent finishes
+    for node in order:
+        ready = 0.0
+        for parent in graph.parents(node):
+            if finish[parent] > ready:
+                ready = finish[parent]
+        start[node] = ready
+        finish[node] = ready + weights[node]
+    length = max(finish, default=0.0)
+
+    # Backward pass: the latest a node may finish without delaying the build
+    latest = array('d', [length]) * n
+    for node in reversed(order):
+        for child in graph.children(node):
+            limit = latest[child] - weights[child]
+            if limit < latest[node]:
+                latest[node] = limit
+    slack = array('d', (max(latest[i] - finish[i], 0.0) for i in range(n)))
+
+    path = []
+    if n:
+        node = max(range(n), key=finish.__getitem__)
+        while True:
+            path.append(node)
+            parents = [p for p in graph.parents(node) if finish[p] >= start[node] - 1e-9]
+            if not parents or start[node] <= 0:
+                break
+            node = max(parents, key=finish.__getitem__)
+        path.reverse()
+    return CriticalPath(length, path, start, finish, slack)
+
+
+def remaining_path_priority(graph, weights, order=None):
+    """
+    Ready-queue priority per node: minus the longest weighted path from the
+    node (itself included) down to a leaf, so the lowest value goes first.
+    """
+    if order is None:
+        order = topological_order(graph)
+    tail = array('d', bytes(8 * len(graph)))
+    for node in reversed(order):
+        longest = 0.0
+        for child in graph.children(node):
+            if tail[child] > longest:
+                longest = tail[child]
+        tail[node] = weights[node] + longest
+    return array('d', (-length for length in tail))
+
+
+class Simulation:
+    """Predicted outcome of one simulated build."""
+
+    __slots__ = ('threads', 'wall_time', 'busy_time')
+
+    def __init__(self, threads, wall_time, busy_time):
+        self.threads = threads
+        self.wall_time = wall_time
+        self.busy_time = busy_time
+
+    @property
+    def utilisation(self):
+        """Fraction of thread-seconds spent running nodes."""
+        capacity = self.threads * self.wall_time
+        return self.busy_time / capacity if capacity else 0.0
+
+    def __repr__(self):
+        return (f'Simulation(threads={self.threads}, wall_time={self.wall_time:.2f}, '
+                f'utilisation={self.utilisation:.1%})')
+
+
+def simulate_build(graph, weights, threads, priority=None):
+    """
+    Replay a build of `graph` on `threads` workers.
+
+    Like dbt's graph queue, a node becomes ready when all its parents are
+    done, and ready nodes are taken lowest `priority` first, then by index.
+    The default is remaining_path_priority(): longest remaining path first.
+    Nodes with zero weight (sources, nodes that did not run) complete
+    instantly without holding a thread.
+    """
+    n = len(graph)
+    if priority is None:
+        priority = remaining_path_priority(graph, weights)
+    remaining = [len(graph.parents(i)) for i in range(n)]
+    ready = []
+    running = []
+    now = 0.0
+    busy = 0.0
+
+    def release(node):
+        # Zero-weight nodes finish the moment they become ready
+        pending = [node]
+        while pending:
+            node = pending.pop()
+            if weights[node] > 0:
+                heapq.heappush(ready, (priority[node], node))
+                continue
+            for child in graph.children(node):
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    pending.append(child)
+
+    def complete(node):
+        for child in graph.children(node):
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                release(child)
+
+    for node in [i for i in range(n) if remaining[i] == 0]:
+        release(node)
+    while ready or running:
+        while ready and len(running) < threads:
+            _, node = heapq.heappop(ready)
+            heapq.heappush(running, (now + weights[node], node))
+            busy += weights[node]
+        now, node = heapq.heappop(running)
+        complete(node)
+        # Finish everything that ends at the same instant before scheduling
+        while running and running[0][0] <= now:
+            complete(heapq.heappop(running)[1])
+    return Simulation(threads, now, busy)
+
+
+def simulate_threads(graph, weights, max_threads, priority=None):
+    """Simulation for every thread count from 1 to `max_threads`."""
+    if priority is None:
+        priority = remaining_path_priority(graph, weights)
+    return [simulate_build(graph, weights, threads, priority)
+            for threads in range(1, max_threads + 1)]
+
+
+def saturating_threads(simulations, tolerance=SATURATION_TOLERANCE):
+    """Smallest thread count whose wall time is within `tolerance` of the best."""
+    best = min(simulation.wall_time for simulation in simulations)
+    for simulation in simulations:
+        if simulation.wall_time <= best * (1 + tolerance):
+            return simulation
+    return simulations[-1]
@@ -0,0 +1,394 @@
+"""
+Local lineage query server.
+
+`python -m lineage serve` loads the graph once and answers lineage
+questions over HTTP/JSON from memory, so tools that ask many questions do
+not re-read manifest.json for each one. It is a small asyncio HTTP/1.1
+server with keep-alive and no dependencies, meant for localhost:
+
+    GET /api/stats
+    GET /api/node?node=dim_customers
+    GET /api/ancestors?node=dim_customers&depth=2&type=model
+    GET /api/descendants?node=stg_orders
+    GET /api/path?from=raw_orders&to=dim_customers
+    GET /api/subgraph?node=stg_orders&depth=1&direction=both
+    GET /                  the lazy viewer (lineage.viewer), whose chunks
+    GET /api/chunk/<v>/<k> and search (/api/resolve) are fetched on demand
+
+Each loaded graph is a LineageSnapshot: the graph, its LineageQuery index,
+the encoded viewer chunks and an LRU cache of encoded responses. Requests
+use whichever snapshot is current when they arrive. When the manifests
+change (polled like --watch, with the same debounce) the next snapshot is
+built in a worker thread while the old one keeps serving, then swapped in
+with a single assignment. A reload therefore never exposes a half-updated
+graph, and the response cache is dropped with the old snapshot. A change
+that alters nothing served (a checksum-only edit) keeps the current
+snapshot. Viewer pages carry their snapshot version and get 409 after a
+reload, so a page never mixes chunks of two graphs.
+"""
+
+import datetime
+import json
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from lineage.graph import NODE_TYPES
+from lineage.layout import layered_layout
+from lineage.merge import load_project_lineage
+from lineage.query import LineageQuery, QueryError
+from lineage.viewer import build_chunks, served_lazy_html
+from lineage.watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, FileWatcher, reload_graph, same_structure
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Encoded responses kept per snapshot
+DEFAULT_RESULT_CACHE = 1024
+
+# Longest request line plus headers accepted
+MAX_HEADER_BYTES = 16 * 1024
+
+
+class HttpError(Exception):
+    """An error response with a specific status code."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _encode(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+class LineageSnapshot:
+    """One loaded version of the graph and everything served from it."""
+
+    __slots__ = ('graph', 'query', 'version', 'loaded_at', 'page', 'chunks', 'results',
+                 'result_limit', 'hits', 'misses')
+
+    def __init__(self, graph, version, result_limit=DEFAULT_RESULT_CACHE):
+        self.graph = graph
+        self.query = LineageQuery(graph)
+        # Build the sort order and both reachability indexes here, off the event
+        # loop when reloading, rather than inline in the first request
+        self.query.order
+        self.query.ancestor_bits
+        self.query.descendant_bits
+        self.version = version
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        layout = layered_layout(graph)
+        self.chunks = [_encode(chunk) for chunk in build_chunks(graph, layout)]
+        self.page = served_lazy_html(graph, f'/api/chunk/{version}/',
+                                     f'/api/resolve?version={version}&node=').encode('utf-8')
+        self.results = OrderedDict()
+        self.result_limit = result_limit
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, key, compute):
+        """Encoded result for `key`, computed on a miss and kept in an LRU cache."""
+        body = self.results.get(key)
+        if body is not None:
+            self.results.move_to_end(key)
+            self.hits += 1
+            return body
+        self.misses += 1
+        body = _encode(compute())
+        if self.result_limit > 0:
+            self.results[key] = body
+            if len(self.results) > self.result_limit:
+                self.results.popitem(last=False)
+        return body
+
+    def describe(self, i):
+        graph = self.graph
+        return {'index': i, 'unique_id': graph.ids[i], 'name': graph.names[i], 'type': graph.node_type(i)}
+
+
+def _param(params, name, default=None):
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise HttpError(400, f'missing query parameter {name!r}')
+        return default
+    return values[-1]
+
+
+def _int_param(params, name):
+    if name not in params:
+        return None
+    try:
+        value = int(params[name][-1])
+    except ValueError:
+        raise HttpError(400, f'{name} must be an integer')
+    if value < 0:
+        raise HttpError(400, f'{name} must not be negative')
+    return value
+
+
+def _type_param(params):
+    node_types = params.get('type')
+    unknown = [node_type for node_type in node_types or () if node_type not in NODE_TYPES]
+    if unknown:
+        raise HttpError(400, f"unknown type(s): {', '.join(unknown)}")
+    return node_types
+
+
+def api_stats(snapshot, params):
+    return {
+        'version': snapshot.version,
+        'loaded_at': snapshot.loaded_at,
+        'nodes': len(snapshot.graph),
+        'edges': snapshot.graph.number_of_edges(),
+        'types': snapshot.graph.type_counts(),
+        'result_cache': {'entries': len(snapshot.results), 'hits': snapshot.hits,
+                         'misses': snapshot.misses},
+    }
+
+
+def api_node(snapshot, params):
+    query = snapshot.query
+    i = query.resolve(_param(params, 'node'))
+    graph = snapshot.graph
+    node = snapshot.describe(i)
+    node['parents'] = [graph.ids[j] for j in graph.parents(i)]
+    node['children'] = [graph.ids[j] for j in graph.children(i)]
+    return node
+
+
+def api_resolve(snapshot, params):
+    version = _int_param(params, 'version')
+    if version is not None and version != snapshot.version:
+        raise HttpError(409, 'the lineage graph was reloaded; refresh the page')
+    try:
+        return snapshot.describe(snapshot.query.resolve(_param(params, 'node')))
+    except QueryError:
+        # The viewer treats a result without an index as "no match"
+        return {}
+
+
+def _related(snapshot, params, direction):
+    query = snapshot.query
+    node = _param(params, 'node')
+    depth = _int_param(params, 'depth')
+    related = query.ancestors if direction == 'ancestors' else query.descendants
+    indices = related(node, depth=depth, node_types=_type_param(params))
+    hops = query.distances(node, upstream=direction == 'ancestors', depth=depth)
+    related_nodes = []
+    for i in indices:
+        entry = snapshot.describe(i)
+        entry['depth'] = hops[i]
+        related_nodes.append(entry)
+    return {'node': snapshot.graph.ids[query.resolve(node)], direction: related_nodes}
+
+
+def api_ancestors(snapshot, params):
+    return _related(snapshot, params, 'ancestors')
+
+
+def api_descendants(snapshot, params):
+    return _related(snapshot, params, 'descendants')
+
+
+def api_path(snapshot, params):
+    path = snapshot.query.path(_param(params, 'from'), _param(params, 'to'))
+    return {'path': None if path is None else [snapshot.describe(i) for i in path]}
+
+
+def api_subgraph(snapshot, params):
+    query = snapshot.query
+    graph = snapshot.graph
+    i = query.resolve(_param(params, 'node'))
+    depth = _int_param(params, 'depth')
+    depth = 1 if depth is None else depth
+    direction = _param(params, 'direction', 'both')
+    if direction not in ('up', 'down', 'both'):
+        raise HttpError(400, "direction must be 'up', 'down' or 'both'")
+    members = {i}
+    if direction in ('up', 'both'):
+        members.update(query.ancestors(i, depth=depth))
+    if direction in ('down', 'both'):
+        members.update(query.descendants(i, depth=depth))
+    members = sorted(members)
+    return {
+        'node': graph.ids[i],
+        'nodes': [snapshot.describe(j) for j in members],
+        'edges': [[graph.ids[j], graph.ids[child]] for j in members
+                  for child in graph.children(j) if child in members],
+    }
+
+
+API_HANDLERS = {
+    '/api/stats': api_stats,
+    '/api/node': api_node,
+    '/api/resolve': api_resolve,
+    '/api/ancestors': api_ancestors,
+    '/api/descendants': api_descendants,
+    '/api/path': api_path,
+    '/api/subgraph': api_subgraph,
+}
+
+# Answers that change while a snapshot is current are never cached
+UNCACHED = ('/api/stats',)
+
+
+class LineageServer:
+    """Serves one project's lineage and reloads it when the manifests change."""
+
+    def __init__(self, manifest_paths, cache=None, incremental=True, result_limit=DEFAULT_RESULT_CACHE,
+                 interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        self.manifest_paths = [Path(path) for path in manifest_paths]
+        self.cache = cache
+        self.incremental = incremental
+        self.result_limit = result_limit
+        self.watcher = FileWatcher(self.manifest_paths, interval, debounce)
+        # The latest graph read from the manifests; the served one only moves
+        # on when something it serves changed
+        self.graph, _ = load_project_lineage(self.manifest_paths, cache, incremental)
+        self.snapshot = LineageSnapshot(self.graph, 1, result_limit)
+
+    def _next_snapshot(self, current):
+        """The snapshot to serve next, or None when nothing served changed."""
+        self.graph = reload_graph(self.manifest_paths, self.graph, self.cache, self.incremental)
+        # Served fields are ids, names, types and edges: a checksum-only edit
+        # keeps the snapshot, its result cache and the open viewer pages
+        if same_structure(current.graph, self.graph):
+            return None
+        return LineageSnapshot(self.graph, current.version + 1, self.result_limit)
+
+    async def watch_manifests(self):
+        """Poll the manifests; build and swap in a new snapshot after each change."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.watcher.interval)
+            if not self.watcher.check():
+                continue
+            try:
+                snapshot = await loop.run_in_executor(None, self._next_snapshot, self.snapshot)
+            except (OSError, ValueError) as error:
+                # Usually a manifest caught mid-write; the next write triggers another try
+                print(f"⚠️  Could not reload: {error}; still serving version {self.snapshot.version}")
+                continue
+            except Exception:
+                # Anything else would end this task silently and stop all reloads
+                print(f"⚠️  Reload failed; still serving version {self.snapshot.version}:\n"
+                      f"{traceback.format_exc()}")
+                continue
+            if snapshot is None:
+                print(f"✓ Nothing served has changed; still serving version {self.snapshot.version}")
+                continue
+            self.snapshot = snapshot
+            print(f"🔄 Serving version {snapshot.version}: {len(snapshot.graph):,} nodes, "
+                  f"{snapshot.graph.number_of_edges():,} edges")
+
+    def respond(self, method, target):
+        """Return (status, content_type, body) for a request."""
+        if method not in ('GET', 'HEAD'):
+            raise HttpError(405, f'{method} is not supported')
+        url = urlsplit(target)
+        # One snapshot per request, even if a reload lands meanwhile
+        snapshot = self.snapshot
+        if url.path in ('/', '/index.html'):
+            return 200, 'text/html; charset=utf-8', snapshot.page
+        if url.path.startswith('/api/chunk/'):
+            try:
+                version, k = map(int, url.path[len('/api/chunk/'):].split('/'))
+            except ValueError:
+                raise HttpError(404, f'no such chunk: {url.path}')
+            if version != snapshot.version:
+                raise HttpError(409, 'the lineage graph was reloaded; refresh the page')
+            if not 0 <= k < len(snapshot.chunks):
+                raise HttpError(404, f'no such chunk: {k}')
+            return 200, 'application/json', snapshot.chunks[k]
+        handler = API_HANDLERS.get(url.path)
+        if handler is None:
+            raise HttpError(404, f'unknown endpoint {url.path}')
+        params = parse_qs(url.query)
+        if url.path in UNCACHED:
+            return 200, 'application/json', _encode(handler(snapshot, params))
+        return 200, 'application/json', snapshot.cached(
+            (url.path, url.query), lambda: handler(snapshot, params))
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one (keep-alive) connection."""
+        import asyncio
+
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 'GET', 431, 'application/json',
+                                     _encode({'error': 'request headers too large'}), False)
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._send(writer, 'GET', 400, 'application/json',
+                                     _encode({'error': 'malformed request line'}), False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    status, content_type, body = self.respond(method, target)
+                except HttpError as error:
+                    status, content_type, body = error.status, 'application/json', _encode({'error': str(error)})
+                except QueryError as error:
+                    status, content_type, body = 400, 'application/json', _encode({'error': str(error)})
+                await self._send(writer, method, status, content_type, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, method, status, content_type, body, keep_alive):
+        writer.write((f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+                      f'Content-Type: {content_type}\r\n'
+                      f'Content-Length: {len(body)}\r\n'
+                      f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                      '\r\n').encode('latin-1'))
+        if method != 'HEAD':
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Serve until cancelled."""
+        import asyncio
+
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        watcher = asyncio.create_task(self.watch_manifests())
+        snapshot = self.snapshot
+        print(f"🌐 Serving {len(snapshot.graph):,} nodes and {snapshot.graph.number_of_edges():,} edges "
+              f"on http://{host}:{port}/ (Ctrl-C to stop)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+    def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Serve until Ctrl-C (raises KeyboardInterrupt)."""
+        # asyncio alone costs about as much as the rest of `python -m lineage`
+        # to import, so it is only loaded when a server actually starts
+        import asyncio
+
+        asyncio.run(self.serve(host, port))
@@ -0,0 +1,94 @@
+"""
+Import-time budget check for the lineage entry points.
+
+Each module is imported in a fresh interpreter and timed, and the check fails
+if the import exceeds the budget or drags in one of HEAVY_MODULES (those are
+only meant to be imported on the code paths that draw, export or serve). Run it
+from the repository root, e.g. as a pre-commit hook:
+
+    python -m lineage.startup
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+# Libraries that must never be imported just to load an entry point
+HEAVY_MODULES = ('matplotlib', 'networkx', 'numpy', 'pyarrow', 'duckdb', 'sqlglot', 'asyncio')
+
+# Entry points checked by default
+DEFAULT_MODULES = (
+    'lineage',
+    'lineage.cli',
+    'visualize_lineage',
+    'visualize_lineage_advanced',
+    'visualize_lineage_html',
+)
+
+IMPORT_BUDGET_SECONDS = 0.15
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+
+def measure_import(module, cwd=None):
+    """Return (seconds, heavy_modules) for importing `module` in a fresh interpreter."""
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=cwd, capture_output=True, text=True, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report['seconds'], report['heavy']
+
+
+def check_import_budget(modules=DEFAULT_MODULES, budget=IMPORT_BUDGET_SECONDS,
+                        repeat=3, cwd=None):
+    """
+    Import each module `repeat` times and keep the fastest run.
+
+    Returns a list of (module, seconds, heavy_modules, ok) tuples.
+    """
+    results = []
+    for module in modules:
+        runs = [measure_import(module, cwd) for _ in range(repeat)]
+        seconds = min(run[0] for run in runs)
+        heavy = runs[0][1]
+        results.append((module, seconds, heavy, seconds <= budget and not heavy))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check lineage entry point import times.')
+    parser.add_argument('modules', nargs='*', default=list(DEFAULT_MODULES),
+                        help='modules to import (default: the lineage entry points)')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_SECONDS,
+                        help='maximum import time per module in seconds')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='imports per module; the fastest counts')
+    args = parser.parse_args(argv)
+
+    root = Path(__file__).resolve().parent.parent
+    failed = False
+    for module, seconds, heavy, ok in check_import_budget(
+            args.modules, args.budget, args.repeat, cwd=root):
+        status = '✓' if ok else '✗'
+        note = f"  (imports {', '.join(heavy)})" if heavy else ''
+        print(f"{status} {module}: {seconds * 1000:.1f} ms{note}")
+        failed |= not ok
+    if failed:
+        print(f"❌ Import budget of {args.budget * 1000:.0f} ms exceeded or heavy modules imported")
+        return 1
+    print(f"✅ All imports within {args.budget * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
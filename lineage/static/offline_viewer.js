@@ -0,0 +1,282 @@
+/*
+ * Dependency-free canvas viewer for the offline lineage page.
+ *
+ * Reads the same #lineage-meta / #lineage-chunk-N JSON blocks as the lazy
+ * viewer, but draws every node at its precomputed position on a <canvas>.
+ * Nothing is fetched and nothing is laid out in the browser: drag to pan,
+ * scroll to zoom, click a node for its details, search with Enter. Edges
+ * point from parent to child: the selected node's edges always carry an
+ * arrowhead, the others once zoomed in far enough to see them.
+ */
+(function () {
+    var META = JSON.parse(document.getElementById('lineage-meta').textContent);
+    var n = META.n;
+    var ids = [], names = [], types = [], colors = [], durations = [], statuses = [];
+    var xs = new Float64Array(n), ys = new Float64Array(n);
+    var parents = new Array(n), children = new Array(n);
+    var edgeFrom = new Int32Array(META.edges), edgeTo = new Int32Array(META.edges);
+    var edgeCount = 0;
+    // Edges grouped by stroke colour so each colour is one stroke() call
+    var EDGE_COLOR = '#848484';
+    var edgeGroups = {};
+
+    var chunkCount = Math.ceil(n / META.chunkSize);
+    for (var k = 0; k < chunkCount; k++) {
+        var c = JSON.parse(document.getElementById('lineage-chunk-' + k).textContent);
+        for (var j = 0; j < c.ids.length; j++) {
+            var i = c.start + j;
+            ids.push(c.ids[j]);
+            names.push(c.names[j]);
+            types.push(META.types[c.types[j]]);
+            colors.push(c.col ? c.col[j] : (META.colors[types[i]] || '#D3D3D3'));
+            durations.push(c.dur ? c.dur[j] : -1);
+            statuses.push(c.st ? c.st[j] : '');
+            xs[i] = c.x[j];
+            ys[i] = c.y[j];
+            parents[i] = c.p.slice(c.po[j], c.po[j + 1]);
+            children[i] = c.c.slice(c.co[j], c.co[j + 1]);
+            for (var e = 0; e < children[i].length; e++) {
+                var edgeColor = c.ec ? c.ec[c.co[j] + e] : EDGE_COLOR;
+                (edgeGroups[edgeColor] = edgeGroups[edgeColor] || []).push(edgeCount);
+                edgeFrom[edgeCount] = i;
+                edgeTo[edgeCount] = children[i][e];
+                edgeCount++;
+            }
+        }
+    }
+
+    // Group nodes by fill colour so each colour is one fill() call
+    var colorGroups = {};
+    for (var i = 0; i < n; i++) {
+        var color = colors[i];
+        (colorGroups[color] = colorGroups[color] || []).push(i);
+    }
+
+    var RADIUS = 10;
+    var ARROW = 6;
+    var LABEL_MIN_SCALE = 0.6;
+    var canvas = document.getElementById('mynetwork');
+    var ctx = canvas.getContext('2d');
+    var view = {scale: 1, x: 0, y: 0};
+    var selected = -1;
+    var pending = false;
+
+    function resize() {
+        var ratio = window.devicePixelRatio || 1;
+        canvas.width = canvas.clientWidth * ratio;
+        canvas.height = canvas.clientHeight * ratio;
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        redraw();
+    }
+
+    function fit() {
+        if (n === 0) { return; }
+        var minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity;
+        for (var i = 0; i < n; i++) {
+            if (xs[i] < minX) { minX = xs[i]; }
+            if (xs[i] > maxX) { maxX = xs[i]; }
+            if (ys[i] < minY) { minY = ys[i]; }
+            if (ys[i] > maxY) { maxY = ys[i]; }
+        }
+        var width = canvas.clientWidth, height = canvas.clientHeight;
+        view.scale = Math.min(width / (maxX - minX + 4 * RADIUS), height / (maxY - minY + 4 * RADIUS), 2);
+        view.x = width / 2 - view.scale * (minX + maxX) / 2;
+        view.y = height / 2 - view.scale * (minY + maxY) / 2;
+        redraw();
+    }
+
+    function focus(i, scale) {
+        view.scale = scale;
+        view.x = canvas.clientWidth / 2 - scale * xs[i];
+        view.y = canvas.clientHeight / 2 - scale * ys[i];
+        redraw();
+    }
+
+    function redraw() {
+        if (!pending) {
+            pending = true;
+            window.requestAnimationFrame(draw);
+        }
+    }
+
+    // Adds a filled arrowhead for a -> b, its tip on b's outline, to the current path
+    function arrowHead(a, b, size) {
+        var dx = xs[b] - xs[a], dy = ys[b] - ys[a];
+        var length = Math.sqrt(dx * dx + dy * dy);
+        if (length <= RADIUS + size) { return; }
+        var ux = dx / length, uy = dy / length;
+        var tipX = xs[b] - ux * RADIUS, tipY = ys[b] - uy * RADIUS;
+        var baseX = tipX - ux * size, baseY = tipY - uy * size;
+        ctx.moveTo(tipX, tipY);
+        ctx.lineTo(baseX - uy * size / 2, baseY + ux * size / 2);
+        ctx.lineTo(baseX + uy * size / 2, baseY - ux * size / 2);
+        ctx.closePath();
+    }
+
+    function draw() {
+        pending = false;
+        var width = canvas.clientWidth, height = canvas.clientHeight;
+        var s = view.scale;
+        // Visible rectangle in layout coordinates, padded by one node
+        var left = (-view.x) / s - RADIUS, right = (width - view.x) / s + RADIUS;
+        var top = (-view.y) / s - RADIUS, bottom = (height - view.y) / s + RADIUS;
+        function visible(i) { return xs[i] >= left && xs[i] <= right && ys[i] >= top && ys[i] <= bottom; }
+
+        ctx.clearRect(0, 0, width, height);
+        ctx.save();
+        ctx.translate(view.x, view.y);
+        ctx.scale(s, s);
+
+        var arrows = s * ARROW >= 4;
+        for (var edgeColor in edgeGroups) {
+            var heads = [];
+            ctx.beginPath();
+            edgeGroups[edgeColor].forEach(function (e) {
+                var a = edgeFrom[e], b = edgeTo[e];
+                if (!visible(a) && !visible(b)) { return; }
+                ctx.moveTo(xs[a], ys[a]);
+                ctx.lineTo(xs[b], ys[b]);
+                if (arrows && visible(b)) { heads.push(e); }
+            });
+            ctx.strokeStyle = edgeColor;
+            ctx.lineWidth = (edgeColor === EDGE_COLOR ? 1 : 3) / s;
+            ctx.stroke();
+            if (heads.length) {
+                ctx.beginPath();
+                heads.forEach(function (e) { arrowHead(edgeFrom[e], edgeTo[e], ARROW); });
+                ctx.fillStyle = edgeColor;
+                ctx.fill();
+            }
+        }
+
+        if (selected >= 0) {
+            // Sized in screen pixels so the direction stays readable when zoomed out
+            var size = Math.max(ARROW * 1.5, 12 / s);
+            ctx.beginPath();
+            parents[selected].forEach(function (p) { ctx.moveTo(xs[p], ys[p]); ctx.lineTo(xs[selected], ys[selected]); });
+            children[selected].forEach(function (c) { ctx.moveTo(xs[selected], ys[selected]); ctx.lineTo(xs[c], ys[c]); });
+            ctx.strokeStyle = '#2c3e50';
+            ctx.lineWidth = 3 / s;
+            ctx.stroke();
+            ctx.beginPath();
+            parents[selected].forEach(function (p) { arrowHead(p, selected, size); });
+            children[selected].forEach(function (c) { arrowHead(selected, c, size); });
+            ctx.fillStyle = '#2c3e50';
+            ctx.fill();
+        }
+
+        var shown = 0;
+        for (var color in colorGroups) {
+            ctx.beginPath();
+            colorGroups[color].forEach(function (i) {
+                if (!visible(i)) { return; }
+                shown++;
+                ctx.moveTo(xs[i] + RADIUS, ys[i]);
+                ctx.arc(xs[i], ys[i], RADIUS, 0, 2 * Math.PI);
+            });
+            ctx.fillStyle = color;
+            ctx.fill();
+            if (s * RADIUS >= 3) {
+                ctx.strokeStyle = '#000000';
+                ctx.lineWidth = 1 / s;
+                ctx.stroke();
+            }
+        }
+
+        if (selected >= 0) {
+            ctx.beginPath();
+            ctx.arc(xs[selected], ys[selected], RADIUS * 1.5, 0, 2 * Math.PI);
+            ctx.strokeStyle = '#e74c3c';
+            ctx.lineWidth = 3 / s;
+            ctx.stroke();
+        }
+
+        // Labels only once they are readable and few enough to draw quickly
+        if (s >= LABEL_MIN_SCALE && shown <= 3000) {
+            ctx.fillStyle = '#000000';
+            ctx.font = '12px Arial';
+            ctx.textAlign = 'center';
+            for (var i = 0; i < n; i++) {
+                if (visible(i)) { ctx.fillText(names[i], xs[i], ys[i] + RADIUS + 12); }
+            }
+        }
+        ctx.restore();
+        document.getElementById('visible-count').textContent = shown;
+    }
+
+    function nodeAt(px, py) {
+        var x = (px - view.x) / view.scale, y = (py - view.y) / view.scale;
+        var best = -1, bestDistance = RADIUS * RADIUS * 2.25;
+        for (var i = 0; i < n; i++) {
+            var dx = xs[i] - x, dy = ys[i] - y, d = dx * dx + dy * dy;
+            if (d < bestDistance) { best = i; bestDistance = d; }
+        }
+        return best;
+    }
+
+    function select(i) {
+        selected = i;
+        document.getElementById('selected').textContent = i < 0 ? '' :
+            ids[i] + ' (' + types[i] + ', ' + parents[i].length + ' parents, ' +
+            children[i].length + ' children' +
+            (durations[i] >= 0 ? ', ' + durations[i] + 's' + (statuses[i] ? ' ' + statuses[i] : '') : '') + ')';
+        redraw();
+    }
+
+    function findNode(text) {
+        text = text.toLowerCase();
+        for (var i = 0; i < n; i++) {
+            if (names[i].toLowerCase() === text || ids[i].toLowerCase() === text) { return i; }
+        }
+        for (var i = 0; i < n; i++) {
+            if (names[i].toLowerCase().indexOf(text) >= 0) { return i; }
+        }
+        return -1;
+    }
+
+    var drag = null;
+    canvas.addEventListener('mousedown', function (event) {
+        drag = {x: event.clientX, y: event.clientY, moved: false};
+    });
+    window.addEventListener('mousemove', function (event) {
+        if (!drag) { return; }
+        var dx = event.clientX - drag.x, dy = event.clientY - drag.y;
+        if (dx || dy) {
+            drag.moved = true;
+            view.x += dx;
+            view.y += dy;
+            drag.x = event.clientX;
+            drag.y = event.clientY;
+            redraw();
+        }
+    });
+    window.addEventListener('mouseup', function (event) {
+        if (drag && !drag.moved) {
+            var rect = canvas.getBoundingClientRect();
+            select(nodeAt(event.clientX - rect.left, event.clientY - rect.top));
+        }
+        drag = null;
+    });
+    canvas.addEventListener('wheel', function (event) {
+        event.preventDefault();
+        var rect = canvas.getBoundingClientRect();
+        var px = event.clientX - rect.left, py = event.clientY - rect.top;
+        var factor = event.deltaY < 0 ? 1.2 : 1 / 1.2;
+        view.x = px - (px - view.x) * factor;
+        view.y = py - (py - view.y) * factor;
+        view.scale *= factor;
+        redraw();
+    }, {passive: false});
+    window.addEventListener('resize', resize);
+
+    document.getElementById('search').addEventListener('keydown', function (event) {
+        if (event.key !== 'Enter') { return; }
+        var i = findNode(this.value);
+        if (i < 0) { document.getElementById('selected').textContent = 'No node matches "' + this.value + '"'; return; }
+        select(i);
+        focus(i, Math.max(view.scale, 1.2));
+    });
+
+    resize();
+    fit();
+})();
@@ -0,0 +1,495 @@
+"""
+Synthetic dbt projects for scaling benchmarks.
+
+The bundled projects have a few dozen nodes and seeds with ten rows, which
+is nowhere near the size the lineage tools are meant to handle. This module
+generates projects with the same layer structure as lineage_advanced
+(sources -> staging -> intermediate -> marts, plus snapshots and tests) at
+any size: model counts, fan-in, how strongly a few hub models dominate the
+fan-out, and seed row counts are all configurable.
+
+Alongside the dbt project it writes a matching target/manifest.json
+(compiled SQL, relation names, documented columns, parent/child maps), so
+the lineage scripts can be benchmarked without dbt installed. With dbt the
+project builds as usual against DuckDB:
+
+    python -m lineage.synthetic --models 5000 --rows 1000000 --output /tmp/synthetic
+    cd /tmp/synthetic && dbt build --profiles-dir .
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import random
+import sys
+from pathlib import Path
+
+
+DEFAULT_PROJECT_NAME = 'lineage_synthetic'
+SOURCE_NAME = 'synthetic_raw'
+
+# Seed columns; every model exposes the same shape under its own prefix
+SEED_COLUMNS = ('id', 'amount', 'category', 'created_at')
+CATEGORIES = ('alpha', 'beta', 'gamma', 'delta', 'epsilon')
+
+# Share of the non-staging models that are marts
+MART_SHARE = 0.2
+
+# Tests attached to every model's id column, in order
+ID_TESTS = ('unique', 'not_null')
+
+MANIFEST_SCHEMA = 'https://schemas.getdbt.com/dbt/manifest/v12.json'
+
+# Seed rows written per call to writelines()
+ROW_BATCH = 10_000
+
+
+class SyntheticNode:
+    """One node of a planned project; `parents` are unique_ids."""
+
+    __slots__ = ('unique_id', 'name', 'resource_type', 'layer', 'parents', 'path')
+
+    def __init__(self, unique_id, name, resource_type, layer, parents=(), path=''):
+        self.unique_id = unique_id
+        self.name = name
+        self.resource_type = resource_type
+        self.layer = layer
+        self.parents = list(parents)
+        self.path = path
+
+
+def _skewed_pool(nodes, skew, rng):
+    """(nodes, cumulative weights) where rank r is picked with weight 1/(r+1)**skew."""
+    nodes = list(nodes)
+    rng.shuffle(nodes)
+    weights = []
+    total = 0.0
+    for rank in range(len(nodes)):
+        total += 1.0 / (rank + 1) ** skew
+        weights.append(total)
+    return nodes, weights
+
+
+def _pick(pool, rng, k=1):
+    nodes, weights = pool
+    return rng.choices(nodes, cum_weights=weights, k=k)
+
+
+def plan_project(name=DEFAULT_PROJECT_NAME, models=200, seeds=10, intermediate_layers=2,
+                 fan_in=3, fan_out_skew=1.0, snapshots=2, tests=len(ID_TESTS), random_seed=0):
+    """
+    Lay out the nodes of a synthetic project.
+
+    `models` counts staging, intermediate and mart models; there is one
+    staging model per seed. Every intermediate and mart model reads from
+    1..`fan_in` upstream models, at least one from the layer directly below
+    it. `fan_out_skew` = 0 spreads children evenly over the candidates;
+    larger values concentrate them on a few hub models. Returns the nodes
+    in dependency order.
+    """
+    if seeds < 1:
+        raise ValueError('a synthetic project needs at least one seed')
+    if intermediate_layers < 0 or fan_in < 1 or fan_out_skew < 0:
+        raise ValueError('intermediate_layers, fan_in and fan_out_skew must not be negative')
+    if models < seeds + intermediate_layers + 1:
+        raise ValueError(f'{models} models is too few for {seeds} staging models, '
+                         f'{intermediate_layers} intermediate layers and a mart')
+    rng = random.Random(random_seed)
+    width = len(str(max(models, seeds)))
+    nodes = []
+
+    staging = []
+    for i in range(1, seeds + 1):
+        raw = f'raw_{i:0{width}d}'
+        nodes.append(SyntheticNode(f'seed.{name}.{raw}', raw, 'seed', 'seeds', path=f'seeds/{raw}.csv'))
+        source = SyntheticNode(f'source.{name}.{SOURCE_NAME}.{raw}', raw, 'source', 'sources',
+                               path='models/sources.yml')
+        stg = f'stg_{i:0{width}d}'
+        model = SyntheticNode(f'model.{name}.{stg}', stg, 'model', 'staging', [source.unique_id],
+                              f'models/staging/{stg}.sql')
+        nodes.extend((source, model))
+        staging.append(model)
+
+    remaining = models - seeds
+    marts = min(max(1, int(remaining * MART_SHARE)), remaining - intermediate_layers)
+    per_layer = [(remaining - marts) // intermediate_layers + (k < (remaining - marts) % intermediate_layers)
+                 for k in range(intermediate_layers)] if intermediate_layers else []
+
+    layers = [staging]
+
+    def add_models(count, prefix, folder, layer):
+        below = _skewed_pool(layers[-1], fan_out_skew, rng)
+        anywhere = _skewed_pool([node for layer_nodes in layers for node in layer_nodes], fan_out_skew, rng)
+        created = []
+        for number in range(1, count + 1):
+            model_name = prefix(number)
+            parents = _pick(below, rng) + _pick(anywhere, rng, rng.randint(1, fan_in) - 1)
+            parent_ids = list(dict.fromkeys(parent.unique_id for parent in parents))
+            created.append(SyntheticNode(f'model.{name}.{model_name}', model_name, 'model', layer,
+                                         parent_ids, f'models/{folder}/{model_name}.sql'))
+        nodes.extend(created)
+        layers.append(created)
+
+    for k, count in enumerate(per_layer, start=1):
+        add_models(count, lambda n, k=k: f'int_{k}_{n:0{width}d}', 'intermediate', 'intermediate')
+    add_models(marts, lambda n: f"{'fct' if n % 2 else 'dim'}_{n:0{width}d}", 'marts', 'marts')
+
+    step = max(1, len(staging) // max(snapshots, 1))
+    for i, model in enumerate(staging[::step][:snapshots], start=1):
+        snap = f'snap_{i:0{width}d}'
+        nodes.append(SyntheticNode(f'snapshot.{name}.{snap}', snap, 'snapshot', 'snapshots',
+                                   [model.unique_id], f'snapshots/{snap}.sql'))
+
+    for node in [node for node in nodes if node.resource_type == 'model']:
+        for test in ID_TESTS[:tests]:
+            test_name = f'{test}_{node.name}_id'
+            suffix = hashlib.sha256(f'{node.unique_id}.{test}'.encode()).hexdigest()[:10]
+            nodes.append(SyntheticNode(f'test.{name}.{test_name}.{suffix}', test_name, 'test',
+                                       node.layer, [node.unique_id], f'models/{node.layer}/schema.yml'))
+    return nodes
+
+
+def _test_kind(node):
+    return next(test for test in ID_TESTS if node.name.startswith(f'{test}_'))
+
+
+def model_columns(node):
+    """Output columns of a node, in order."""
+    if node.resource_type in ('seed', 'source'):
+        return list(SEED_COLUMNS)
+    if node.resource_type == 'snapshot':
+        parent = node.parents[0].rsplit('.', 1)[-1]
+        return ['id', f'{parent}_amount', f'{parent}_category']
+    return ['id'] + [f'{node.name}_{column}' for column in SEED_COLUMNS[1:]]
+
+
+def node_sql(node, by_id, ref, source, compiled=False):
+    """
+    SQL for a model or snapshot.
+
+    `ref(name)` and `source(source_name, table)` render relation references,
+    so the same function produces both the Jinja and the compiled SQL
+    (`compiled` drops the snapshot block around a snapshot's select).
+    """
+    if node.layer == 'staging':
+        table = by_id[node.parents[0]].name
+        return (f"-- Staging: clean {table}\n"
+                f"with source as (\n"
+                f"    select * from {source(SOURCE_NAME, table)}\n"
+                f"),\n\n"
+                f"cleaned as (\n"
+                f"    select\n"
+                f"        id,\n"
+                f"        amount as {node.name}_amount,\n"
+                f"        category as {node.name}_category,\n"
+                f"        created_at::date as {node.name}_created_at\n"
+                f"    from source\n"
+                f")\n\n"
+                f"select * from cleaned\n")
+    if node.resource_type == 'snapshot':
+        parent = by_id[node.parents[0]].name
+        select = (f"select\n"
+                  f"    id,\n"
+                  f"    {parent}_amount,\n"
+                  f"    {parent}_category\n"
+                  f"from {ref(parent)}\n")
+        if compiled:
+            return select
+        return (f"{{% snapshot {node.name} %}}\n\n"
+                f"{{{{\n"
+                f"    config(\n"
+                f"      target_schema='snapshots',\n"
+                f"      unique_key='id',\n"
+                f"      strategy='check',\n"
+                f"      check_cols=['{parent}_category'],\n"
+                f"    )\n"
+                f"}}}}\n\n"
+                f"{select}\n"
+                f"{{% endsnapshot %}}\n")
+
+    parents = [by_id[parent].name for parent in node.parents]
+    first = parents[0]
+    ctes = ',\n\n'.join(f"{parent} as (\n    select * from {ref(parent)}\n)" for parent in parents)
+    amount = ' + '.join(f'coalesce({parent}.{parent}_amount, 0)' for parent in parents)
+    joins = ''.join(f"\n    left join {parent} on {first}.id = {parent}.id" for parent in parents[1:])
+    return (f"-- {node.layer.capitalize()}: combine {', '.join(parents)}\n"
+            f"with {ctes},\n\n"
+            f"combined as (\n"
+            f"    select\n"
+            f"        {first}.id,\n"
+            f"        {amount} as {node.name}_amount,\n"
+            f"        {first}.{first}_category as {node.name}_category,\n"
+            f"        {first}.{first}_created_at as {node.name}_created_at\n"
+            f"    from {first}{joins}\n"
+            f")\n\n"
+            f"select * from combined\n")
+
+
+def _relation(database, schema, name):
+    return f'"{database}"."{schema}"."{name}"'
+
+
+def _jinja_ref(name):
+    return f"{{{{ ref('{name}') }}}}"
+
+
+def _jinja_source(source_name, table):
+    return f"{{{{ source('{source_name}', '{table}') }}}}"
+
+
+def manifest_nodes(nodes, name=DEFAULT_PROJECT_NAME, section=None):
+    """Yield (section, unique_id, manifest entry) for the planned nodes, optionally of one section."""
+    by_id = {node.unique_id: node for node in nodes}
+
+    def compiled_ref(model):
+        schema = 'snapshots' if model.startswith('snap_') else 'main'
+        return _relation(name, schema, model)
+
+    def compiled_source(source_name, table):
+        return _relation(name, 'main', table)
+
+    for node in nodes:
+        node_section = 'sources' if node.resource_type == 'source' else 'nodes'
+        if section is not None and node_section != section:
+            continue
+        schema = 'snapshots' if node.resource_type == 'snapshot' else 'main'
+        entry = {
+            'unique_id': node.unique_id,
+            'name': node.name,
+            'resource_type': node.resource_type,
+            'package_name': name,
+            'path': node.path.split('/', 1)[-1],
+            'original_file_path': node.path,
+            'fqn': [name] + node.path.split('/')[1:-1] + [node.name],
+            'database': name,
+            'schema': schema,
+            'depends_on': {'macros': [], 'nodes': node.parents},
+        }
+        if node.resource_type == 'test':
+            entry['schema'] = 'main_dbt_test__audit'
+            entry['attached_node'] = node.parents[0]
+            entry['test_metadata'] = {'name': _test_kind(node), 'kwargs': {'column_name': 'id'}}
+            entry['checksum'] = {'name': 'none', 'checksum': ''}
+        elif node.resource_type in ('seed', 'source'):
+            entry['relation_name'] = _relation(name, schema, node.name)
+            entry['columns'] = {column: {'name': column, 'description': ''} for column in SEED_COLUMNS}
+            if node.resource_type == 'source':
+                entry['source_name'] = SOURCE_NAME
+                entry['fqn'] = [name, SOURCE_NAME, node.name]
+                del entry['depends_on']
+            else:
+                entry['checksum'] = {'name': 'sha256',
+                                     'checksum': hashlib.sha256(node.unique_id.encode()).hexdigest()}
+        else:
+            raw_code = node_sql(node, by_id, _jinja_ref, _jinja_source)
+            entry['raw_code'] = raw_code
+            entry['compiled_code'] = node_sql(node, by_id, compiled_ref, compiled_source, compiled=True)
+            entry['relation_name'] = _relation(name, schema, node.name)
+            entry['checksum'] = {'name': 'sha256', 'checksum': hashlib.sha256(raw_code.encode()).hexdigest()}
+            entry['config'] = {'materialized': 'snapshot' if node.resource_type == 'snapshot' else
+                               'table' if node.layer == 'marts' else 'view'}
+            entry['columns'] = {column: {'name': column, 'description': ''} for column in model_columns(node)}
+            if node.resource_type == 'model':
+                entry['patch_path'] = f'{name}://models/{node.layer}/schema.yml'
+        yield node_section, node.unique_id, entry
+
+
+def write_manifest(nodes, manifest_path, name=DEFAULT_PROJECT_NAME):
+    """
+    Stream a dbt-shaped manifest.json for `nodes` to `manifest_path`.
+
+    Entries are written one at a time, so memory stays flat however many
+    nodes the project has.
+    """
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    children = {node.unique_id: [] for node in nodes}
+    for node in nodes:
+        for parent in node.parents:
+            children[parent].append(node.unique_id)
+
+    metadata = {
+        'dbt_schema_version': MANIFEST_SCHEMA,
+        'generated_by': 'lineage.synthetic',
+        'generated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'project_name': name,
+        'adapter_type': 'duckdb',
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        f.write('{"metadata": ' + json.dumps(metadata))
+        for section in ('nodes', 'sources'):
+            f.write(f', "{section}": {{')
+            first = True
+            for _, unique_id, entry in manifest_nodes(nodes, name, section):
+                f.write(('' if first else ', ') + json.dumps(unique_id) + ': ' + json.dumps(entry))
+                first = False
+            f.write('}')
+        f.write(', "macros": {}, "docs": {}, "exposures": {}, "metrics": {}')
+        for section, mapping in (('parent_map', {node.unique_id: node.parents for node in nodes}),
+                                 ('child_map', children)):
+            f.write(f', "{section}": {{')
+            f.write(', '.join(json.dumps(key) + ': ' + json.dumps(value) for key, value in mapping.items()))
+            f.write('}')
+        f.write('}\n')
+    return manifest_path
+
+
+def write_seed(path, rows):
+    """Write a seed CSV with `rows` deterministic rows (ids 1..rows)."""
+    base = datetime.date(2023, 1, 1).toordinal()
+    dates = [datetime.date.fromordinal(base + day).isoformat() for day in range(730)]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(SEED_COLUMNS) + '\n')
+        for start in range(1, rows + 1, ROW_BATCH):
+            stop = min(start + ROW_BATCH, rows + 1)
+            f.writelines(f'{i},{i * 7919 % 100000 / 100:.2f},{CATEGORIES[i * 31 % 5]},{dates[i % 730]}\n'
+                         for i in range(start, stop))
+
+
+def _schema_yaml(models, tests):
+    lines = ['version: 2', '', 'models:']
+    for node in models:
+        lines.append(f'  - name: {node.name}')
+        lines.append('    columns:')
+        for column in model_columns(node):
+            lines.append(f'      - name: {column}')
+            if column == 'id' and tests.get(node.unique_id):
+                lines.append('        tests:')
+                lines.extend(f'          - {test}' for test in tests[node.unique_id])
+    return '\n'.join(lines) + '\n'
+
+
+def write_project(nodes, output, name=DEFAULT_PROJECT_NAME, rows=1000):
+    """Write the dbt project files (and seed data) for planned `nodes` under `output`."""
+    output = Path(output)
+    by_id = {node.unique_id: node for node in nodes}
+    for folder in ('models/staging', 'models/intermediate', 'models/marts', 'seeds', 'snapshots',
+                   'macros', 'tests', 'analyses'):
+        (output / folder).mkdir(parents=True, exist_ok=True)
+
+    (output / 'dbt_project.yml').write_text(
+        f"name: '{name}'\n"
+        f"version: '1.0.0'\n"
+        f"profile: '{name}'\n\n"
+        f"model-paths: [\"models\"]\n"
+        f"analysis-paths: [\"analyses\"]\n"
+        f"test-paths: [\"tests\"]\n"
+        f"seed-paths: [\"seeds\"]\n"
+        f"macro-paths: [\"macros\"]\n"
+        f"snapshot-paths: [\"snapshots\"]\n\n"
+        f"clean-targets:\n  - \"target\"\n  - \"dbt_packages\"\n\n"
+        f"models:\n"
+        f"  {name}:\n"
+        f"    staging:\n      +materialized: view\n"
+        f"    intermediate:\n      +materialized: view\n"
+        f"    marts:\n      +materialized: table\n",
+        encoding='utf-8')
+    (output / 'profiles.yml').write_text(
+        f"{name}:\n"
+        f"  target: dev\n"
+        f"  outputs:\n"
+        f"    dev:\n"
+        f"      type: duckdb\n"
+        f"      path: {name}.duckdb\n"
+        f"      threads: 8\n",
+        encoding='utf-8')
+    (output / '.gitignore').write_text('target/\ndbt_packages/\nlogs/\n*.duckdb\n', encoding='utf-8')
+
+    source_tables = [node for node in nodes if node.resource_type == 'source']
+    source_lines = ['version: 2', '', 'sources:', f'  - name: {SOURCE_NAME}', '    schema: main', '    tables:']
+    for node in source_tables:
+        source_lines.append(f'      - name: {node.name}')
+    (output / 'models' / 'sources.yml').write_text('\n'.join(source_lines) + '\n', encoding='utf-8')
+
+    tests = {}
+    for node in nodes:
+        if node.resource_type == 'test':
+            tests.setdefault(node.parents[0], []).append(_test_kind(node))
+    layers = {}
+    for node in nodes:
+        if node.resource_type == 'seed':
+            write_seed(output / node.path, rows)
+        elif node.resource_type in ('model', 'snapshot'):
+            (output / node.path).write_text(node_sql(node, by_id, _jinja_ref, _jinja_source), encoding='utf-8')
+            if node.resource_type == 'model':
+                layers.setdefault(node.layer, []).append(node)
+    for layer, models in layers.items():
+        (output / 'models' / layer / 'schema.yml').write_text(_schema_yaml(models, tests), encoding='utf-8')
+
+
+def generate_project(output, name=DEFAULT_PROJECT_NAME, rows=1000, manifest_only=False, **plan):
+    """
+    Plan and write a synthetic project plus its target/manifest.json.
+
+    `plan` takes the plan_project() options. Returns (nodes, manifest_path).
+    """
+    output = Path(output)
+    nodes = plan_project(name=name, **plan)
+    if not manifest_only:
+        write_project(nodes, output, name, rows)
+    manifest_path = write_manifest(nodes, output / 'target' / 'manifest.json', name)
+    return nodes, manifest_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m lineage.synthetic',
+        description='Generate a synthetic dbt project (and its manifest) for scaling benchmarks.')
+    parser.add_argument('--output', default=DEFAULT_PROJECT_NAME,
+                        help='directory to write the project to')
+    parser.add_argument('--name', default=DEFAULT_PROJECT_NAME, help='dbt project name')
+    parser.add_argument('--models', type=int, default=200,
+                        help='staging + intermediate + mart models')
+    parser.add_argument('--seeds', type=int, default=10,
+                        help='seed tables (one source and one staging model each)')
+    parser.add_argument('--intermediate-layers', type=int, default=2,
+                        help='layers of intermediate models between staging and marts')
+    parser.add_argument('--fan-in', type=int, default=3,
+                        help='maximum upstream models per intermediate or mart model')
+    parser.add_argument('--fan-out-skew', type=float, default=1.0,
+                        help='0 spreads children evenly; larger values create a few hub models')
+    parser.add_argument('--snapshots', type=int, default=2, help='snapshots of staging models')
+    parser.add_argument('--tests', type=int, choices=range(len(ID_TESTS) + 1), default=len(ID_TESTS),
+                        help='tests per model (unique, not_null on id)')
+    parser.add_argument('--rows', type=int, default=1000, help='rows per seed CSV')
+    parser.add_argument('--random-seed', type=int, default=0, help='seed for the random layout')
+    parser.add_argument('--manifest-only', action='store_true',
+                        help='only write target/manifest.json (no project files or seed data)')
+    parser.add_argument('--force', action='store_true',
+                        help='write into an existing, non-empty output directory')
+    args = parser.parse_args(argv)
+
+    output = Path(args.output)
+    if output.exists() and any(output.iterdir()) and not args.force:
+        parser.error(f'{output} is not empty; pass --force to write into it anyway')
+
+    print(f"🏗️  Generating synthetic project '{args.name}' in {output}")
+    try:
+        nodes, manifest_path = generate_project(
+            output, args.name, args.rows, args.manifest_only,
+            models=args.models, seeds=args.seeds, intermediate_layers=args.intermediate_layers,
+            fan_in=args.fan_in, fan_out_skew=args.fan_out_skew, snapshots=args.snapshots,
+            tests=args.tests, random_seed=args.random_seed)
+    except ValueError as error:
+        parser.error(str(error))
+
+    counts = {}
+    fan_out = {}
+    for node in nodes:
+        counts[node.resource_type] = counts.get(node.resource_type, 0) + 1
+        if node.resource_type == 'model':
+            for parent in node.parents:
+                fan_out[parent] = fan_out.get(parent, 0) + 1
+    summary = ', '.join(f"{count:,} {kind}{'s' if count != 1 else ''}" for kind, count in counts.items())
+    print(f"✓ {summary}")
+    print(f"✓ Largest fan-out: {max(fan_out.values(), default=0)} models read from one model")
+    if not args.manifest_only:
+        print(f"✓ Seed CSVs written with {args.rows:,} rows each")
+    print(f"📄 Manifest: {manifest_path} ({manifest_path.stat().st_size / 1e6:.1f} MB)")
+    print(f"\nTry: python visualize_lineage_html.py --manifest {manifest_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
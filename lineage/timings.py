@@ -0,0 +1,171 @@
+"""
+Build timings from dbt's run_results.json.
+
+`dbt run` / `dbt build` write target/run_results.json with the execution
+time and status of every node they touched. RunTimings lines those up with a
+LineageGraph so the renderers can colour nodes by duration and the scripts
+can print the slowest models, which are the first candidates for
+incremental materialization.
+"""
+
+import json
+import math
+from array import array
+from pathlib import Path
+
+
+RUN_RESULTS_NAME = 'run_results.json'
+
+# Duration ramp, fastest to slowest
+DURATION_COLORS = ('#FFF5CC', '#FED976', '#FD8D3C', '#E31A1C', '#800026')
+NO_TIMING_COLOR = '#D3D3D3'
+FAILED_COLOR = '#6A3D9A'
+FAILED_STATUSES = ('error', 'fail', 'runtime error')
+
+# Rows in the slowest-models table
+DEFAULT_TABLE_ROWS = 10
+
+# Resource types the slowest-models table ranks
+MODEL_TYPES = ('model', 'snapshot')
+
+
+class RunTimings:
+    """Per-node execution time (seconds, -1 when not run) and status, indexed like the graph."""
+
+    __slots__ = ('durations', 'statuses', 'elapsed')
+
+    def __init__(self, durations, statuses, elapsed=None):
+        self.durations = durations
+        self.statuses = statuses
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return sum(1 for duration in self.durations if duration >= 0)
+
+    def duration(self, i):
+        duration = self.durations[i]
+        return duration if duration >= 0 else None
+
+    def total(self, graph=None, node_types=None):
+        """Summed execution time, optionally of the `node_types` nodes of `graph` only."""
+        if node_types is None:
+            return sum(duration for duration in self.durations if duration > 0)
+        return sum(duration for i, duration in enumerate(self.durations)
+                   if duration > 0 and graph.node_type(i) in node_types)
+
+
+def load_run_results(run_results_path, graph):
+    """Read run_results.json and align its results with `graph`."""
+    with open(run_results_path, 'r', encoding='utf-8') as f:
+        run_results = json.load(f)
+    durations = array('d', [-1.0]) * len(graph)
+    statuses = [''] * len(graph)
+    index = graph.index
+    for result in run_results.get('results', []):
+        i = index.get(result.get('unique_id'))
+        if i is None:
+            continue
+        durations[i] = float(result.get('execution_time') or 0.0)
+        statuses[i] = str(result.get('status') or '')
+    return RunTimings(durations, statuses, run_results.get('elapsed_time'))
+
+
+def format_seconds(seconds):
+    if seconds < 10:
+        return f'{seconds:.1f}s'
+    if seconds < 120:
+        return f'{seconds:.0f}s'
+    return f'{seconds / 60:.1f}m'
+
+
+def duration_bounds(timings, buckets=len(DURATION_COLORS)):
+    """Bucket upper bounds spaced logarithmically up to the slowest node."""
+    measured = [duration for duration in timings.durations if duration > 0]
+    if not measured:
+        return []
+    low = max(min(measured), 0.01)
+    high = max(measured)
+    if high <= low:
+        return [high] * buckets
+    step = (math.log(high) - math.log(low)) / buckets
+    return [math.exp(math.log(low) + step * (k + 1)) for k in range(buckets)]
+
+
+def duration_colors(timings, colors=DURATION_COLORS):
+    """
+    Colour every node by its execution time.
+
+    Returns (node_colors, legend) where node_colors has one hex colour per
+    node and legend is a list of (label, colour) pairs for the renderers.
+    """
+    bounds = duration_bounds(timings, len(colors))
+    node_colors = []
+    for duration, status in zip(timings.durations, timings.statuses):
+        if status in FAILED_STATUSES:
+            node_colors.append(FAILED_COLOR)
+        elif duration < 0:
+            node_colors.append(NO_TIMING_COLOR)
+        else:
+            bucket = next((k for k, bound in enumerate(bounds) if duration <= bound), len(colors) - 1)
+            node_colors.append(colors[bucket])
+
+    legend = []
+    lower = 0.0
+    for bound, color in zip(bounds, colors):
+        legend.append((f'{format_seconds(lower)}–{format_seconds(bound)}', color))
+        lower = bound
+    if any(status in FAILED_STATUSES for status in timings.statuses):
+        legend.append(('Failed', FAILED_COLOR))
+    legend.append(('Not run', NO_TIMING_COLOR))
+    return node_colors, legend
+
+
+def slowest_nodes(graph, timings, limit=DEFAULT_TABLE_ROWS, node_types=MODEL_TYPES):
+    """Indices of the `limit` slowest nodes of `node_types`, slowest first."""
+    candidates = [i for i in range(len(graph))
+                  if timings.durations[i] >= 0 and graph.node_type(i) in node_types]
+    candidates.sort(key=lambda i: timings.durations[i], reverse=True)
+    return candidates[:limit]
+
+
+def print_slowest_models(graph, timings, limit=DEFAULT_TABLE_ROWS):
+    """
+    Print the slowest models with their share of the summed model time.
+
+    Models and snapshots make up that sum; tests and seeds are left out.
+    """
+    slowest = slowest_nodes(graph, timings, limit)
+    model_total = timings.total(graph, MODEL_TYPES)
+    print("=" * 60)
+    print(f"SLOWEST MODELS ({len(timings)} nodes timed, {format_seconds(timings.total())} total, "
+          f"{format_seconds(model_total)} in models)")
+    print("=" * 60)
+    if not slowest:
+        print("\nNo model timings in run_results.json")
+    else:
+        width = max(len(graph.names[i]) for i in slowest)
+        print(f"\n  {'model':<{width}}  {'time':>8}  {'share':>6}  status")
+        for i in slowest:
+            duration = timings.durations[i]
+            print(f"  {graph.names[i]:<{width}}  {format_seconds(duration):>8}  "
+                  f"{duration / (model_total or 1.0):>6.1%}  {timings.statuses[i]}")
+    print("\n" + "=" * 60 + "\n")
+
+
+def add_timing_arguments(parser):
+    """Add the run_results.json options to an argparse parser."""
+    parser.add_argument('--run-results', default=None,
+                        help=f'path to run_results.json (default: {RUN_RESULTS_NAME} next to the manifest)')
+    parser.add_argument('--color-by', choices=('type', 'duration'), default='type',
+                        help='colour nodes by resource type or by execution time from run_results.json')
+
+
+def timings_from_args(args, manifest_path, graph):
+    """Load the RunTimings selected by add_timing_arguments() options, or None."""
+    path = Path(args.run_results) if args.run_results else Path(manifest_path).with_name(RUN_RESULTS_NAME)
+    if not path.exists():
+        if args.run_results or args.color_by == 'duration':
+            print(f"⚠️  No run results at {path}; run 'dbt run' or 'dbt build' first")
+        return None
+    print(f"⏱️  Loading run timings from: {path}")
+    return load_run_results(path, graph)
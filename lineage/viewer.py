@@ -0,0 +1,655 @@
+"""
+Scalable interactive HTML viewer.
+
+The classic page, generate_html_visualization(), ships every node and edge
+in a single vis.DataSet and lets the browser compute a hierarchical layout,
+which freezes the tab at a few thousand nodes. This viewer instead:
+
+* computes node positions in Python (lineage.layout) so the browser does no
+  layout work and physics stays off;
+* embeds the graph as compact JSON chunks of CHUNK_SIZE nodes, each in its
+  own inert <script type="application/json"> block that is only parsed when
+  a node from that chunk is needed;
+* starts with the most connected nodes and loads a node's neighbourhood on
+  demand when the user double-clicks it (or finds it with the search box).
+
+generate_offline_html() writes the same data blocks with a small canvas
+viewer (lineage/static/offline_viewer.js) inlined instead of vis-network, so
+the page needs no network access at all.
+"""
+
+import io
+import json
+from html import escape
+from pathlib import Path
+
+from lineage.graph import NODE_TYPES
+from lineage.layout import layered_layout
+from lineage.timings import duration_colors
+
+
+CHUNK_SIZE = 2000
+
+# Number of nodes shown when the page opens
+INITIAL_NODES = 150
+
+# Graphs larger than this use the lazy viewer when the mode is 'auto'
+LAZY_THRESHOLD = 2000
+
+# Layout units to screen pixels
+X_SCALE = 80
+Y_SCALE = 30
+
+VIS_NETWORK_URL = 'https://unpkg.com/vis-network/standalone/umd/vis-network.min.js'
+
+# Dependency-free canvas viewer inlined into offline pages
+OFFLINE_VIEWER_PATH = Path(__file__).parent / 'static' / 'offline_viewer.js'
+
+DEFAULT_COLORS = {
+    'seed': '#90EE90',
+    'model': '#87CEEB',
+    'source': '#FFD700',
+}
+
+
+def _compact_json(value):
+    """Serialize without whitespace, safe to embed inside a <script> block."""
+    return json.dumps(value, separators=(',', ':')).replace('</', '<\\/')
+
+
+def build_chunks(graph, layout, chunk_size=CHUNK_SIZE, timings=None, node_colors=None,
+                 edge_colors=None):
+    """
+    Split the graph into node-range chunks.
+
+    Chunk k covers nodes [k * chunk_size, (k + 1) * chunk_size) and carries
+    their ids, names, type codes, pixel positions and CSR-style parent and
+    child lists (offsets local to the chunk, indices global). With
+    lineage.timings RunTimings each chunk also carries per-node colours,
+    durations and statuses. Explicit `node_colors` (one per node) and
+    `edge_colors` (one per edge in graph.edges() order) override them.
+    """
+    if timings is not None and node_colors is None:
+        node_colors, _ = duration_colors(timings)
+    chunks = []
+    for start in range(0, len(graph), chunk_size):
+        stop = min(start + chunk_size, len(graph))
+        chunk = {
+            'start': start,
+            'ids': graph.ids[start:stop],
+            'names': graph.names[start:stop],
+            'types': list(graph.types[start:stop]),
+            'x': [round(layout.x[i] * X_SCALE) for i in range(start, stop)],
+            'y': [round(-layout.y[i] * Y_SCALE) for i in range(start, stop)],
+        }
+        for key, offsets, indices in (('p', graph.parent_offsets, graph.parent_indices),
+                                      ('c', graph.child_offsets, graph.child_indices)):
+            base = offsets[start]
+            chunk[key + 'o'] = [offsets[i] - base for i in range(start, stop + 1)]
+            chunk[key] = indices[base:offsets[stop]].tolist()
+        if edge_colors is not None:
+            # Aligned with 'c': one colour per child edge
+            chunk['ec'] = edge_colors[graph.child_offsets[start]:graph.child_offsets[stop]]
+        if node_colors is not None:
+            chunk['col'] = node_colors[start:stop]
+        if timings is not None:
+            chunk['dur'] = [round(d, 2) for d in timings.durations[start:stop]]
+            chunk['st'] = timings.statuses[start:stop]
+        chunks.append(chunk)
+    return chunks
+
+
+def initial_nodes(graph, limit=INITIAL_NODES):
+    """Pick the most connected nodes to show when the page opens."""
+    if len(graph) <= limit:
+        return list(range(len(graph)))
+    degree = lambda i: graph.in_degree(i) + graph.out_degree(i)
+    return sorted(range(len(graph)), key=degree, reverse=True)[:limit]
+
+
+def viewer_meta(graph, chunk_size, initial, colors, chunk_url=None, resolve_url=None):
+    meta = {
+        'n': len(graph),
+        'edges': graph.number_of_edges(),
+        'chunkSize': chunk_size,
+        'types': list(NODE_TYPES),
+        'colors': colors,
+        'initial': initial,
+    }
+    if chunk_url is not None:
+        meta['chunkUrl'] = chunk_url
+        meta['resolveUrl'] = resolve_url
+    return meta
+
+
+_VIEWER_JS = r"""
+var META = JSON.parse(document.getElementById('lineage-meta').textContent);
+var chunkCache = {};
+
+function chunk(k) {
+    if (!(k in chunkCache)) {
+        chunkCache[k] = JSON.parse(document.getElementById('lineage-chunk-' + k).textContent);
+    }
+    return chunkCache[k];
+}
+
+// Pages served by lineage.server fetch chunks on demand instead of embedding them
+function withChunks(indices, callback) {
+    var missing = {};
+    indices.forEach(function (i) {
+        var k = Math.floor(i / META.chunkSize);
+        if (!(k in chunkCache) && !document.getElementById('lineage-chunk-' + k)) { missing[k] = true; }
+    });
+    var keys = Object.keys(missing);
+    if (keys.length === 0) { callback(); return; }
+    Promise.all(keys.map(function (k) {
+        return fetch(META.chunkUrl + k).then(function (r) { return r.json(); })
+            .then(function (c) { chunkCache[k] = c; });
+    })).then(callback);
+}
+
+function nodeInfo(i) {
+    var c = chunk(Math.floor(i / META.chunkSize));
+    var j = i - c.start;
+    var type = META.types[c.types[j]];
+    return {
+        index: i, id: c.ids[j], name: c.names[j], type: type,
+        x: c.x[j], y: c.y[j],
+        color: c.col ? c.col[j] : (META.colors[type] || '#D3D3D3'),
+        duration: c.dur ? c.dur[j] : -1, status: c.st ? c.st[j] : '',
+        parents: c.p.slice(c.po[j], c.po[j + 1]),
+        children: c.c.slice(c.co[j], c.co[j + 1]),
+        edgeColors: c.ec ? c.ec.slice(c.co[j], c.co[j + 1]) : null
+    };
+}
+
+function edge(from, to) {
+    var e = {id: from + '>' + to, from: from, to: to};
+    var info = nodeInfo(from);
+    if (info.edgeColors) { e.color = {color: info.edgeColors[info.children.indexOf(to)]}; e.width = 3; }
+    return e;
+}
+
+var nodes = new vis.DataSet();
+var edges = new vis.DataSet();
+
+function timing(info) {
+    return info.duration >= 0 ? info.duration + 's' + (info.status ? ' ' + info.status : '') : '';
+}
+
+function showNodes(indices) {
+    var newNodes = [], newEdges = [], pending = {};
+    indices.forEach(function (i) {
+        if (pending[i] || nodes.get(i)) { return; }
+        pending[i] = true;
+        var info = nodeInfo(i);
+        newNodes.push({
+            id: i, label: info.name,
+            title: info.name + '<br>Type: ' + info.type + (timing(info) ? '<br>Time: ' + timing(info) : ''),
+            x: info.x, y: info.y, type: info.type, uniqueId: info.id, color: info.color
+        });
+        info.parents.forEach(function (p) {
+            if (pending[p] || nodes.get(p)) { newEdges.push(edge(p, i)); }
+        });
+        info.children.forEach(function (c) {
+            if (pending[c] || nodes.get(c)) { newEdges.push(edge(i, c)); }
+        });
+    });
+    nodes.add(newNodes);
+    var seen = {};
+    edges.add(newEdges.filter(function (e) {
+        if (seen[e.id] || edges.get(e.id)) { return false; }
+        seen[e.id] = true;
+        return true;
+    }));
+    document.getElementById('visible-count').textContent = nodes.length;
+}
+
+function expand(i, callback) {
+    withChunks([i], function () {
+        var info = nodeInfo(i);
+        var shown = [i].concat(info.parents, info.children);
+        withChunks(shown, function () {
+            showNodes(shown);
+            if (callback) { callback(); }
+        });
+    });
+}
+
+function findNode(text, callback) {
+    if (META.resolveUrl) {
+        fetch(META.resolveUrl + encodeURIComponent(text)).then(function (r) { return r.json(); })
+            .then(function (result) { callback('index' in result ? result.index : -1); });
+        return;
+    }
+    callback(searchChunks(text.toLowerCase()));
+}
+
+function searchChunks(text) {
+    var chunks = Math.ceil(META.n / META.chunkSize);
+    for (var k = 0; k < chunks; k++) {
+        var c = chunk(k);
+        for (var j = 0; j < c.names.length; j++) {
+            if (c.names[j].toLowerCase() === text || c.ids[j].toLowerCase() === text) {
+                return c.start + j;
+            }
+        }
+    }
+    for (var k = 0; k < chunks; k++) {
+        var c = chunk(k);
+        for (var j = 0; j < c.names.length; j++) {
+            if (c.names[j].toLowerCase().indexOf(text) >= 0) { return c.start + j; }
+        }
+    }
+    return -1;
+}
+
+var network = new vis.Network(document.getElementById('mynetwork'), {nodes: nodes, edges: edges}, {
+    nodes: {shape: 'dot', size: 12, font: {size: 12, face: 'Arial'}, borderWidth: 2},
+    edges: {arrows: {to: {enabled: true, scaleFactor: 0.6}}, color: {color: '#848484', highlight: '#2c3e50'},
+            width: 1, smooth: false},
+    layout: {improvedLayout: false},
+    physics: {enabled: false},
+    interaction: {hover: true, tooltipDelay: 200, navigationButtons: true, keyboard: true,
+                  hideEdgesOnDrag: true}
+});
+
+network.on('click', function (params) {
+    if (params.nodes.length > 0) {
+        var info = nodeInfo(params.nodes[0]);
+        document.getElementById('selected').textContent = info.id + ' (' + info.type + ', ' +
+            info.parents.length + ' parents, ' + info.children.length + ' children' +
+            (timing(info) ? ', ' + timing(info) : '') + ')';
+    }
+});
+
+network.on('doubleClick', function (params) {
+    if (params.nodes.length > 0) { expand(params.nodes[0]); }
+});
+
+document.getElementById('search').addEventListener('keydown', function (event) {
+    if (event.key !== 'Enter') { return; }
+    var text = this.value;
+    findNode(text, function (i) {
+        if (i < 0) { document.getElementById('selected').textContent = 'No node matches "' + text + '"'; return; }
+        expand(i, function () {
+            network.selectNodes([i]);
+            network.focus(i, {scale: 1.2, animation: true});
+        });
+    });
+});
+
+withChunks(META.initial, function () {
+    showNodes(META.initial);
+    network.fit();
+});
+"""
+
+
+def _write_page(out, graph, layout, colors, chunk_size, initial, title, subtitle,
+                head_script, network_tag, viewer_script, timings=None, node_colors=None,
+                edge_colors=None, legend=None, chunk_url=None, resolve_url=None):
+    """
+    Write the page shell, the JSON data blocks and the viewer script.
+
+    With `chunk_url` the chunks are left out; the viewer fetches chunk k
+    from chunk_url + k and resolves search text through `resolve_url`.
+    """
+    if legend is None:
+        legend = duration_colors(timings)[1] if timings is not None else list(colors.items())
+    type_counts = graph.type_counts()
+    write = out.write
+    write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{escape(title)}</title>
+    {head_script}
+    <style>
+        body {{ font-family: Arial, Helvetica, sans-serif; margin: 0; padding: 0; }}
+        #header {{ background-color: #2c3e50; color: white; padding: 20px; text-align: center; }}
+        #info {{ background-color: #ecf0f1; padding: 15px; margin: 0; }}
+        #mynetwork {{ display: block; width: 100%; height: 700px; border: 1px solid lightgray; }}
+        .legend {{ padding: 15px; background-color: #f8f9fa; }}
+        .legend-item {{ display: inline-block; margin-right: 20px; }}
+        .legend-color {{ display: inline-block; width: 20px; height: 20px; border: 1px solid black;
+                         margin-right: 5px; vertical-align: middle; }}
+        .stat-item {{ display: inline-block; margin-right: 30px; font-size: 14px; }}
+        .stat-value {{ font-weight: bold; color: #2c3e50; }}
+        #search {{ padding: 4px; width: 300px; }}
+    </style>
+</head>
+<body>
+    <div id="header">
+        <h1>📊 {escape(title)}</h1>
+        <p>{subtitle}</p>
+    </div>
+    <div id="info">
+        <div class="stat-item"><span class="stat-value">{graph.number_of_nodes()}</span> Total Nodes</div>
+        <div class="stat-item"><span class="stat-value">{graph.number_of_edges()}</span> Dependencies</div>
+        <div class="stat-item"><span class="stat-value">{type_counts.get('seed', 0)}</span> Seeds</div>
+        <div class="stat-item"><span class="stat-value">{type_counts.get('model', 0)}</span> Models</div>
+        <div class="stat-item"><span class="stat-value" id="visible-count">0</span> Shown</div>
+        <input id="search" placeholder="Find a model and press Enter">
+        <span id="selected"></span>
+    </div>
+    <div class="legend">
+""")
+    for label, color in legend:
+        write(f'        <div class="legend-item"><span class="legend-color" '
+              f'style="background-color: {color};"></span><span>{escape(label)}</span></div>\n')
+    write(f'    </div>\n    {network_tag}\n')
+    write('    <script type="application/json" id="lineage-meta">')
+    write(_compact_json(viewer_meta(graph, chunk_size, initial, colors, chunk_url, resolve_url)))
+    write('</script>\n')
+    if chunk_url is None:
+        for k, chunk in enumerate(build_chunks(graph, layout, chunk_size, timings, node_colors, edge_colors)):
+            write(f'    <script type="application/json" id="lineage-chunk-{k}">')
+            write(_compact_json(chunk))
+            write('</script>\n')
+    write(f'    <script type="text/javascript">{viewer_script}</script>\n</body>\n</html>\n')
+
+
+def generate_lazy_html(graph, output_path='lineage_interactive.html', layout=None,
+                       colors=None, chunk_size=CHUNK_SIZE, initial_limit=INITIAL_NODES,
+                       title='Data Lineage Visualization', timings=None, node_colors=None,
+                       edge_colors=None, legend=None):
+    """
+    Write the chunked, lazily expanded HTML viewer.
+
+    `layout` defaults to lineage.layout.layered_layout(graph). With
+    `timings` (lineage.timings.RunTimings) nodes are coloured by build time.
+    `node_colors`, `edge_colors` and `legend` work as in lineage.render.
+    """
+    if layout is None:
+        layout = layered_layout(graph)
+    colors = dict(DEFAULT_COLORS if colors is None else colors)
+    initial = initial_nodes(graph, initial_limit)
+    with open(output_path, 'w', encoding='utf-8') as out:
+        _write_page(out, graph, layout, colors, chunk_size, initial, title,
+                    'Double-click a node to load its neighbourhood',
+                    f'<script type="text/javascript" src="{VIS_NETWORK_URL}"></script>',
+                    '<div id="mynetwork"></div>', _VIEWER_JS, timings, node_colors, edge_colors, legend)
+
+    print(f"✓ Interactive HTML visualization saved to: {output_path}")
+    print(f"  Open it in your browser: file://{Path(output_path).absolute()}")
+    return output_path
+
+
+def served_lazy_html(graph, chunk_url, resolve_url, colors=None, chunk_size=CHUNK_SIZE,
+                     initial_limit=INITIAL_NODES, title='Data Lineage Visualization'):
+    """
+    The lazy viewer page without its data, for lineage.server.
+
+    The chunks (build_chunks() with the same chunk_size) are served
+    separately and fetched as the user expands nodes.
+    """
+    colors = dict(DEFAULT_COLORS if colors is None else colors)
+    out = io.StringIO()
+    _write_page(out, graph, None, colors, chunk_size, initial_nodes(graph, initial_limit), title,
+                'Double-click a node to load its neighbourhood',
+                f'<script type="text/javascript" src="{VIS_NETWORK_URL}"></script>',
+                '<div id="mynetwork"></div>', _VIEWER_JS, chunk_url=chunk_url, resolve_url=resolve_url)
+    return out.getvalue()
+
+
+def generate_offline_html(graph, output_path='lineage_interactive.html', layout=None,
+                          colors=None, chunk_size=CHUNK_SIZE, title='Data Lineage Visualization',
+                          timings=None, node_colors=None, edge_colors=None, legend=None):
+    """
+    Write a single self-contained HTML file that works without network access.
+
+    The page inlines the canvas viewer from lineage/static and every node
+    position, so opening it fetches nothing and runs no layout. Colouring
+    options are the same as for generate_lazy_html().
+    """
+    if layout is None:
+        layout = layered_layout(graph)
+    colors = dict(DEFAULT_COLORS if colors is None else colors)
+    viewer_script = OFFLINE_VIEWER_PATH.read_text(encoding='utf-8').replace('</', '<\\/')
+    with open(output_path, 'w', encoding='utf-8') as out:
+        _write_page(out, graph, layout, colors, chunk_size, [], title,
+                    'Drag to pan, scroll to zoom, click a node for details',
+                    '', '<canvas id="mynetwork"></canvas>', viewer_script, timings, node_colors,
+                    edge_colors, legend)
+
+    print(f"✓ Offline HTML visualization saved to: {output_path}")
+    print(f"  Open it in your browser: file://{Path(output_path).absolute()}")
+    return output_path
+
+
+def generate_html_visualization(graph, output_path='lineage_interactive.html', timings=None):
+    """Generate an interactive HTML visualization, coloured by build time when `timings` is given."""
+    
+    node_colors, legend = duration_colors(timings) if timings is not None else (None, None)
+    
+    # Prepare nodes data
+    nodes_data = []
+    for node in graph:
+        node_name = graph.names[node]
+        node_type = graph.node_type(node)
+        
+        # Determine color based on type
+        color_map = {
+            'seed': '#90EE90',
+            'model': '#87CEEB',
+            'source': '#FFD700',
+        }
+        color = color_map.get(node_type, '#D3D3D3')
+        title = f"{node_name}<br>Type: {node_type}"
+        if node_colors is not None:
+            color = node_colors[node]
+            if timings.durations[node] >= 0:
+                title += f"<br>Time: {timings.durations[node]:.2f}s {timings.statuses[node]}"
+        
+        nodes_data.append({
+            'id': graph.ids[node],
+            'label': node_name,
+            'title': title,
+            'color': color,
+            'type': node_type
+        })
+    
+    # Prepare edges data
+    edges_data = []
+    for parent, child in graph.edges():
+        edges_data.append({
+            'from': graph.ids[parent],
+            'to': graph.ids[child]
+        })
+    
+    type_counts = graph.type_counts()
+    
+    legend_items = legend or [('Seeds (Raw Data)', '#90EE90'),
+                              ('Models (Transformations)', '#87CEEB'),
+                              ('Sources', '#FFD700')]
+    legend_html = ''.join(f"""
+        <div class="legend-item">
+            <span class="legend-color" style="background-color: {color};"></span>
+            <span>{label}</span>
+        </div>""" for label, color in legend_items)
+    
+    # Create HTML with vis.js
+    html_content = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Data Lineage Visualization</title>
+    <script type="text/javascript" src="https://unpkg.com/vis-network/standalone/umd/vis-network.min.js"></script>
+    <style>
+        body {{
+            font-family: Arial, Helvetica, sans-serif;
+            margin: 0;
+            padding: 0;
+        }}
+        #header {{
+            background-color: #2c3e50;
+            color: white;
+            padding: 20px;
+            text-align: center;
+        }}
+        #info {{
+            background-color: #ecf0f1;
+            padding: 15px;
+            margin: 0;
+        }}
+        #mynetwork {{
+            width: 100%;
+            height: 700px;
+            border: 1px solid lightgray;
+        }}
+        .legend {{
+            padding: 15px;
+            background-color: #f8f9fa;
+        }}
+        .legend-item {{
+            display: inline-block;
+            margin-right: 20px;
+        }}
+        .legend-color {{
+            display: inline-block;
+            width: 20px;
+            height: 20px;
+            border: 1px solid black;
+            margin-right: 5px;
+            vertical-align: middle;
+        }}
+        #stats {{
+            padding: 15px;
+            background-color: #fff;
+            margin: 10px;
+            border-radius: 5px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .stat-item {{
+            display: inline-block;
+            margin-right: 30px;
+            font-size: 14px;
+        }}
+        .stat-value {{
+            font-weight: bold;
+            color: #2c3e50;
+        }}
+    </style>
+</head>
+<body>
+    <div id="header">
+        <h1>📊 Data Lineage Visualization</h1>
+        <p>Interactive view of your dbt data pipeline</p>
+    </div>
+    
+    <div id="info">
+        <div id="stats">
+            <div class="stat-item">
+                <span class="stat-value">{graph.number_of_nodes()}</span> Total Nodes
+            </div>
+            <div class="stat-item">
+                <span class="stat-value">{graph.number_of_edges()}</span> Dependencies
+            </div>
+            <div class="stat-item">
+                <span class="stat-value">{type_counts.get('seed', 0)}</span> Seeds
+            </div>
+            <div class="stat-item">
+                <span class="stat-value">{type_counts.get('model', 0)}</span> Models
+            </div>
+        </div>
+    </div>
+    
+    <div class="legend">{legend_html}
+    </div>
+    
+    <div id="mynetwork"></div>
+    
+    <script type="text/javascript">
+        // Create nodes and edges
+        var nodes = new vis.DataSet({json.dumps(nodes_data, separators=(',', ':'))});
+        
+        var edges = new vis.DataSet({json.dumps(edges_data, separators=(',', ':'))});
+        
+        // Create network
+        var container = document.getElementById('mynetwork');
+        var data = {{
+            nodes: nodes,
+            edges: edges
+        }};
+        
+        var options = {{
+            nodes: {{
+                shape: 'dot',
+                size: 20,
+                font: {{
+                    size: 14,
+                    face: 'Arial'
+                }},
+                borderWidth: 2,
+                borderWidthSelected: 4
+            }},
+            edges: {{
+                arrows: {{
+                    to: {{
+                        enabled: true,
+                        scaleFactor: 1
+                    }}
+                }},
+                color: {{
+                    color: '#848484',
+                    highlight: '#2c3e50'
+                }},
+                width: 2,
+                smooth: {{
+                    type: 'cubicBezier',
+                    roundness: 0.2
+                }}
+            }},
+            layout: {{
+                hierarchical: {{
+                    direction: 'LR',
+                    sortMethod: 'directed',
+                    levelSeparation: 200,
+                    nodeSpacing: 150
+                }}
+            }},
+            physics: {{
+                enabled: false
+            }},
+            interaction: {{
+                hover: true,
+                tooltipDelay: 200,
+                navigationButtons: true,
+                keyboard: true
+            }}
+        }};
+        
+        var network = new vis.Network(container, data, options);
+        
+        // Add click event
+        network.on("click", function (params) {{
+            if (params.nodes.length > 0) {{
+                var nodeId = params.nodes[0];
+                var node = nodes.get(nodeId);
+                alert("Node: " + node.label + "\\nType: " + node.type);
+            }}
+        }});
+    </script>
+    
+    <div style="padding: 20px; background-color: #f8f9fa; margin-top: 10px;">
+        <h3>💡 Tips:</h3>
+        <ul>
+            <li>Click and drag to pan around the visualization</li>
+            <li>Scroll to zoom in and out</li>
+            <li>Click on a node to see details</li>
+            <li>Hover over nodes to see tooltips</li>
+            <li>Use the navigation buttons in the bottom right</li>
+        </ul>
+    </div>
+</body>
+</html>
+"""
+    
+    with open(output_path, 'w') as f:
+        f.write(html_content)
+    
+    print(f"✓ Interactive HTML visualization saved to: {output_path}")
+    print(f"  Open it in your browser: file://{Path(output_path).absolute()}")
+    
+    return output_path
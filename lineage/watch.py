@@ -0,0 +1,224 @@
+"""
+Watch mode for the lineage scripts.
+
+`--watch` keeps a script running after its first build. The graph stays in
+memory, and the manifests and run_results.json are polled for changes.
+Polling only stats the files, so it works the same on every platform and
+inside containers, and needs no extra dependency. `dbt compile` and `dbt
+run` rewrite their files in several bursts, so a rebuild starts only once
+the files have been quiet for `--debounce` seconds.
+
+A single manifest is brought up to date in memory with update_lineage(),
+which only re-reads the records that changed. Several manifests go back
+through load_project_lineage() and its cache. Outputs are only regenerated
+when something they show changed. A checksum-only change (an edited SQL
+comment) does not alter the drawn graph and a new run_results.json only
+matters when nodes are coloured by duration. The scripts check that with
+the change kinds LineageWatch reports.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from lineage.incremental import update_lineage
+from lineage.merge import load_project_lineage
+from lineage.timings import RUN_RESULTS_NAME, load_run_results
+
+
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_DEBOUNCE = 1.0
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def same_structure(previous, graph):
+    """
+    True when two graphs draw the same: same nodes, names, types and edges.
+
+    Edges are compared as sets, so graphs that list a node's children in a
+    different order still count as the same.
+    """
+    if previous is graph:
+        return True
+    if not (previous.ids == graph.ids and previous.names == graph.names
+            and previous.types == graph.types):
+        return False
+    if previous.child_offsets == graph.child_offsets and previous.child_indices == graph.child_indices:
+        return True
+    return set(previous.edges()) == set(graph.edges())
+
+
+def reload_graph(manifest_paths, graph, cache=None, incremental=True):
+    """
+    The up-to-date graph for `manifest_paths`, given the previous `graph`.
+
+    A single manifest is patched in memory; several are re-merged through
+    the cache.
+    """
+    if len(manifest_paths) == 1 and incremental:
+        graph, delta = update_lineage(graph, manifest_paths[0])
+        print(f"♻️  Patched the lineage graph in memory ({len(delta.added)} added, "
+              f"{len(delta.removed)} removed, {len(delta.changed)} changed)")
+        return graph
+    graph, _ = load_project_lineage(manifest_paths, cache, incremental)
+    print("🔄 Reloaded the lineage graph")
+    return graph
+
+
+class FileWatcher:
+    """Polls a set of files and reports them once a burst of writes is over."""
+
+    __slots__ = ('paths', 'interval', 'debounce', 'stamps', 'pending', 'last_change')
+
+    def __init__(self, paths, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        self.paths = [Path(path) for path in paths]
+        self.interval = interval
+        self.debounce = debounce
+        self.stamps = {path: _stamp(path) for path in self.paths}
+        self.pending = set()
+        self.last_change = None
+
+    def poll(self):
+        """Paths whose modification time or size changed since the last poll."""
+        changed = set()
+        for path in self.paths:
+            stamp = _stamp(path)
+            if stamp != self.stamps[path]:
+                self.stamps[path] = stamp
+                changed.add(path)
+        return changed
+
+    def check(self):
+        """
+        Poll once without blocking. Returns the changed paths once they have
+        stayed unchanged for `debounce` seconds, otherwise an empty set.
+
+        A file that is missing at that point (dbt replaces the manifest while
+        compiling) is held back until it is back.
+        """
+        fresh = self.poll()
+        now = time.monotonic()
+        if fresh:
+            self.pending |= fresh
+            self.last_change = now
+        elif (self.pending and now - self.last_change >= self.debounce
+                and all(self.stamps[path] is not None for path in self.pending)):
+            changed, self.pending = self.pending, set()
+            return changed
+        return set()
+
+    def wait(self):
+        """Block until check() reports a change; return the changed paths."""
+        while True:
+            changed = self.check()
+            if changed:
+                return changed
+            time.sleep(self.interval)
+
+
+class LineageWatch:
+    """
+    The graph and run timings of a project, kept current as its files change.
+
+    changes() blocks until the next debounced change and yields the set of
+    change kinds: 'graph' when the drawn structure changed, 'timings' when
+    the run timings changed. Changes that alter neither are reported and
+    skipped. run() drives a rebuild callback with them until Ctrl-C.
+
+    run_results.json is only watched when `use_timings` is set, i.e. when
+    the output shows them.
+    """
+
+    __slots__ = ('manifest_paths', 'run_results_path', 'graph', 'timings', 'cache', 'incremental',
+                 'watcher')
+
+    def __init__(self, manifest_paths, graph, run_results_path=None, timings=None, use_timings=False,
+                 cache=None, incremental=True, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+        self.manifest_paths = [Path(path) for path in manifest_paths]
+        self.run_results_path = None
+        if use_timings:
+            self.run_results_path = Path(run_results_path
+                                         or self.manifest_paths[0].with_name(RUN_RESULTS_NAME))
+        self.graph = graph
+        self.timings = timings
+        self.cache = cache
+        self.incremental = incremental
+        watched = self.manifest_paths + ([self.run_results_path] if use_timings else [])
+        self.watcher = FileWatcher(watched, interval, debounce)
+
+    def _reload_timings(self):
+        if self.run_results_path is None or not self.run_results_path.exists():
+            return None
+        return load_run_results(self.run_results_path, self.graph)
+
+    def refresh(self, changed_paths):
+        """Reload what `changed_paths` affect; return the set of change kinds."""
+        kinds = set()
+        if set(self.manifest_paths) & changed_paths:
+            graph = reload_graph(self.manifest_paths, self.graph, self.cache, self.incremental)
+            if not same_structure(self.graph, graph):
+                kinds.add('graph')
+            self.graph = graph
+        # Timings are indexed like the graph, so a new graph needs them realigned
+        if self.run_results_path is not None and (self.run_results_path in changed_paths
+                                                  or 'graph' in kinds):
+            timings = self._reload_timings()
+            if (timings is None) != (self.timings is None) or (
+                    timings is not None and (timings.durations != self.timings.durations
+                                             or timings.statuses != self.timings.statuses)):
+                kinds.add('timings')
+            self.timings = timings
+        return kinds
+
+    def changes(self):
+        """Yield the change kinds of every debounced change that alters the output."""
+        while True:
+            changed = self.watcher.wait()
+            print(f"\n📝 Changed: {', '.join(sorted(str(path) for path in changed))}")
+            try:
+                kinds = self.refresh(changed)
+            except (OSError, ValueError) as error:
+                # Usually a file caught mid-write (ManifestError and JSON errors are
+                # ValueErrors); the next write triggers another try
+                print(f"⚠️  Could not reload: {error}; waiting for the next change")
+                continue
+            if kinds:
+                yield kinds
+            else:
+                print("✓ Nothing drawn has changed; outputs are up to date")
+
+    def run(self, rebuild):
+        """Call rebuild(kinds) after every change that alters the output, until Ctrl-C."""
+        print(f"\n👀 Watching {', '.join(str(path) for path in self.watcher.paths)} (Ctrl-C to stop)")
+        try:
+            for kinds in self.changes():
+                rebuild(kinds)
+                print("👀 Waiting for changes...")
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+
+
+def add_watch_arguments(parser):
+    """Add the --watch options to an argparse parser."""
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and regenerate the output when the manifest or '
+                             'run_results.json changes')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help='seconds the files must be quiet before a rebuild (default: %(default)s)')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help='seconds between file checks in watch mode (default: %(default)s)')
+
+
+def watch_from_args(args, graph, timings=None, cache=None):
+    """LineageWatch configured by add_watch_arguments() and the script's cache/timing options."""
+    return LineageWatch(args.manifest, graph, args.run_results, timings,
+                        use_timings=args.color_by == 'duration' or timings is not None, cache=cache,
+                        incremental=not args.no_incremental, interval=args.poll_interval,
+                        debounce=args.debounce)
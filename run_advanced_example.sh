@@ -15,21 +15,37 @@ source venv/bin/activate
 # Navigate to advanced project
 cd lineage_advanced
 
-# Load seeds
-echo "🌱 Loading seed data (9 files)..."
-dbt seed --quiet
+if [ "$CHANGED_ONLY" = "1" ] && [ -f target/manifest.json ]; then
+    # Rebuild only what changed since the last build, plus everything downstream
+    cp target/manifest.json target/previous_manifest.json
+    echo "🔎 Parsing project to find changed models..."
+    dbt parse --quiet
+    SELECTION=$(cd .. && python -m lineage impact \
+        --manifest lineage_advanced/target/manifest.json \
+        --base-manifest lineage_advanced/target/previous_manifest.json)
+    if [ -z "$SELECTION" ]; then
+        echo "✓ Nothing changed since the last build"
+    else
+        echo "🔨 Building changed nodes and everything downstream..."
+        dbt build --quiet --select $SELECTION || echo "Some tests failed (expected for demo data)"
+    fi
+else
+    # Load seeds
+    echo "🌱 Loading seed data (9 files)..."
+    dbt seed --quiet
 
-# Run models
-echo "🔨 Building dbt models (18 models)..."
-dbt run --quiet
+    # Run models
+    echo "🔨 Building dbt models (18 models)..."
+    dbt run --quiet
 
-# Run snapshots
-echo "📸 Creating snapshots (SCD Type 2)..."
-dbt snapshot --quiet
+    # Run snapshots
+    echo "📸 Creating snapshots (SCD Type 2)..."
+    dbt snapshot --quiet
 
-# Run tests
-echo "✅ Running data quality tests..."
-dbt test --quiet || echo "Some tests failed (expected for demo data)"
+    # Run tests
+    echo "✅ Running data quality tests..."
+    dbt test --quiet || echo "Some tests failed (expected for demo data)"
+fi
 
 # Generate documentation
 echo "📚 Generating documentation..."
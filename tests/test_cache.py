@@ -0,0 +1,26 @@
+import os
+import pickle
+
+from lineage.cache import LineageCache
+
+
+def test_entry_from_another_code_layout_is_a_miss(tmp_path):
+    cache = LineageCache(tmp_path)
+    # A pickle referencing a module that no longer exists
+    path = tmp_path / 'stale.lineage'
+    path.write_bytes(pickle.dumps(1).replace(b'K\x01', b'cno_such_module\nGraph\n'))
+    assert cache.get('stale') is None
+    assert not path.exists()
+
+
+def test_evict_removes_orphaned_temporary_files(tmp_path):
+    cache = LineageCache(tmp_path)
+    orphan = tmp_path / 'orphan.tmp'
+    orphan.write_bytes(b'partial')
+    os.utime(orphan, (0, 0))
+    fresh = tmp_path / 'fresh.tmp'
+    fresh.write_bytes(b'in progress')
+    cache.put('key', {'graph': 1})
+    assert not orphan.exists()
+    assert fresh.exists()
+    assert cache.get('key') == {'graph': 1}
@@ -0,0 +1,36 @@
+from array import array
+
+import pytest
+
+from lineage.graph import extract_lineage
+from lineage.timings import RunTimings
+
+duckdb = pytest.importorskip('duckdb')
+
+from lineage.database import load_into_duckdb  # noqa: E402
+
+
+def one_model_graph():
+    return extract_lineage({'nodes': {'model.demo.only': {'name': 'only', 'resource_type': 'model'}}})
+
+
+def counts(connection):
+    return [connection.execute(f'SELECT count(*) FROM lineage.{table}').fetchone()[0]
+            for table in ('nodes', 'edges', 'run_timings')]
+
+
+def test_graph_without_edges():
+    connection = duckdb.connect()
+    load_into_duckdb(one_model_graph(), connection)
+    assert counts(connection) == [1, 0, 0]
+    assert connection.execute("SELECT * FROM lineage.ancestors('only')").fetchall() == []
+    assert connection.execute('SELECT unique_id FROM lineage.slowest_path').fetchall() == \
+        [('model.demo.only',)]
+
+
+def test_timings_without_a_timed_node():
+    graph = one_model_graph()
+    timings = RunTimings(array('d', [-1.0]), [''])
+    connection = duckdb.connect()
+    load_into_duckdb(graph, connection, timings)
+    assert counts(connection) == [1, 0, 0]
@@ -0,0 +1,99 @@
+import json
+import random
+
+import pytest
+
+from lineage.graph import extract_lineage
+from lineage.incremental import update_lineage
+
+
+def random_manifest(rng, n):
+    """A manifest of n models, each depending on a few earlier ones."""
+    nodes = {}
+    for i in range(n):
+        parents = rng.sample(range(i), min(i, rng.randint(0, 3)))
+        nodes[f'model.demo.m{i}'] = {
+            'name': f'm{i}',
+            'resource_type': 'model',
+            'checksum': f'c{i}',
+            'depends_on': {'nodes': [f'model.demo.m{p}' for p in parents]},
+        }
+    return {'nodes': nodes, 'sources': {}}
+
+
+def mutate(rng, manifest, serial):
+    """Add, remove and change a few nodes of a manifest in place."""
+    nodes = manifest['nodes']
+    ids = list(nodes)
+    for unique_id in rng.sample(ids, 3):
+        del nodes[unique_id]
+    ids = list(nodes)
+    for unique_id in rng.sample(ids, 6):
+        record = nodes[unique_id]
+        edit = rng.choice(('checksum', 'name', 'parents'))
+        if edit == 'checksum':
+            record['checksum'] = f'edited{serial}'
+        elif edit == 'name':
+            record['name'] += f'_v{serial}'
+        else:
+            record['depends_on']['nodes'] = rng.sample(ids, 2)
+    for k in range(3):
+        nodes[f'model.demo.new{serial}_{k}'] = {
+            'name': f'new{serial}_{k}',
+            'resource_type': 'model',
+            'checksum': 'n',
+            'depends_on': {'nodes': rng.sample(list(nodes), 2)},
+        }
+    # The manifest may reference nodes that do not exist (disabled models)
+    nodes[rng.choice(list(nodes))]['depends_on']['nodes'].append('model.demo.missing')
+
+
+def edge_ids(graph):
+    return {(graph.ids[parent], graph.ids[child]) for parent, child in graph.edges()}
+
+
+def update(previous, manifest, tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text(json.dumps(manifest))
+    return update_lineage(previous, path)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_apply_delta_matches_full_extraction(seed, tmp_path):
+    rng = random.Random(seed)
+    manifest = random_manifest(rng, 40)
+    graph = extract_lineage(manifest)
+    for serial in range(5):
+        mutate(rng, manifest, serial)
+        graph, delta = update(graph, manifest, tmp_path)
+        assert delta
+
+        expected = extract_lineage(manifest)
+        assert set(graph.ids) == set(expected.ids)
+        assert edge_ids(graph) == edge_ids(expected)
+        for i, unique_id in enumerate(graph.ids):
+            j = expected.index[unique_id]
+            assert (graph.names[i], graph.types[i], graph.checksums[i]) == \
+                (expected.names[j], expected.types[j], expected.checksums[j])
+
+        # Extracting the records in the patched graph's node order must give
+        # the same adjacency, child order included
+        reordered = extract_lineage({'nodes': {unique_id: manifest['nodes'][unique_id]
+                                               for unique_id in graph.ids}})
+        assert reordered.ids == graph.ids
+        assert list(reordered.parent_offsets) == list(graph.parent_offsets)
+        assert list(reordered.parent_indices) == list(graph.parent_indices)
+        assert list(reordered.child_offsets) == list(graph.child_offsets)
+        assert list(reordered.child_indices) == list(graph.child_indices)
+
+
+def test_checksum_only_change_keeps_adjacency(tmp_path):
+    rng = random.Random(0)
+    manifest = random_manifest(rng, 40)
+    previous = extract_lineage(manifest)
+    for unique_id in rng.sample(list(manifest['nodes']), 10):
+        manifest['nodes'][unique_id]['checksum'] = 'edited'
+    graph, delta = update(previous, manifest, tmp_path)
+    assert len(delta.changed) == 10
+    assert graph.child_indices == previous.child_indices
+    assert graph.parent_indices == previous.parent_indices
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from lineage.graph import load_lineage
+from lineage.merge import merge_manifests
+
+ROOT = Path(__file__).resolve().parent.parent
+ADVANCED = ROOT / 'lineage_advanced' / 'target' / 'manifest.json'
+DEMO = ROOT / 'lineage_demo' / 'target' / 'manifest.json'
+
+
+def project_edges(graph, ids):
+    """Edges of `graph` between nodes in `ids`, as (parent_id, child_id) pairs."""
+    return {(graph.ids[parent], graph.ids[child]) for parent, child in graph.edges()
+            if graph.ids[parent] in ids and graph.ids[child] in ids}
+
+
+def test_project_edges_are_the_same_alone_and_merged():
+    alone = load_lineage(ADVANCED)
+    merged, _ = merge_manifests([ADVANCED, DEMO], workers=1)
+    ids = set(alone.ids)
+    assert project_edges(merged, ids) == project_edges(alone, ids)
+    assert len(project_edges(merged, ids)) == alone.number_of_edges()
@@ -0,0 +1,53 @@
+import json
+import random
+
+from lineage.graph import load_lineage
+from lineage.watch import LineageWatch, same_structure
+
+
+def write_manifest(path, n=40, seed=0, checksum=lambda i: f'c{i}'):
+    """A manifest of n models, each depending on a few earlier ones."""
+    rng = random.Random(seed)
+    nodes = {}
+    for i in range(n):
+        parents = rng.sample(range(i), min(i, rng.randint(1, 3)))
+        nodes[f'model.demo.m{i}'] = {
+            'name': f'm{i}',
+            'resource_type': 'model',
+            'checksum': checksum(i),
+            'depends_on': {'nodes': [f'model.demo.m{p}' for p in parents]},
+        }
+    path.write_text(json.dumps({'nodes': nodes, 'sources': {}}))
+
+
+def test_checksum_only_change_is_not_a_graph_change(tmp_path):
+    path = tmp_path / 'manifest.json'
+    write_manifest(path)
+    watch = LineageWatch([path], load_lineage(path))
+
+    write_manifest(path, checksum=lambda i: f'edited{i}' if i % 2 else f'c{i}')
+    assert watch.refresh({path}) == set()
+    assert watch.graph.checksums[1] == 'edited1'
+
+
+def test_dependency_change_is_a_graph_change(tmp_path):
+    path = tmp_path / 'manifest.json'
+    write_manifest(path)
+    watch = LineageWatch([path], load_lineage(path))
+
+    write_manifest(path, seed=1)
+    assert watch.refresh({path}) == {'graph'}
+
+
+def test_same_structure_ignores_child_order(tmp_path):
+    path = tmp_path / 'manifest.json'
+    write_manifest(path)
+    graph = load_lineage(path)
+    # Same edges, every child list reversed
+    reordered = load_lineage(path)
+    offsets = reordered.child_offsets
+    for i in range(len(reordered)):
+        start, stop = offsets[i], offsets[i + 1]
+        reordered.child_indices[start:stop] = reordered.child_indices[start:stop][::-1]
+    assert list(reordered.child_indices) != list(graph.child_indices)
+    assert same_structure(graph, reordered)
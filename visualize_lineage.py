@@ -6,59 +6,16 @@ This script reads the dbt manifest.json file and creates a visual representation
 of the data lineage showing how models depend on each other.
 """
 
-import json
-import networkx as nx
-import matplotlib.pyplot as plt
+import argparse
 from pathlib import Path
 
-
-def load_manifest(manifest_path):
-    """Load the dbt manifest.json file."""
-    with open(manifest_path, 'r') as f:
-        return json.load(f)
-
-
-def extract_lineage(manifest):
-    """Extract lineage relationships from the manifest."""
-    G = nx.DiGraph()
-    
-    # Get all nodes (models, seeds, sources, etc.)
-    nodes = manifest.get('nodes', {})
-    sources = manifest.get('sources', {})
-    
-    # Add all nodes to the graph
-    for node_id, node_data in nodes.items():
-        node_type = node_data.get('resource_type', 'unknown')
-        node_name = node_data.get('name', node_id)
-        
-        # Add node with attributes
-        G.add_node(
-            node_id,
-            name=node_name,
-            type=node_type,
-            label=node_name
-        )
-    
-    # Add source nodes
-    for source_id, source_data in sources.items():
-        source_name = source_data.get('name', source_id)
-        G.add_node(
-            source_id,
-            name=source_name,
-            type='source',
-            label=source_name
-        )
-    
-    # Add edges based on dependencies
-    for node_id, node_data in nodes.items():
-        depends_on = node_data.get('depends_on', {})
-        parent_nodes = depends_on.get('nodes', [])
-        
-        for parent_id in parent_nodes:
-            if parent_id in G.nodes:
-                G.add_edge(parent_id, node_id)
-    
-    return G
+from lineage.cache import LOAD_MESSAGES, add_cache_arguments, cache_from_args
+from lineage.layout import layered_layout
+from lineage.merge import load_project_lineage
+from lineage.profiling import Profiler, add_profile_arguments, graph_counts, profiler_from_args
+from lineage.render import render_lineage, should_run_headless, use_headless_backend
+from lineage.timings import add_timing_arguments, duration_colors, print_slowest_models, timings_from_args
+from lineage.watch import add_watch_arguments, watch_from_args
 
 
 def get_node_color(node_type):
@@ -87,169 +44,192 @@ def get_node_layer(node_name):
         return 2  # default to middle
 
 
-def visualize_lineage(G, output_path='lineage.png'):
-    """Create and save a visualization of the data lineage."""
-    
-    # Create figure with larger size for better readability
-    plt.figure(figsize=(20, 12))
-    
-    # Use hierarchical layout based on node layers
-    pos = {}
-    layer_counts = {}
-    
-    # First pass: count nodes in each layer
-    for node in G.nodes():
-        node_name = G.nodes[node].get('name', node)
-        layer = get_node_layer(node_name)
-        layer_counts[layer] = layer_counts.get(layer, 0) + 1
-    
-    # Second pass: position nodes
-    layer_positions = {}
-    for node in G.nodes():
-        node_name = G.nodes[node].get('name', node)
-        layer = get_node_layer(node_name)
-        
-        if layer not in layer_positions:
-            layer_positions[layer] = 0
-        
-        # Calculate position
-        x = layer * 3  # Horizontal spacing between layers
-        max_in_layer = layer_counts[layer]
-        y = (layer_positions[layer] - max_in_layer / 2) * 1.5  # Vertical spacing
-        
-        pos[node] = (x, y)
-        layer_positions[layer] += 1
-    
-    # Get node colors based on type
-    node_colors = [
-        get_node_color(G.nodes[node].get('type', 'unknown'))
-        for node in G.nodes()
-    ]
-    
-    # Get node labels (use short names)
-    labels = {
-        node: G.nodes[node].get('name', node).replace('_', '\n')
-        for node in G.nodes()
-    }
-    
-    # Draw the graph
-    nx.draw_networkx_nodes(
-        G, pos,
-        node_color=node_colors,
-        node_size=3000,
-        alpha=0.9,
-        edgecolors='black',
-        linewidths=2
-    )
+def visualize_lineage(graph, output_path='lineage.png', layers='dag', formats=None, show=True,
+                      timings=None, profiler=None):
+    """
+    Create and save a visualization of the data lineage.
     
-    nx.draw_networkx_labels(
-        G, pos,
-        labels=labels,
-        font_size=8,
-        font_weight='bold'
-    )
+    With `formats` (e.g. ['png', 'svg', 'pdf']) the figure is drawn once and
+    saved next to `output_path` in each format. `show=False` skips the
+    interactive window, for CI and cron jobs. `profiler` (lineage.profiling)
+    times the layout and rendering stages.
+    """
     
-    nx.draw_networkx_edges(
-        G, pos,
-        edge_color='gray',
-        arrows=True,
-        arrowsize=20,
-        arrowstyle='->',
-        width=2,
-        alpha=0.6,
-        connectionstyle='arc3,rad=0.1'
-    )
-    
-    # Add legend
-    legend_elements = [
-        plt.Line2D([0], [0], marker='o', color='w', label='Seeds',
-                  markerfacecolor='#90EE90', markersize=10, markeredgecolor='black'),
-        plt.Line2D([0], [0], marker='o', color='w', label='Models',
-                  markerfacecolor='#87CEEB', markersize=10, markeredgecolor='black'),
-        plt.Line2D([0], [0], marker='o', color='w', label='Sources',
-                  markerfacecolor='#FFD700', markersize=10, markeredgecolor='black'),
-    ]
-    plt.legend(handles=legend_elements, loc='upper left', fontsize=10)
+    # Layered layout: DAG depth by default, naming convention on request
+    layer_of = None
+    if layers == 'prefix':
+        layer_of = lambda i: get_node_layer(graph.names[i])
+    profiler = profiler or Profiler(enabled=False)
+    with profiler.stage('layout', **graph_counts(graph)):
+        layout = layered_layout(graph, layer_of, layer_spacing=3, node_spacing=1.5)
     
     # Add layer labels
     layer_names = {0: 'Raw Data', 1: 'Staging', 2: 'Intermediate', 3: 'Marts'}
-    for layer, x in enumerate(range(0, 12, 3)):
-        if layer in layer_names:
-            plt.text(x, max(y for _, y in pos.values()) + 2, layer_names[layer],
-                    fontsize=14, fontweight='bold', ha='center',
-                    bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-    
-    plt.title('Data Lineage Visualization', fontsize=20, fontweight='bold', pad=20)
-    plt.axis('off')
-    plt.tight_layout()
-    
-    # Save the figure
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Lineage visualization saved to: {output_path}")
+    layer_labels = []
+    for layer in range(layout.layer_count):
+        label = layer_names.get(layer) if layers == 'prefix' else f'Level {layer}'
+        if label:
+            layer_labels.append((layer * 3, label))
+    
+    # Colour by build time from run_results.json when timings are given
+    node_colors, legend = duration_colors(timings) if timings is not None else (None, None)
+    
+    # Draw nodes, edges and arrowheads as a few batched collections
+    # (or stream an SVG when output_path ends in .svg)
+    output_paths = [output_path]
+    if formats:
+        output_paths = [str(Path(output_path).with_suffix(f'.{fmt}')) for fmt in formats]
+    with profiler.stage('render', **graph_counts(graph)):
+        render_lineage(
+            graph, layout, output_paths,
+            node_color=get_node_color,
+            title='Data Lineage Visualization',
+            layer_labels=layer_labels,
+            figsize=(20, 12),
+            node_size=3000,
+            font_size=8,
+            edge_width=2,
+            arrow_size=20,
+            legend_font_size=10,
+            title_font_size=20,
+            layer_font_size=14,
+            close=not show,
+            node_colors=node_colors,
+            legend=legend,
+        )
+    for path in output_paths:
+        print(f"✓ Lineage visualization saved to: {path}")
     
     # Also show the plot
-    plt.show()
+    if show:
+        import matplotlib.pyplot as plt
+        plt.show()
     
-    return output_path
+    return output_paths[0]
 
 
-def print_lineage_summary(G):
+def print_lineage_summary(graph):
     """Print a summary of the lineage graph."""
     print("\n" + "="*60)
     print("DATA LINEAGE SUMMARY")
     print("="*60)
     
-    print(f"\nTotal nodes: {G.number_of_nodes()}")
-    print(f"Total edges: {G.number_of_edges()}")
+    print(f"\nTotal nodes: {graph.number_of_nodes()}")
+    print(f"Total edges: {graph.number_of_edges()}")
     
     # Count by type
-    type_counts = {}
-    for node in G.nodes():
-        node_type = G.nodes[node].get('type', 'unknown')
-        type_counts[node_type] = type_counts.get(node_type, 0) + 1
+    type_counts = graph.type_counts()
     
     print("\nNodes by type:")
     for node_type, count in sorted(type_counts.items()):
         print(f"  {node_type}: {count}")
     
     # Find root nodes (no dependencies)
-    root_nodes = [node for node in G.nodes() if G.in_degree(node) == 0]
+    root_nodes = graph.roots()
     print(f"\nRoot nodes (sources): {len(root_nodes)}")
     for node in root_nodes:
-        print(f"  - {G.nodes[node].get('name', node)}")
+        print(f"  - {graph.names[node]}")
     
     # Find leaf nodes (no dependents)
-    leaf_nodes = [node for node in G.nodes() if G.out_degree(node) == 0]
+    leaf_nodes = graph.leaves()
     print(f"\nLeaf nodes (final outputs): {len(leaf_nodes)}")
     for node in leaf_nodes:
-        print(f"  - {G.nodes[node].get('name', node)}")
+        print(f"  - {graph.names[node]}")
     
     print("\n" + "="*60 + "\n")
 
 
+def _formats(value):
+    """Parse a comma-separated --format value."""
+    return [fmt.strip().lstrip('.').lower() for fmt in value.split(',') if fmt.strip()]
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Render the dbt lineage graph of lineage_demo as a PNG.')
+    parser.add_argument('--manifest', nargs='+', default=['lineage_demo/target/manifest.json'],
+                        help='path to the dbt manifest.json; give several to merge projects into one graph')
+    parser.add_argument('--output', default='data_lineage.png',
+                        help='output file')
+    parser.add_argument('--layers', choices=('dag', 'prefix'), default='dag',
+                        help='place nodes by DAG depth or by raw_/stg_/int_/... name prefix')
+    parser.add_argument('--format', dest='formats', type=_formats, default=None,
+                        help='comma-separated output formats, e.g. png,svg,pdf '
+                             '(default: the --output extension)')
+    parser.add_argument('--headless', action='store_true',
+                        help='use a non-GUI backend and never open a window '
+                             '(automatic when no display is available)')
+    parser.add_argument('--summary-only', action='store_true',
+                        help='print the lineage summary and skip rendering')
+    add_cache_arguments(parser)
+    add_timing_arguments(parser)
+    add_profile_arguments(parser)
+    add_watch_arguments(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main execution function."""
-    # Path to the manifest
-    manifest_path = Path('lineage_demo/target/manifest.json')
+    args = parse_args()
+    manifest_paths = [Path(path) for path in args.manifest]
+    manifest_path = manifest_paths[0]
+    missing = [path for path in manifest_paths if not path.exists()]
     
-    if not manifest_path.exists():
-        print(f"❌ Error: Manifest file not found at {manifest_path}")
+    if missing:
+        print(f"❌ Error: Manifest file not found at {missing[0]}")
         print("Please run 'dbt docs generate' first.")
         return
     
-    print(f"📖 Loading manifest from: {manifest_path}")
-    manifest = load_manifest(manifest_path)
-    
-    print("🔍 Extracting lineage relationships...")
-    lineage_graph = extract_lineage(manifest)
-    
-    print_lineage_summary(lineage_graph)
+    profiler = profiler_from_args(args)
+    if len(manifest_paths) == 1:
+        print(f"📖 Loading manifest from: {manifest_path}")
+    else:
+        print(f"📖 Merging {len(manifest_paths)} manifests: {', '.join(map(str, manifest_paths))}")
+    cache = cache_from_args(args)
+    with profiler.stage('load') as record:
+        lineage_graph, source = load_project_lineage(
+            manifest_paths, cache, incremental=not args.no_incremental)
+        record.update(graph_counts(lineage_graph), source=source)
+    print(LOAD_MESSAGES[source])
+    with profiler.stage('run timings'):
+        timings = timings_from_args(args, manifest_path, lineage_graph)
+    
+    with profiler.stage('summary', **graph_counts(lineage_graph)):
+        print_lineage_summary(lineage_graph)
+        if timings is not None:
+            print_slowest_models(lineage_graph, timings)
+    if args.summary_only and not args.watch:
+        profiler.finish()
+        return
     
-    print("🎨 Creating visualization...")
-    output_path = 'data_lineage.png'
-    visualize_lineage(lineage_graph, output_path)
+    # Watch mode keeps running, so it never blocks on a window
+    headless = args.headless or args.watch or should_run_headless()
+    if headless:
+        use_headless_backend()
     
-    print("\n✅ Done! Your data lineage visualization is ready.")
+    if not args.summary_only:
+        print("🎨 Creating visualization...")
+        visualize_lineage(lineage_graph, args.output, args.layers, args.formats, show=not headless,
+                          timings=timings if args.color_by == 'duration' else None, profiler=profiler)
+        
+        print("\n✅ Done! Your data lineage visualization is ready.")
+    if args.watch:
+        watch = watch_from_args(args, lineage_graph, timings, cache)
+        
+        def rebuild(changes):
+            with profiler.stage('summary', **graph_counts(watch.graph)):
+                print_lineage_summary(watch.graph)
+                if watch.timings is not None:
+                    print_slowest_models(watch.graph, watch.timings)
+            # New timings only change the picture when nodes are coloured by them
+            if not args.summary_only and ('graph' in changes or args.color_by == 'duration'):
+                print("🎨 Creating visualization...")
+                visualize_lineage(watch.graph, args.output, args.layers, args.formats, show=False,
+                                  timings=watch.timings if args.color_by == 'duration' else None,
+                                  profiler=profiler)
+        
+        watch.run(rebuild)
+    profiler.finish()
 
 
 if __name__ == '__main__':
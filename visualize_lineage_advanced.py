@@ -5,58 +5,16 @@ Advanced Data Lineage Visualization Script
 Generates lineage visualizations for the advanced healthcare example
 """
 
-import json
-import networkx as nx
-import matplotlib.pyplot as plt
+import argparse
 from pathlib import Path
 
-
-def load_manifest(manifest_path):
-    """Load the dbt manifest.json file."""
-    with open(manifest_path, 'r') as f:
-        return json.load(f)
-
-
-def extract_lineage(manifest):
-    """Extract lineage relationships from the manifest."""
-    G = nx.DiGraph()
-    
-    # Get all nodes
-    nodes = manifest.get('nodes', {})
-    sources = manifest.get('sources', {})
-    
-    # Add nodes
-    for node_id, node_data in nodes.items():
-        node_type = node_data.get('resource_type', 'unknown')
-        node_name = node_data.get('name', node_id)
-        
-        G.add_node(
-            node_id,
-            name=node_name,
-            type=node_type,
-            label=node_name
-        )
-    
-    # Add source nodes
-    for source_id, source_data in sources.items():
-        source_name = source_data.get('name', source_id)
-        G.add_node(
-            source_id,
-            name=source_name,
-            type='source',
-            label=source_name
-        )
-    
-    # Add edges
-    for node_id, node_data in nodes.items():
-        depends_on = node_data.get('depends_on', {})
-        parent_nodes = depends_on.get('nodes', [])
-        
-        for parent_id in parent_nodes:
-            if parent_id in G.nodes:
-                G.add_edge(parent_id, node_id)
-    
-    return G
+from lineage.cache import LOAD_MESSAGES, add_cache_arguments, cache_from_args
+from lineage.layout import layered_layout
+from lineage.merge import load_project_lineage
+from lineage.profiling import Profiler, add_profile_arguments, graph_counts, profiler_from_args
+from lineage.render import render_lineage, use_headless_backend
+from lineage.timings import add_timing_arguments, duration_colors, print_slowest_models, timings_from_args
+from lineage.watch import add_watch_arguments, watch_from_args
 
 
 def get_node_color(node_type):
@@ -86,160 +44,171 @@ def get_node_layer(node_name):
         return 2
 
 
-def visualize_lineage(G, output_path='data_lineage_advanced.png'):
-    """Create visualization of data lineage."""
-    
-    plt.figure(figsize=(24, 16))
-    
-    pos = {}
-    layer_counts = {}
-    
-    # Count nodes per layer
-    for node in G.nodes():
-        node_name = G.nodes[node].get('name', node)
-        layer = get_node_layer(node_name)
-        layer_counts[layer] = layer_counts.get(layer, 0) + 1
-    
-    # Position nodes
-    layer_positions = {}
-    for node in G.nodes():
-        node_name = G.nodes[node].get('name', node)
-        layer = get_node_layer(node_name)
-        
-        if layer not in layer_positions:
-            layer_positions[layer] = 0
-        
-        x = layer * 4
-        max_in_layer = layer_counts[layer]
-        y = (layer_positions[layer] - max_in_layer / 2) * 1.2
-        
-        pos[node] = (x, y)
-        layer_positions[layer] += 1
-    
-    # Node colors
-    node_colors = [
-        get_node_color(G.nodes[node].get('type', 'unknown'))
-        for node in G.nodes()
-    ]
-    
-    # Labels
-    labels = {
-        node: G.nodes[node].get('name', node).replace('_', '\n')
-        for node in G.nodes()
-    }
+def visualize_lineage(graph, output_path='data_lineage_advanced.png', layers='dag', formats=None,
+                      timings=None, profiler=None):
+    """Create visualization of data lineage, optionally in several formats at once."""
     
-    # Draw
-    nx.draw_networkx_nodes(
-        G, pos,
-        node_color=node_colors,
-        node_size=2500,
-        alpha=0.9,
-        edgecolors='black',
-        linewidths=2
-    )
-    
-    nx.draw_networkx_labels(
-        G, pos,
-        labels=labels,
-        font_size=7,
-        font_weight='bold'
-    )
-    
-    nx.draw_networkx_edges(
-        G, pos,
-        edge_color='gray',
-        arrows=True,
-        arrowsize=15,
-        arrowstyle='->',
-        width=1.5,
-        alpha=0.6,
-        connectionstyle='arc3,rad=0.1'
-    )
-    
-    # Legend
-    legend_elements = [
-        plt.Line2D([0], [0], marker='o', color='w', label='Sources',
-                  markerfacecolor='#FFD700', markersize=10, markeredgecolor='black'),
-        plt.Line2D([0], [0], marker='o', color='w', label='Seeds',
-                  markerfacecolor='#90EE90', markersize=10, markeredgecolor='black'),
-        plt.Line2D([0], [0], marker='o', color='w', label='Models',
-                  markerfacecolor='#87CEEB', markersize=10, markeredgecolor='black'),
-        plt.Line2D([0], [0], marker='o', color='w', label='Snapshots',
-                  markerfacecolor='#FF69B4', markersize=10, markeredgecolor='black'),
-    ]
-    plt.legend(handles=legend_elements, loc='upper left', fontsize=12)
+    # Layered layout: DAG depth by default, naming convention on request
+    layer_of = None
+    if layers == 'prefix':
+        layer_of = lambda i: get_node_layer(graph.names[i])
+    profiler = profiler or Profiler(enabled=False)
+    with profiler.stage('layout', **graph_counts(graph)):
+        layout = layered_layout(graph, layer_of, layer_spacing=4, node_spacing=1.2)
     
     # Layer labels
     layer_names = {0: 'Sources', 1: 'Staging', 2: 'Intermediate', 3: 'Marts', 4: 'Snapshots'}
-    for layer, x in enumerate(range(0, 20, 4)):
-        if layer in layer_names:
-            plt.text(x, max(y for _, y in pos.values()) + 1.5, layer_names[layer],
-                    fontsize=16, fontweight='bold', ha='center',
-                    bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-    
-    plt.title('Advanced Healthcare Data Lineage', fontsize=22, fontweight='bold', pad=20)
-    plt.axis('off')
-    plt.tight_layout()
-    
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"✓ Lineage visualization saved to: {output_path}")
+    layer_labels = []
+    for layer in range(layout.layer_count):
+        label = layer_names.get(layer) if layers == 'prefix' else f'Level {layer}'
+        if label:
+            layer_labels.append((layer * 4, label))
+    
+    # Colour by build time from run_results.json when timings are given
+    node_colors, legend = duration_colors(timings) if timings is not None else (None, None)
+    
+    # Draw with batched collections (streamed SVG for .svg outputs)
+    output_paths = [output_path]
+    if formats:
+        output_paths = [str(Path(output_path).with_suffix(f'.{fmt}')) for fmt in formats]
+    with profiler.stage('render', **graph_counts(graph)):
+        render_lineage(
+            graph, layout, output_paths,
+            node_color=get_node_color,
+            title='Advanced Healthcare Data Lineage',
+            layer_labels=layer_labels,
+            figsize=(24, 16),
+            node_size=2500,
+            font_size=7,
+            edge_width=1.5,
+            arrow_size=15,
+            legend_font_size=12,
+            title_font_size=22,
+            layer_font_size=16,
+            node_colors=node_colors,
+            legend=legend,
+        )
+    for path in output_paths:
+        print(f"✓ Lineage visualization saved to: {path}")
     
-    return output_path
+    return output_paths[0]
 
 
-def print_lineage_summary(G):
+def print_lineage_summary(graph):
     """Print summary of the lineage graph."""
     print("\n" + "="*70)
     print("ADVANCED HEALTHCARE DATA LINEAGE SUMMARY")
     print("="*70)
     
-    print(f"\nTotal nodes: {G.number_of_nodes()}")
-    print(f"Total edges: {G.number_of_edges()}")
+    print(f"\nTotal nodes: {graph.number_of_nodes()}")
+    print(f"Total edges: {graph.number_of_edges()}")
     
     # Count by type
-    type_counts = {}
-    for node in G.nodes():
-        node_type = G.nodes[node].get('type', 'unknown')
-        type_counts[node_type] = type_counts.get(node_type, 0) + 1
+    type_counts = graph.type_counts()
     
     print("\nNodes by type:")
     for node_type, count in sorted(type_counts.items()):
         print(f"  {node_type}: {count}")
     
     # Root nodes
-    root_nodes = [node for node in G.nodes() if G.in_degree(node) == 0]
+    root_nodes = graph.roots()
     print(f"\nRoot nodes (sources/seeds): {len(root_nodes)}")
     
     # Leaf nodes
-    leaf_nodes = [node for node in G.nodes() if G.out_degree(node) == 0]
+    leaf_nodes = graph.leaves()
     print(f"\nLeaf nodes (final outputs): {len(leaf_nodes)}")
     for node in leaf_nodes:
-        print(f"  - {G.nodes[node].get('name', node)}")
+        print(f"  - {graph.names[node]}")
     
     print("\n" + "="*70 + "\n")
 
 
+def _formats(value):
+    """Parse a comma-separated --format value."""
+    return [fmt.strip().lstrip('.').lower() for fmt in value.split(',') if fmt.strip()]
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description='Render the dbt lineage graph of lineage_advanced as a PNG.')
+    parser.add_argument('--manifest', nargs='+', default=['lineage_advanced/target/manifest.json'],
+                        help='path to the dbt manifest.json; give several to merge projects into one graph')
+    parser.add_argument('--output', default='data_lineage_advanced.png',
+                        help='output file')
+    parser.add_argument('--layers', choices=('dag', 'prefix'), default='dag',
+                        help='place nodes by DAG depth or by raw_/stg_/int_/... name prefix')
+    parser.add_argument('--format', dest='formats', type=_formats, default=None,
+                        help='comma-separated output formats, e.g. png,svg,pdf '
+                             '(default: the --output extension)')
+    parser.add_argument('--summary-only', action='store_true',
+                        help='print the lineage summary and skip rendering')
+    add_cache_arguments(parser)
+    add_timing_arguments(parser)
+    add_profile_arguments(parser)
+    add_watch_arguments(parser)
+    return parser.parse_args()
+
+
 def main():
     """Main execution."""
-    manifest_path = Path('lineage_advanced/target/manifest.json')
+    args = parse_args()
+    manifest_paths = [Path(path) for path in args.manifest]
+    manifest_path = manifest_paths[0]
+    missing = [path for path in manifest_paths if not path.exists()]
     
-    if not manifest_path.exists():
-        print(f"❌ Error: Manifest file not found at {manifest_path}")
+    if missing:
+        print(f"❌ Error: Manifest file not found at {missing[0]}")
         print("Please run 'cd lineage_advanced && dbt docs generate' first.")
         return
     
-    print(f"📖 Loading manifest from: {manifest_path}")
-    manifest = load_manifest(manifest_path)
-    
-    print("🔍 Extracting lineage relationships...")
-    lineage_graph = extract_lineage(manifest)
-    
-    print_lineage_summary(lineage_graph)
+    profiler = profiler_from_args(args)
+    if len(manifest_paths) == 1:
+        print(f"📖 Loading manifest from: {manifest_path}")
+    else:
+        print(f"📖 Merging {len(manifest_paths)} manifests: {', '.join(map(str, manifest_paths))}")
+    cache = cache_from_args(args)
+    with profiler.stage('load') as record:
+        lineage_graph, source = load_project_lineage(
+            manifest_paths, cache, incremental=not args.no_incremental)
+        record.update(graph_counts(lineage_graph), source=source)
+    print(LOAD_MESSAGES[source])
+    with profiler.stage('run timings'):
+        timings = timings_from_args(args, manifest_path, lineage_graph)
+    
+    with profiler.stage('summary', **graph_counts(lineage_graph)):
+        print_lineage_summary(lineage_graph)
+        if timings is not None:
+            print_slowest_models(lineage_graph, timings)
+    if args.summary_only and not args.watch:
+        profiler.finish()
+        return
     
-    print("🎨 Creating visualization...")
-    visualize_lineage(lineage_graph)
+    # This script never opens a window, so skip GUI backend setup entirely
+    use_headless_backend()
     
-    print("\n✅ Done! Your advanced lineage visualization is ready.")
+    if not args.summary_only:
+        print("🎨 Creating visualization...")
+        visualize_lineage(lineage_graph, args.output, args.layers, args.formats,
+                          timings=timings if args.color_by == 'duration' else None, profiler=profiler)
+        
+        print("\n✅ Done! Your advanced lineage visualization is ready.")
+    if args.watch:
+        watch = watch_from_args(args, lineage_graph, timings, cache)
+        
+        def rebuild(changes):
+            with profiler.stage('summary', **graph_counts(watch.graph)):
+                print_lineage_summary(watch.graph)
+                if watch.timings is not None:
+                    print_slowest_models(watch.graph, watch.timings)
+            # New timings only change the picture when nodes are coloured by them
+            if not args.summary_only and ('graph' in changes or args.color_by == 'duration'):
+                print("🎨 Creating visualization...")
+                visualize_lineage(watch.graph, args.output, args.layers, args.formats,
+                                  timings=watch.timings if args.color_by == 'duration' else None,
+                                  profiler=profiler)
+        
+        watch.run(rebuild)
+    profiler.finish()
 
 
 if __name__ == '__main__':